@@ -17,7 +17,7 @@ Design Principles:
 import logging
 import pandas as pd
 import numpy as np
-from typing import Dict, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 import pytz
 
@@ -73,6 +73,86 @@ class AdvancedScreeningConfig:
         logger.info("AdvancedScreeningConfig initialized with fail-safe mode: %s", self.fail_safe_mode)
 
 
+# Screening levels in evaluation order: (config flag, label, failure prefix)
+SCREENING_LEVELS = (
+    ('enable_ma_crossover', '5-MA_Cross', 'Level 5 - MA Crossover'),
+    ('enable_bb_squeeze', '14-BB_Squeeze', 'Level 14 - BB Squeeze'),
+    ('enable_var_limit', '15-VaR', 'Level 15 - VaR'),
+    ('enable_sr_confluence', '19-S/R', 'Level 19 - S/R'),
+    ('enable_gap_analysis', '20-Gap', 'Level 20 - Gap'),
+    ('enable_nrb_trigger', '21-NRB', 'Level 21 - NRB'),
+    ('enable_tick_indicator', '22-TICK', 'Level 22 - TICK'),
+    ('enable_ml_filter', '23-ML', 'Level 23 - ML'),
+    ('enable_retest_logic', '24-Retest', 'Level 24 - Retest'),
+)
+
+# Only a VaR failure blocks a trade in fail-safe mode
+CRITICAL_LEVELS = {'enable_var_limit'}
+
+# Levels re-evaluated on every call: VaR depends on the open positions (and the
+# batch's accepted signals), TICK is market-wide with its own cache. All other
+# verdicts depend only on the symbol's bar and the signal, so they are memoized.
+LIVE_LEVELS = {'enable_var_limit', 'enable_tick_indicator'}
+
+
+class ScreeningInputs:
+    """
+    Per-symbol, per-bar inputs of the screening levels.
+    
+    Built once from the symbol's DataFrame and shared by every signal of the
+    symbol in a batch (and by later batches until the symbol has a new bar).
+    A field is None when its level passes for lack of data; a level whose
+    inputs could not be computed has its error in `errors`.
+    """
+    
+    __slots__ = ('key', 'close', 'ma', 'bb_widths', 'sr_levels', 'gaps', 'nrb', 'ml', 'recent_range', 'errors',
+                 'verdicts')
+    
+    def __init__(self, key: Tuple):
+        self.key = key                  # (bars, last timestamp, last close, enabled levels)
+        self.close = None               # Last close
+        self.ma = None                  # Level 5: (fast EMA, slow EMA) over the crossover lookback
+        self.bb_widths = None           # Level 14: bb_width of the last (up to) 5 bars
+        self.sr_levels = None           # Level 19: SRLevels of the symbol, or (support_1, support_2, resistance_1, resistance_2)
+        self.gaps = None                # Level 20: unfilled gaps [(mid level, 'up'/'down')] in the last 20 bars
+        self.nrb = None                 # Level 21: verdict (direction independent)
+        self.ml = None                  # Level 23: heuristic score components
+        self.recent_range = None        # Level 24: (5-bar high, 5-bar low)
+        self.errors: Dict[str, str] = {}
+        self.verdicts: Dict[Tuple, Dict[str, Tuple[bool, str]]] = {}  # Signal key → {level flag: (ok, reason)}
+
+
+class ScreeningBatch:
+    """
+    Result of AdvancedScreeningManager.validate_signals().
+    
+    `passed[i, j]` is the raw verdict of enabled level j for signal i (every
+    enabled level is evaluated, so the matrix shows all reasons a candidate
+    would be rejected); `decisions[i]` is what validate_signal() returns for
+    it: first failing level in order, with fail-safe mode applied.
+    """
+    
+    def __init__(self, symbols: List[str], levels: List[str], passed: np.ndarray,
+                 reasons: List[List[str]], decisions: List[Tuple[bool, str]]):
+        self.symbols = symbols
+        self.levels = levels
+        self.passed = passed
+        self.reasons = reasons
+        self.decisions = decisions
+    
+    def __len__(self) -> int:
+        return len(self.symbols)
+    
+    @property
+    def valid(self) -> np.ndarray:
+        """Final verdict per signal."""
+        return np.array([ok for ok, _ in self.decisions], dtype=bool)
+    
+    def level_pass_counts(self) -> Dict[str, int]:
+        """Signals passing each enabled level."""
+        return {level: int(count) for level, count in zip(self.levels, self.passed.sum(axis=0))}
+
+
 class AdvancedScreeningManager:
     """
     Universal 24-Level Screening Layer
@@ -90,16 +170,20 @@ class AdvancedScreeningManager:
     """
     
     def __init__(self, config: Optional[AdvancedScreeningConfig] = None, 
-                 portfolio_value: float = 1000000.0):
+                 portfolio_value: float = 1000000.0, indicator_cache=None, sr_levels=None):
         """
         Initialize Advanced Screening Manager
         
         Args:
             config: Screening configuration (uses defaults if None)
             portfolio_value: Current portfolio value for VaR calculation
+            indicator_cache: Shared IndicatorCache (indicators computed once per bar)
+            sr_levels: SRLevelBook with each symbol's sorted S/R levels (Level 19)
         """
         self.config = config or AdvancedScreeningConfig()
         self.portfolio_value = portfolio_value
+        self.indicator_cache = indicator_cache
+        self.sr_levels = sr_levels
         
         # State tracking for retest logic (Level 24)
         self.breakout_levels = {}  # {symbol: {'level': price, 'timestamp': datetime, 'direction': 'up/down'}}
@@ -117,21 +201,17 @@ class AdvancedScreeningManager:
         # API client for TICK data (will be set by bot)
         self.api_client = None
         
+        # Level inputs per symbol, rebuilt only when the symbol has a new bar
+        self._inputs: Dict[str, ScreeningInputs] = {}
+        self.verdict_hits = 0    # Signals screened again within the same bar
+        self.verdict_misses = 0
+        
         logger.info("✅ AdvancedScreeningManager initialized (Portfolio: ₹%.2f)", portfolio_value)
         logger.info("Enabled levels: %s", self._get_enabled_levels())
     
     def _get_enabled_levels(self) -> str:
         """Get list of enabled screening levels"""
-        enabled = []
-        if self.config.enable_ma_crossover: enabled.append("5-MA_Cross")
-        if self.config.enable_bb_squeeze: enabled.append("14-BB_Squeeze")
-        if self.config.enable_var_limit: enabled.append("15-VaR")
-        if self.config.enable_sr_confluence: enabled.append("19-S/R")
-        if self.config.enable_gap_analysis: enabled.append("20-Gap")
-        if self.config.enable_nrb_trigger: enabled.append("21-NRB")
-        if self.config.enable_tick_indicator: enabled.append("22-TICK")
-        if self.config.enable_ml_filter: enabled.append("23-ML")
-        if self.config.enable_retest_logic: enabled.append("24-Retest")
+        enabled = [label for flag, label, _ in SCREENING_LEVELS if getattr(self.config, flag)]
         return ", ".join(enabled) if enabled else "None (All disabled)"
     
     def validate_signal(self, symbol: str, signal_data: Dict, df: pd.DataFrame, 
@@ -159,90 +239,167 @@ class AdvancedScreeningManager:
                 - True, "PASSED" if all checks pass
                 - False, "Failed: [reason]" if any check fails
         """
-        try:
-            # Extract signal details
-            action = signal_data.get('action', 'HOLD')
-            entry_price = signal_data.get('entry_price', current_price)
-            stop_loss = signal_data.get('stop_loss', entry_price * 0.98)
-            target = signal_data.get('target', entry_price * 1.05)
-            
-            if action == 'HOLD':
-                return True, "HOLD signal - no validation needed"
-            
-            # Direction
-            is_long = action == 'BUY'
-            
-            logger.info(f"🔍 [{symbol}] Advanced Screening: {action} @ ₹{entry_price:.2f}")
-            
-            # ========== LEVEL 5: Dual MA Crossover ==========
-            if self.config.enable_ma_crossover:
-                passed, reason = self._check_ma_crossover(df, is_long)
-                if not passed:
-                    return self._handle_failure(f"Level 5 - MA Crossover: {reason}")
-            
-            # ========== LEVEL 14: BB Squeeze Detection ==========
-            if self.config.enable_bb_squeeze:
-                passed, reason = self._check_bb_squeeze(df, is_long)
-                if not passed:
-                    return self._handle_failure(f"Level 14 - BB Squeeze: {reason}")
-            
-            # ========== LEVEL 15: VaR Limit (CRITICAL) ==========
-            if self.config.enable_var_limit:
-                passed, reason = self._check_var_limit(
-                    symbol, entry_price, stop_loss, current_positions
-                )
-                if not passed:
-                    return self._handle_failure(f"Level 15 - VaR: {reason}", critical=True)
-            
-            # ========== LEVEL 19: S&R Confluence ==========
-            if self.config.enable_sr_confluence:
-                passed, reason = self._check_sr_confluence(df, entry_price, stop_loss, is_long)
-                if not passed:
-                    return self._handle_failure(f"Level 19 - S/R: {reason}")
-            
-            # ========== LEVEL 20: Gap Analysis ==========
-            if self.config.enable_gap_analysis:
-                passed, reason = self._check_gap_levels(symbol, df, entry_price, is_long)
-                if not passed:
-                    return self._handle_failure(f"Level 20 - Gap: {reason}")
-            
-            # ========== LEVEL 21: NRB Trigger ==========
-            if self.config.enable_nrb_trigger:
-                passed, reason = self._check_nrb_pattern(df)
-                if not passed:
-                    return self._handle_failure(f"Level 21 - NRB: {reason}")
-            
-            # ========== LEVEL 22: TICK Indicator (Optional) ==========
-            if self.config.enable_tick_indicator:
-                passed, reason = self._check_tick_indicator(is_long)
-                if not passed:
-                    return self._handle_failure(f"Level 22 - TICK: {reason}")
-            
-            # ========== LEVEL 23: ML Filter (Optional) ==========
-            if self.config.enable_ml_filter:
-                passed, reason = self._check_ml_prediction(symbol, df, signal_data, is_long)
-                if not passed:
-                    return self._handle_failure(f"Level 23 - ML: {reason}")
-            
-            # ========== LEVEL 24: Retest Logic ==========
-            if self.config.enable_retest_logic:
-                passed, reason = self._check_retest_opportunity(
-                    symbol, df, entry_price, is_long
-                )
-                if not passed:
-                    return self._handle_failure(f"Level 24 - Retest: {reason}")
-            
-            # ========== ALL CHECKS PASSED ==========
-            logger.info(f"✅ [{symbol}] Advanced Screening PASSED - All enabled levels cleared")
-            return True, "PASSED"
+        batch = [{'symbol': symbol, 'signal_data': signal_data, 'df': df, 'current_price': current_price}]
+        return self.validate_signals(batch, current_positions).decisions[0]
+    
+    def validate_signals(self, batch: List[Dict], current_positions: Dict) -> ScreeningBatch:
+        """
+        Validate a whole cycle's candidate signals in one call.
+        
+        Level inputs (EMAs, band widths, S/R levels, gap table, bar ranges,
+        heuristic components, recent highs / lows) are computed once per
+        symbol and bar, and each enabled level is evaluated for every signal.
+        The VaR level sees only the positions open before the batch; callers
+        placing several signals re-check it with check_var_limit() right
+        before each order, against the positions open at that moment.
+        
+        Args:
+            batch: [{'symbol', 'signal_data', 'df', 'current_price'}], fields as
+                in validate_signal()
+            current_positions: Dictionary of current open positions
             
-        except Exception as e:
-            logger.error(f"Error in advanced screening for {symbol}: {e}", exc_info=True)
-            if self.config.fail_safe_mode:
-                logger.warning(f"⚠️ [{symbol}] Screening error in fail-safe mode - ALLOWING trade")
-                return True, f"PASSED (fail-safe: {str(e)})"
-            else:
-                return False, f"Screening error: {str(e)}"
+        Returns:
+            ScreeningBatch (per-level pass/fail matrix and per-signal decisions)
+        """
+        enabled = [level for level in SCREENING_LEVELS if getattr(self.config, level[0])]
+        passed = np.ones((len(batch), len(enabled)), dtype=bool)
+        reasons = [[''] * len(enabled) for _ in batch]
+        decisions = []
+        tick_verdicts = {}  # is_long → Level 22 verdict (market-wide, once per batch)
+        
+        for i, item in enumerate(batch):
+            symbol = item['symbol']
+            try:
+                signal_data = item['signal_data']
+                current_price = item['current_price']
+                
+                # Extract signal details
+                action = signal_data.get('action', 'HOLD')
+                entry_price = signal_data.get('entry_price', current_price)
+                stop_loss = signal_data.get('stop_loss', entry_price * 0.98)
+                
+                if action == 'HOLD':
+                    reasons[i] = ["HOLD signal - no validation needed"] * len(enabled)
+                    decisions.append((True, "HOLD signal - no validation needed"))
+                    continue
+                
+                # Direction
+                is_long = action == 'BUY'
+                
+                logger.info(f"🔍 [{symbol}] Advanced Screening: {action} @ ₹{entry_price:.2f}")
+                
+                inputs = self._screening_inputs(symbol, item['df'])
+                
+                # Same bar, same signal: reuse the bar-level verdicts of an earlier call
+                signal_key = (action, entry_price, stop_loss, signal_data.get('target'))
+                verdicts = inputs.verdicts.get(signal_key)
+                if verdicts is None:
+                    verdicts = inputs.verdicts[signal_key] = {}
+                    self.verdict_misses += 1
+                else:
+                    self.verdict_hits += 1
+                
+                decision = None
+                for j, (flag, _, prefix) in enumerate(enabled):
+                    if flag in verdicts:
+                        ok, reason = verdicts[flag]
+                    elif flag == 'enable_ma_crossover':
+                        ok, reason = self._check_ma_crossover(inputs, is_long)
+                    elif flag == 'enable_bb_squeeze':
+                        ok, reason = self._check_bb_squeeze(inputs, is_long)
+                    elif flag == 'enable_var_limit':
+                        ok, reason = self._check_var_limit(symbol, entry_price, stop_loss, current_positions)
+                    elif flag == 'enable_sr_confluence':
+                        ok, reason = self._check_sr_confluence(inputs, entry_price, stop_loss, is_long)
+                    elif flag == 'enable_gap_analysis':
+                        ok, reason = self._check_gap_levels(inputs, entry_price, is_long)
+                    elif flag == 'enable_nrb_trigger':
+                        ok, reason = self._check_nrb_pattern(inputs)
+                    elif flag == 'enable_tick_indicator':
+                        if is_long not in tick_verdicts:
+                            tick_verdicts[is_long] = self._check_tick_indicator(is_long)
+                        ok, reason = tick_verdicts[is_long]
+                    elif flag == 'enable_ml_filter':
+                        ok, reason = self._check_ml_prediction(inputs, signal_data, is_long)
+                    else:
+                        ok, reason = self._check_retest_opportunity(inputs, is_long)
+                    if flag not in LIVE_LEVELS:
+                        verdicts[flag] = (ok, reason)
+                    
+                    passed[i, j] = ok
+                    reasons[i][j] = reason
+                    # First failing level decides, as in sequential screening
+                    if not ok and decision is None:
+                        decision = self._handle_failure(f"{prefix}: {reason}", critical=flag in CRITICAL_LEVELS)
+                
+                if decision is None:
+                    # ========== ALL CHECKS PASSED ==========
+                    logger.info(f"✅ [{symbol}] Advanced Screening PASSED - All enabled levels cleared")
+                    decision = (True, "PASSED")
+                
+            except Exception as e:
+                logger.error(f"Error in advanced screening for {symbol}: {e}", exc_info=True)
+                if self.config.fail_safe_mode:
+                    logger.warning(f"⚠️ [{symbol}] Screening error in fail-safe mode - ALLOWING trade")
+                    decision = (True, f"PASSED (fail-safe: {str(e)})")
+                else:
+                    decision = (False, f"Screening error: {str(e)}")
+            
+            decisions.append(decision)
+        
+        result = ScreeningBatch([item['symbol'] for item in batch], [label for _, label, _ in enabled],
+                                passed, reasons, decisions)
+        if len(batch) > 1:
+            logger.info(f"🔍 Advanced Screening batch: {int(result.valid.sum())}/{len(batch)} signals passed "
+                       f"({', '.join(f'{level} {count}' for level, count in result.level_pass_counts().items())})")
+        return result
+    
+    def check_var_limit(self, symbol: str, signal_data: Dict, current_positions: Dict) -> Tuple[bool, str]:
+        """
+        Level 15 (VaR) for a screened signal about to be placed, against the
+        positions open now (including orders placed since its batch was screened).
+        
+        Returns:
+            Tuple[bool, str]: (is_valid, reason) - a breach blocks even in fail-safe mode
+        """
+        if not self.config.enable_var_limit or signal_data.get('action', 'HOLD') == 'HOLD':
+            return True, "VaR check not applicable"
+        entry_price = signal_data['entry_price']
+        stop_loss = signal_data.get('stop_loss', entry_price * 0.98)
+        ok, reason = self._check_var_limit(symbol, entry_price, stop_loss, current_positions)
+        if ok:
+            return True, reason
+        return self._handle_failure(f"Level 15 - VaR: {reason}", critical=True)
+    
+    def _screening_inputs(self, symbol: str, df: pd.DataFrame) -> ScreeningInputs:
+        """Level inputs of a symbol at its last bar (cached until the bar changes)."""
+        enabled = tuple(getattr(self.config, flag) for flag, _, _ in SCREENING_LEVELS)
+        key = (len(df), df.index[-1], float(df['Close'].iloc[-1]), enabled) if len(df) else (0, None, None, enabled)
+        inputs = self._inputs.get(symbol)
+        if inputs is not None and inputs.key == key:
+            return inputs
+        
+        inputs = ScreeningInputs(key)
+        inputs.close = key[2]
+        builders = (
+            ('ma', self.config.enable_ma_crossover, self._ma_inputs),
+            ('bb_widths', self.config.enable_bb_squeeze, self._bb_inputs),
+            ('sr_levels', self.config.enable_sr_confluence, self._sr_inputs),
+            ('gaps', self.config.enable_gap_analysis, self._gap_inputs),
+            ('nrb', self.config.enable_nrb_trigger, self._nrb_inputs),
+            ('ml', self.config.enable_ml_filter, self._ml_inputs),
+            ('recent_range', self.config.enable_retest_logic, self._retest_inputs),
+        )
+        for field, enabled, build in builders:
+            if not enabled:
+                continue
+            try:
+                setattr(inputs, field, build(symbol, df))
+            except Exception as e:
+                inputs.errors[field] = str(e)
+        
+        self._inputs[symbol] = inputs
+        return inputs
     
     def _handle_failure(self, reason: str, critical: bool = False) -> Tuple[bool, str]:
         """
@@ -270,7 +427,23 @@ class AdvancedScreeningManager:
     # LEVEL IMPLEMENTATIONS
     # ========================================================================
     
-    def _check_ma_crossover(self, df: pd.DataFrame, is_long: bool) -> Tuple[bool, str]:
+    def _ma_inputs(self, symbol: str, df: pd.DataFrame) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Level 5 inputs: fast / slow EMA over the crossover lookback (None if too little data)."""
+        if len(df) < self.config.slow_ma_period + self.config.crossover_lookback:
+            return None
+        
+        # Calculate MAs (use EMA for responsiveness)
+        if self.indicator_cache is not None and symbol:
+            fast_ma = self.indicator_cache.ema(symbol, df, self.config.fast_ma_period)
+            slow_ma = self.indicator_cache.ema(symbol, df, self.config.slow_ma_period)
+        else:
+            fast_ma = df['Close'].ewm(span=self.config.fast_ma_period, adjust=False).mean().to_numpy()
+            slow_ma = df['Close'].ewm(span=self.config.slow_ma_period, adjust=False).mean().to_numpy()
+        
+        lookback = self.config.crossover_lookback
+        return np.asarray(fast_ma[-lookback:], dtype=float), np.asarray(slow_ma[-lookback:], dtype=float)
+    
+    def _check_ma_crossover(self, inputs: ScreeningInputs, is_long: bool) -> Tuple[bool, str]:
         """
         Level 5: Dual MA Crossover Detection
         
@@ -281,33 +454,26 @@ class AdvancedScreeningManager:
         - SELL: Fast MA recently crossed BELOW Slow MA and remains below
         """
         try:
-            if len(df) < self.config.slow_ma_period + self.config.crossover_lookback:
+            if 'ma' in inputs.errors:
+                raise ValueError(inputs.errors['ma'])
+            if inputs.ma is None:
                 return True, "Insufficient data for MA crossover check"
             
-            # Calculate MAs (use EMA for responsiveness)
-            fast_ma = df['Close'].ewm(span=self.config.fast_ma_period, adjust=False).mean()
-            slow_ma = df['Close'].ewm(span=self.config.slow_ma_period, adjust=False).mean()
+            fast_lookback, slow_lookback = inputs.ma
             
             # Current alignment
-            current_fast = fast_ma.iloc[-1]
-            current_slow = slow_ma.iloc[-1]
+            current_fast = fast_lookback[-1]
+            current_slow = slow_lookback[-1]
             
             if is_long:
                 # Check if fast MA is above slow MA
                 if current_fast <= current_slow:
                     return False, f"Fast MA (₹{current_fast:.2f}) below Slow MA (₹{current_slow:.2f}) - bearish alignment"
                 
-                # Check for recent bullish crossover in last N bars
-                lookback_df = df.tail(self.config.crossover_lookback)
-                fast_lookback = fast_ma.tail(self.config.crossover_lookback)
-                slow_lookback = slow_ma.tail(self.config.crossover_lookback)
-                
-                # Was there a crossover? (fast was below, now above)
-                had_crossover = any(
-                    (fast_lookback.iloc[i-1] <= slow_lookback.iloc[i-1]) and 
-                    (fast_lookback.iloc[i] > slow_lookback.iloc[i])
-                    for i in range(1, len(fast_lookback))
-                )
+                # Was there a crossover in the last N bars? (fast was below, now above)
+                had_crossover = bool(np.any(
+                    (fast_lookback[:-1] <= slow_lookback[:-1]) & (fast_lookback[1:] > slow_lookback[1:])
+                ))
                 
                 if not had_crossover:
                     # No recent crossover, but check if already in strong uptrend
@@ -321,15 +487,9 @@ class AdvancedScreeningManager:
                 if current_fast >= current_slow:
                     return False, f"Fast MA (₹{current_fast:.2f}) above Slow MA (₹{current_slow:.2f}) - bullish alignment"
                 
-                lookback_df = df.tail(self.config.crossover_lookback)
-                fast_lookback = fast_ma.tail(self.config.crossover_lookback)
-                slow_lookback = slow_ma.tail(self.config.crossover_lookback)
-                
-                had_crossover = any(
-                    (fast_lookback.iloc[i-1] >= slow_lookback.iloc[i-1]) and 
-                    (fast_lookback.iloc[i] < slow_lookback.iloc[i])
-                    for i in range(1, len(fast_lookback))
-                )
+                had_crossover = bool(np.any(
+                    (fast_lookback[:-1] >= slow_lookback[:-1]) & (fast_lookback[1:] < slow_lookback[1:])
+                ))
                 
                 if not had_crossover:
                     distance_percent = ((current_slow - current_fast) / current_slow) * 100
@@ -342,7 +502,13 @@ class AdvancedScreeningManager:
             logger.error(f"Error in MA crossover check: {e}")
             return True, f"MA crossover check error (passed): {str(e)}"
     
-    def _check_bb_squeeze(self, df: pd.DataFrame, is_long: bool) -> Tuple[bool, str]:
+    def _bb_inputs(self, symbol: str, df: pd.DataFrame) -> Optional[np.ndarray]:
+        """Level 14 inputs: bb_width of the last 5 bars (None if not available)."""
+        if 'bb_width' not in df.columns or 'bb_position' not in df.columns:
+            return None
+        return df['bb_width'].tail(5).to_numpy(dtype=float)
+    
+    def _check_bb_squeeze(self, inputs: ScreeningInputs, is_long: bool) -> Tuple[bool, str]:
         """
         Level 14: Bollinger Band Squeeze Detection
         
@@ -350,19 +516,21 @@ class AdvancedScreeningManager:
         Trade should occur AFTER squeeze (during expansion).
         """
         try:
-            if 'bb_width' not in df.columns or 'bb_position' not in df.columns:
+            if 'bb_widths' in inputs.errors:
+                raise ValueError(inputs.errors['bb_widths'])
+            if inputs.bb_widths is None:
                 return True, "BB indicators not available"
             
-            current_bb_width = df['bb_width'].iloc[-1]
+            recent_widths = inputs.bb_widths
+            current_bb_width = recent_widths[-1]
             
             # Check if currently in squeeze (too tight - avoid)
             if current_bb_width < self.config.bb_squeeze_threshold:
                 return False, f"BB Squeeze active (width: {current_bb_width:.4f}) - awaiting expansion"
             
             # Check if recently expanded from squeeze (ideal)
-            if len(df) >= 5:
-                recent_widths = df['bb_width'].tail(5)
-                was_squeezed = any(w < self.config.bb_squeeze_threshold for w in recent_widths[:-1])
+            if len(recent_widths) >= 5:
+                was_squeezed = bool(np.any(recent_widths[:-1] < self.config.bb_squeeze_threshold))
                 is_expanding = current_bb_width > self.config.bb_squeeze_threshold
                 
                 if was_squeezed and is_expanding:
@@ -425,7 +593,20 @@ class AdvancedScreeningManager:
             # VaR is CRITICAL - if calculation fails, block trade
             return False, f"VaR calculation error: {str(e)}"
     
-    def _check_sr_confluence(self, df: pd.DataFrame, entry_price: float, 
+    def _sr_inputs(self, symbol: str, df: pd.DataFrame):
+        """
+        Level 19 inputs: last S1, S2, R1, R2 columns if the frame has them, else
+        the symbol's SRLevels from the level book (None if neither is available).
+        """
+        if 'support_1' in df.columns and 'resistance_1' in df.columns:
+            return tuple(df[column].iloc[-1] for column in ('support_1', 'support_2', 'resistance_1', 'resistance_2'))
+        if self.sr_levels is not None:
+            levels = self.sr_levels.get(symbol)
+            if levels is not None and len(levels):
+                return levels
+        return None
+    
+    def _check_sr_confluence(self, inputs: ScreeningInputs, entry_price: float, 
                             stop_loss: float, is_long: bool) -> Tuple[bool, str]:
         """
         Level 19: Support/Resistance Confluence
@@ -436,23 +617,24 @@ class AdvancedScreeningManager:
         - BUY: Entry should be near support, stop below support
         - SELL: Entry should be near resistance, stop above resistance
         - Entry should NOT be at resistance (long) or support (short)
+        
+        With an S/R level index (pivots + intraday swings) the nearest level
+        overhead (long) / underneath (short) is found by binary search.
         """
         try:
-            if 'support_1' not in df.columns or 'resistance_1' not in df.columns:
+            if 'sr_levels' in inputs.errors:
+                raise ValueError(inputs.errors['sr_levels'])
+            if inputs.sr_levels is None:
                 return True, "S/R levels not available"
+            if not isinstance(inputs.sr_levels, tuple):
+                return self._check_sr_index(inputs.sr_levels, entry_price, is_long)
             
-            support_1 = df['support_1'].iloc[-1]
-            support_2 = df['support_2'].iloc[-1]
-            resistance_1 = df['resistance_1'].iloc[-1]
-            resistance_2 = df['resistance_2'].iloc[-1]
+            support_1, support_2, resistance_1, resistance_2 = inputs.sr_levels
             
             proximity_threshold = self.config.sr_proximity_percent / 100.0
             
             if is_long:
                 # Check if entry is too close to resistance (bad for longs)
-                dist_to_r1 = abs(entry_price - resistance_1) / entry_price
-                dist_to_r2 = abs(entry_price - resistance_2) / entry_price
-                
                 if entry_price > resistance_1 * (1 - proximity_threshold) and entry_price < resistance_1 * (1 + proximity_threshold):
                     return False, f"Entry too close to R1 (₹{resistance_1:.2f}) - likely rejection"
                 
@@ -481,50 +663,83 @@ class AdvancedScreeningManager:
             logger.error(f"Error in S/R confluence check: {e}")
             return True, f"S/R check error (passed): {str(e)}"
     
-    def _check_gap_levels(self, symbol: str, df: pd.DataFrame, 
-                         entry_price: float, is_long: bool) -> Tuple[bool, str]:
+    def _check_sr_index(self, levels, entry_price: float, is_long: bool) -> Tuple[bool, str]:
+        """Level 19 against a symbol's SRLevels (sorted pivots + swing highs/lows)."""
+        proximity_threshold = self.config.sr_proximity_percent / 100.0
+        
+        if is_long:
+            # First level overhead within the proximity band - likely rejection
+            above = levels.resistance_above(entry_price)
+            if above is not None and above[0] < entry_price * (1 + proximity_threshold):
+                return False, f"Entry too close to {above[1]} (₹{above[0]:.2f}) - likely rejection"
+            anchor = levels.support_below(entry_price)
+        else:
+            # First level underneath within the proximity band - likely bounce
+            below = levels.support_below(entry_price)
+            if below is not None and below[0] > entry_price * (1 - proximity_threshold):
+                return False, f"Entry too close to {below[1]} (₹{below[0]:.2f}) - likely bounce"
+            anchor = levels.resistance_above(entry_price)
+        
+        # Level behind the entry (support for longs, resistance for shorts) and its confluence
+        if anchor is None:
+            return True, "S/R confluence acceptable"
+        confluence = levels.count_within(anchor[0], self.config.sr_proximity_percent)
+        side = 'above' if is_long else 'below'
+        return True, (f"Entry {side} {anchor[1]} (₹{anchor[0]:.2f}, {confluence} level(s) in zone) "
+                      f"- good confluence")
+    
+    def _gap_inputs(self, symbol: str, df: pd.DataFrame) -> Optional[List[Tuple[float, str]]]:
+        """
+        Level 20 inputs: unfilled gaps in the last 20 bars as [(mid-gap level, 'up'/'down')]
+        (None if too little data).
+        """
+        if len(df) < 2:
+            return None
+        
+        # Detect gaps in recent data (last 20 bars)
+        recent_df = df.tail(20)
+        closes = recent_df['Close'].to_numpy(dtype=float)
+        opens = recent_df['Open'].to_numpy(dtype=float)
+        
+        # Lowest / highest close from each bar to the end (a gap is filled once a close crosses back)
+        lowest_after = np.fmin.accumulate(closes[::-1])[::-1]
+        highest_after = np.fmax.accumulate(closes[::-1])[::-1]
+        
+        gaps = []
+        for i in range(1, len(closes)):
+            prev_close = closes[i-1]
+            curr_open = opens[i]
+            
+            gap_percent = abs(curr_open - prev_close) / prev_close
+            
+            if gap_percent > (self.config.min_gap_percent / 100.0):
+                gap_type = 'up' if curr_open > prev_close else 'down'
+                gap_level = (prev_close + curr_open) / 2  # Mid-gap level
+                
+                # Check if gap is still unfilled
+                if gap_type == 'up':
+                    is_filled = lowest_after[i] < prev_close
+                else:
+                    is_filled = highest_after[i] > prev_close
+                
+                if not is_filled:
+                    gaps.append((gap_level, gap_type))
+        return gaps
+    
+    def _check_gap_levels(self, inputs: ScreeningInputs, entry_price: float, is_long: bool) -> Tuple[bool, str]:
         """
         Level 20: Gap Price Level Analysis
         
         Identifies unfilled gaps that act as support/resistance.
         """
         try:
-            if len(df) < 2:
+            if 'gaps' in inputs.errors:
+                raise ValueError(inputs.errors['gaps'])
+            if inputs.gaps is None:
                 return True, "Insufficient data for gap analysis"
             
-            # Detect gaps in recent data (last 20 bars)
-            recent_df = df.tail(20)
-            gaps_found = []
-            
-            for i in range(1, len(recent_df)):
-                prev_close = recent_df['Close'].iloc[i-1]
-                curr_open = recent_df['Open'].iloc[i]
-                
-                gap_percent = abs(curr_open - prev_close) / prev_close
-                
-                if gap_percent > (self.config.min_gap_percent / 100.0):
-                    gap_type = 'up' if curr_open > prev_close else 'down'
-                    gap_level = (prev_close + curr_open) / 2  # Mid-gap level
-                    
-                    # Check if gap is still unfilled
-                    subsequent_prices = recent_df['Close'].iloc[i:]
-                    if gap_type == 'up':
-                        is_filled = any(p < prev_close for p in subsequent_prices)
-                    else:
-                        is_filled = any(p > prev_close for p in subsequent_prices)
-                    
-                    if not is_filled:
-                        gaps_found.append({
-                            'level': gap_level,
-                            'type': gap_type,
-                            'percent': gap_percent * 100
-                        })
-            
             # Check if entry is near an unfilled gap
-            for gap in gaps_found:
-                gap_level = gap['level']
-                gap_type = gap['type']
-                
+            for gap_level, gap_type in inputs.gaps:
                 distance_percent = abs(entry_price - gap_level) / gap_level
                 
                 if distance_percent < 0.01:  # Within 1% of gap
@@ -540,47 +755,51 @@ class AdvancedScreeningManager:
             logger.error(f"Error in gap analysis: {e}")
             return True, f"Gap analysis error (passed): {str(e)}"
     
-    def _check_nrb_pattern(self, df: pd.DataFrame) -> Tuple[bool, str]:
+    def _nrb_inputs(self, symbol: str, df: pd.DataFrame) -> Tuple[bool, str]:
         """
         Level 21: Narrow Range Bar (NRB) Trigger
         
         Consolidation (narrow range) precedes breakouts.
         Trade should occur AFTER consolidation, not during.
+        
+        Depends on the bars only, so the verdict itself is the shared input.
         """
-        try:
-            if len(df) < self.config.nrb_lookback:
-                return True, "Insufficient data for NRB check"
-            
-            recent_df = df.tail(self.config.nrb_lookback)
-            
-            # Calculate bar ranges
-            ranges = (recent_df['High'] - recent_df['Low']) / recent_df['Close']
-            
-            # Current bar range
-            current_range = ranges.iloc[-1]
-            
-            # Narrow range threshold (20th percentile of recent ranges)
-            narrow_threshold = ranges.quantile(self.config.nrb_threshold_percentile / 100.0)
-            
-            # Check if currently in narrow range (avoid - awaiting breakout)
-            if current_range <= narrow_threshold:
-                return False, f"Narrow range bar detected ({current_range:.4f}) - awaiting breakout"
-            
-            # Check if recently broke out of narrow range (ideal)
-            if len(ranges) >= 3:
-                prev_ranges = ranges.iloc[-3:-1]
-                was_narrow = any(r <= narrow_threshold for r in prev_ranges)
-                is_expanding = current_range > narrow_threshold
-                
-                if was_narrow and is_expanding:
-                    return True, f"Breakout from narrow range detected - ideal entry"
-            
-            # Normal range - acceptable
-            return True, f"Bar range normal ({current_range:.4f})"
-            
-        except Exception as e:
-            logger.error(f"Error in NRB check: {e}")
-            return True, f"NRB check error (passed): {str(e)}"
+        if len(df) < self.config.nrb_lookback:
+            return True, "Insufficient data for NRB check"
+        
+        recent_df = df.tail(self.config.nrb_lookback)
+        
+        # Calculate bar ranges
+        ranges = (recent_df['High'] - recent_df['Low']) / recent_df['Close']
+        
+        # Current bar range
+        current_range = ranges.iloc[-1]
+        
+        # Narrow range threshold (20th percentile of recent ranges)
+        narrow_threshold = ranges.quantile(self.config.nrb_threshold_percentile / 100.0)
+        
+        # Check if currently in narrow range (avoid - awaiting breakout)
+        if current_range <= narrow_threshold:
+            return False, f"Narrow range bar detected ({current_range:.4f}) - awaiting breakout"
+        
+        # Check if recently broke out of narrow range (ideal)
+        if len(ranges) >= 3:
+            prev_ranges = ranges.iloc[-3:-1]
+            was_narrow = any(r <= narrow_threshold for r in prev_ranges)
+            is_expanding = current_range > narrow_threshold
+            
+            if was_narrow and is_expanding:
+                return True, f"Breakout from narrow range detected - ideal entry"
+        
+        # Normal range - acceptable
+        return True, f"Bar range normal ({current_range:.4f})"
+    
+    def _check_nrb_pattern(self, inputs: ScreeningInputs) -> Tuple[bool, str]:
+        """Level 21: Narrow Range Bar (NRB) Trigger (verdict computed once per bar by _nrb_inputs)"""
+        if 'nrb' in inputs.errors:
+            logger.error(f"Error in NRB check: {inputs.errors['nrb']}")
+            return True, f"NRB check error (passed): {inputs.errors['nrb']}"
+        return inputs.nrb
     
     def _check_tick_indicator(self, is_long: bool) -> Tuple[bool, str]:
         """
@@ -737,8 +956,28 @@ class AdvancedScreeningManager:
         
         logger.debug(f"TICK updated: {advancing}/{declining}/{unchanged} = {tick_signal} ({tick_ratio:+.2f})")
     
-    def _check_ml_prediction(self, symbol: str, df: pd.DataFrame, 
-                            signal_data: Dict, is_long: bool) -> Tuple[bool, str]:
+    def _ml_inputs(self, symbol: str, df: pd.DataFrame) -> Dict[str, Any]:
+        """Level 23 inputs: last-bar values of the heuristic score components (None if unavailable)."""
+        price = df['Close'].iloc[-1]
+        ml = {'price': price, 'trend': None, 'rsi': None, 'vol_ratio': None, 'atr_pct': None}
+        
+        if 'sma_10' in df.columns and 'sma_50' in df.columns and len(df) >= 50:
+            ml['trend'] = (df['sma_10'].iloc[-1], df['sma_50'].iloc[-1])
+        
+        if 'rsi' in df.columns:
+            ml['rsi'] = df['rsi'].iloc[-1]
+        
+        if 'volume' in df.columns and len(df) >= 20:
+            current_vol = df['Volume'].iloc[-1]
+            avg_vol = df['Volume'].tail(20).mean()
+            ml['vol_ratio'] = current_vol / avg_vol if avg_vol > 0 else 1.0
+        
+        if 'atr' in df.columns:
+            ml['atr_pct'] = (df['atr'].iloc[-1] / price) * 100
+        
+        return ml
+    
+    def _check_ml_prediction(self, inputs: ScreeningInputs, signal_data: Dict, is_long: bool) -> Tuple[bool, str]:
         """
         Level 23: ML Prediction Filter
         
@@ -748,14 +987,17 @@ class AdvancedScreeningManager:
         Scores multiple dimensions and requires minimum confidence.
         """
         try:
+            if 'ml' in inputs.errors:
+                raise ValueError(inputs.errors['ml'])
+            ml = inputs.ml
+            price = ml['price']
+            
             # Score different aspects (0-100 each)
             scores = {}
             
             # 1. Trend Score (0-100)
-            if 'sma_10' in df.columns and 'sma_50' in df.columns and len(df) >= 50:
-                sma_10 = df['sma_10'].iloc[-1]
-                sma_50 = df['sma_50'].iloc[-1]
-                price = df['Close'].iloc[-1]
+            if ml['trend'] is not None:
+                sma_10, sma_50 = ml['trend']
                 
                 if is_long:
                     # For longs: price > 10 SMA > 50 SMA is ideal
@@ -777,8 +1019,8 @@ class AdvancedScreeningManager:
                 scores['trend'] = 50  # Neutral if no data
             
             # 2. Momentum Score (0-100)
-            if 'rsi' in df.columns:
-                rsi = df['rsi'].iloc[-1]
+            if ml['rsi'] is not None:
+                rsi = ml['rsi']
                 if is_long:
                     # For longs: RSI 50-70 is ideal (strong but not overbought)
                     if 50 <= rsi <= 70:
@@ -803,10 +1045,8 @@ class AdvancedScreeningManager:
                 scores['momentum'] = 50
             
             # 3. Volume Score (0-100)
-            if 'volume' in df.columns and len(df) >= 20:
-                current_vol = df['Volume'].iloc[-1]
-                avg_vol = df['Volume'].tail(20).mean()
-                vol_ratio = current_vol / avg_vol if avg_vol > 0 else 1.0
+            if ml['vol_ratio'] is not None:
+                vol_ratio = ml['vol_ratio']
                 
                 # Higher volume is generally better
                 if vol_ratio > 2.0:
@@ -821,10 +1061,8 @@ class AdvancedScreeningManager:
                 scores['Volume'] = 50
             
             # 4. Volatility Score (0-100)
-            if 'atr' in df.columns:
-                atr = df['atr'].iloc[-1]
-                price = df['Close'].iloc[-1]
-                atr_pct = (atr / price) * 100
+            if ml['atr_pct'] is not None:
+                atr_pct = ml['atr_pct']
                 
                 # Moderate volatility is best (1-3%)
                 if 1.0 <= atr_pct <= 3.0:
@@ -839,7 +1077,7 @@ class AdvancedScreeningManager:
                 scores['volatility'] = 50
             
             # 5. Risk/Reward Score (0-100)
-            entry = signal_data.get('entry_price', df['Close'].iloc[-1])
+            entry = signal_data.get('entry_price', price)
             stop = signal_data.get('stop_loss', entry * 0.97)
             target = signal_data.get('target', entry * 1.05)
             
@@ -876,8 +1114,13 @@ class AdvancedScreeningManager:
             logger.error(f"Error in ML prediction check: {e}")
             return True, f"ML check error (passed): {str(e)}"
     
-    def _check_retest_opportunity(self, symbol: str, df: pd.DataFrame, 
-                                  entry_price: float, is_long: bool) -> Tuple[bool, str]:
+    def _retest_inputs(self, symbol: str, df: pd.DataFrame) -> Optional[Tuple[float, float]]:
+        """Level 24 inputs: high / low of the last 5 bars (None if too little data)."""
+        if len(df) < 5:
+            return None
+        return df['High'].tail(5).max(), df['Low'].tail(5).min()
+    
+    def _check_retest_opportunity(self, inputs: ScreeningInputs, is_long: bool) -> Tuple[bool, str]:
         """
         Level 24: Imbalance Retest Execution
         
@@ -890,18 +1133,18 @@ class AdvancedScreeningManager:
         - If price is spiking away from breakout level, BLOCK entry
         """
         try:
-            if len(df) < 5:
+            if 'recent_range' in inputs.errors:
+                raise ValueError(inputs.errors['recent_range'])
+            if inputs.recent_range is None:
                 return True, "Insufficient data for retest check"
             
-            # Get recent price action
-            recent_highs = df['High'].tail(5)
-            recent_lows = df['Low'].tail(5)
-            current_close = df['Close'].iloc[-1]
+            # Recent price action (potential breakout levels: recent swing highs/lows)
+            recent_high, recent_low = inputs.recent_range
+            current_close = inputs.close
             
-            # Identify potential breakout levels (recent swing highs/lows)
             if is_long:
                 # Check if we're retesting a recent breakout high
-                breakout_level = recent_highs.max()
+                breakout_level = recent_high
                 
                 # Is current price near the breakout level? (good - retest)
                 distance_from_breakout = (current_close - breakout_level) / breakout_level
@@ -915,7 +1158,7 @@ class AdvancedScreeningManager:
                 
             else:  # SELL
                 # Check if we're retesting a recent breakdown low
-                breakout_level = recent_lows.min()
+                breakout_level = recent_low
                 
                 distance_from_breakout = (breakout_level - current_close) / breakout_level
                 
@@ -962,5 +1205,8 @@ class AdvancedScreeningManager:
             'max_var_percent': self.config.max_portfolio_var_percent,
             'tracked_breakouts': len(self.breakout_levels),
             'tracked_gaps': sum(len(gaps) for gaps in self.gap_levels.values()),
+            'cached_symbol_inputs': len(self._inputs),
+            'verdict_hits': self.verdict_hits,
+            'verdict_misses': self.verdict_misses,
         }
 
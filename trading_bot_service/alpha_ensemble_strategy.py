@@ -21,9 +21,11 @@ logger = logging.getLogger(__name__)
 class AlphaEnsembleStrategy:
     """Alpha-Ensemble Strategy with Market Regime & Retest Logic"""
     
-    def __init__(self, api_key: str, jwt_token: str, strategy_params: Optional[Dict] = None):
+    def __init__(self, api_key: str, jwt_token: str, strategy_params: Optional[Dict] = None,
+                 indicator_cache=None):
         self.api_key = api_key
         self.jwt_token = jwt_token
+        self.indicator_cache = indicator_cache  # Shared IndicatorCache for the realtime fallback indicators
         
         # Load strategy parameters (use provided params or optimized defaults)
         params = strategy_params or {}
@@ -31,6 +33,7 @@ class AlphaEnsembleStrategy:
         # ===== LAYER 1: MARKET REGIME FILTERS (RELAXED FOR TESTING) =====
         self.NIFTY_ALIGNMENT_THRESHOLD = params.get('nifty_alignment', 0.0)  # 0.0 = No filter (RELAXED)
         self.VIX_MAX_THRESHOLD = params.get('vix_max', 35.0)  # 35.0 = Allow high volatility (RELAXED)
+        self.LIVE_NIFTY_FILTER = params.get('live_nifty_filter', False)  # Realtime skips Layer 1 unless enabled
         
         # ===== LAYER 2: TREND & RETEST LOGIC =====
         self.EMA_200_PERIOD = 200
@@ -367,6 +370,13 @@ class AlphaEnsembleStrategy:
         
         nifty_change_pct = ((current_price - market_open) / market_open) * 100
         
+        return self.check_nifty_alignment(nifty_change_pct, trade_direction)
+    
+    def check_nifty_alignment(self, nifty_change_pct: float, trade_direction: str) -> Tuple[bool, str]:
+        """
+        Nifty day change (% from the 9:15 open) must agree with the trade direction.
+        Shared by the backtest (check_market_regime) and realtime analysis.
+        """
         # Check Nifty alignment
         if trade_direction == 'LONG':
             if nifty_change_pct < self.NIFTY_ALIGNMENT_THRESHOLD:
@@ -845,16 +855,96 @@ class AlphaEnsembleStrategy:
             'profit_factor': profit_factor
         }
     
-    def analyze_symbol(self, df: pd.DataFrame, symbol: str, current_price: float) -> Optional[Dict]:
+    def _latest_indicators(self, df: pd.DataFrame, trend_df: Optional[pd.DataFrame] = None,
+                           symbol: Optional[str] = None) -> Dict:
+        """
+        Last-bar indicator values for analyze_symbol, computed with `ta` on one
+        symbol (through the shared IndicatorCache when there is one, so each
+        value is computed at most once per bar).
+        """
+        if self.indicator_cache is not None and symbol:
+            return self._cached_indicators(symbol, df, trend_df)
+        
+        df_copy = df.copy()
+        
+        # EMAs
+        if trend_df is not None:
+            trend_ema_200 = ta.trend.EMAIndicator(close=trend_df['Close'], window=200).ema_indicator().iloc[-1]
+        else:
+            df_copy['EMA_200'] = ta.trend.EMAIndicator(close=df_copy['Close'], window=200).ema_indicator()
+        df_copy['EMA_20'] = ta.trend.EMAIndicator(close=df_copy['Close'], window=20).ema_indicator()
+        df_copy['EMA_50'] = ta.trend.EMAIndicator(close=df_copy['Close'], window=50).ema_indicator()
+        
+        # ADX
+        adx_indicator = ta.trend.ADXIndicator(high=df_copy['High'], low=df_copy['Low'], close=df_copy['Close'], window=self.ADX_PERIOD)
+        df_copy['ADX'] = adx_indicator.adx()
+        
+        # RSI
+        df_copy['RSI'] = ta.momentum.RSIIndicator(close=df_copy['Close'], window=self.RSI_PERIOD).rsi()
+        
+        # ATR
+        df_copy['ATR'] = ta.volatility.AverageTrueRange(high=df_copy['High'], low=df_copy['Low'], close=df_copy['Close'], window=self.ATR_PERIOD).average_true_range()
+        
+        # Volume SMA
+        df_copy['Volume_SMA'] = df_copy['Volume'].rolling(window=20).mean()
+        
+        latest = df_copy.iloc[-1]
+        return {
+            'EMA_200': trend_ema_200 if trend_df is not None else latest['EMA_200'],
+            'EMA_20': latest['EMA_20'],
+            'EMA_50': latest['EMA_50'],
+            'ADX': latest['ADX'],
+            'RSI': latest['RSI'],
+            'ATR': latest['ATR'],
+            'Volume': latest['Volume'],
+            'Volume_SMA': latest['Volume_SMA'],
+        }
+    
+    def _cached_indicators(self, symbol: str, df: pd.DataFrame, trend_df: Optional[pd.DataFrame]) -> Dict:
+        """_latest_indicators values from the IndicatorCache (same formulas as `ta`)."""
+        cache = self.indicator_cache
+        timeframe = '5m' if trend_df is not None else '1m'  # Execution bars, as passed by the engine
+        if trend_df is not None:
+            ema_200 = cache.ema(symbol, trend_df, 200, timeframe='15m')[-1]
+        else:
+            ema_200 = cache.ema(symbol, df, 200, timeframe=timeframe)[-1]
+        return {
+            'EMA_200': ema_200,
+            'EMA_20': cache.ema(symbol, df, 20, timeframe=timeframe)[-1],
+            'EMA_50': cache.ema(symbol, df, 50, timeframe=timeframe)[-1],
+            'ADX': cache.adx(symbol, df, self.ADX_PERIOD, timeframe=timeframe)[-1],
+            'RSI': cache.rsi(symbol, df, self.RSI_PERIOD, timeframe=timeframe)[-1],
+            'ATR': cache.atr(symbol, df, self.ATR_PERIOD, timeframe=timeframe)[-1],
+            'Volume': df['Volume'].iloc[-1],
+            'Volume_SMA': cache.sma(symbol, df, 20, column='Volume', timeframe=timeframe)[-1],
+        }
+    
+    def analyze_symbol(self, df: pd.DataFrame, symbol: str, current_price: float,
+                       trend_df: Optional[pd.DataFrame] = None,
+                       indicators: Optional[Dict] = None,
+                       nifty_change_pct: Optional[float] = None) -> Optional[Dict]:
         """
         Real-time symbol analysis for Alpha-Ensemble strategy.
         
         Applies multi-layer filtering:
-        - Layer 1: Market regime (skip for realtime - assumes user monitors)
+        - Layer 1: Market regime (skip for realtime - assumes user monitors;
+          Nifty alignment only when LIVE_NIFTY_FILTER is enabled)
         - Layer 2: Trend filters (EMA 200, EMA 20)
         - Layer 3: Execution filters (ADX, RSI, Volume)
         - Layer 4: Risk management (ATR-based stops, 2.5:1 R:R)
         
+        Args:
+            df: Execution bars (5-minute, or 1-minute when no trend_df)
+            symbol: Trading symbol
+            current_price: Latest traded price
+            trend_df: Higher-timeframe bars for EMA200 (15-minute, as in the backtest).
+                If None, EMA200 is computed on df.
+            indicators: Precomputed last-bar values (EMA_200, EMA_20, EMA_50, ADX,
+                RSI, ATR, Volume, Volume_SMA), e.g. from IndicatorPanel.latest().
+                If None, they are computed from df / trend_df with `ta`.
+            nifty_change_pct: Nifty day change from the engine's shared regime state.
+                Used only when LIVE_NIFTY_FILTER is enabled (skipped if None).
+        
         Returns:
             Dict with action (BUY/SELL/HOLD), entry, stop, target, score
             None if analysis fails or symbol should be skipped
@@ -869,43 +959,25 @@ class AlphaEnsembleStrategy:
             if current_time < self.SESSION_START_TIME or current_time > self.SESSION_END_TIME:
                 return None
             
-            # Need at least 200 candles for EMA200
-            if len(df) < 200:
+            # Need at least 200 candles for EMA200 (and 50 execution bars for EMA50)
+            if trend_df is not None:
+                if len(trend_df) < 200 or len(df) < 50:
+                    return None
+            elif len(df) < 200:
                 return None
             
-            # Calculate all required indicators
-            df_copy = df.copy()
-            
-            # EMAs
-            df_copy['EMA_200'] = ta.trend.EMAIndicator(close=df_copy['Close'], window=200).ema_indicator()
-            df_copy['EMA_20'] = ta.trend.EMAIndicator(close=df_copy['Close'], window=20).ema_indicator()
-            df_copy['EMA_50'] = ta.trend.EMAIndicator(close=df_copy['Close'], window=50).ema_indicator()
-            
-            # ADX
-            adx_indicator = ta.trend.ADXIndicator(high=df_copy['High'], low=df_copy['Low'], close=df_copy['Close'], window=self.ADX_PERIOD)
-            df_copy['ADX'] = adx_indicator.adx()
-            
-            # RSI
-            df_copy['RSI'] = ta.momentum.RSIIndicator(close=df_copy['Close'], window=self.RSI_PERIOD).rsi()
-            
-            # ATR
-            df_copy['ATR'] = ta.volatility.AverageTrueRange(high=df_copy['High'], low=df_copy['Low'], close=df_copy['Close'], window=self.ATR_PERIOD).average_true_range()
-            
-            # Volume SMA
-            df_copy['Volume_SMA'] = df_copy['Volume'].rolling(window=20).mean()
+            # Latest indicator values (precomputed for the whole universe, or per symbol here)
+            if indicators is None:
+                indicators = self._latest_indicators(df, trend_df, symbol)
             
-            # Get latest values
-            latest = df_copy.iloc[-1]
-            prev = df_copy.iloc[-2]
-            
-            ema_200 = latest['EMA_200']
-            ema_20 = latest['EMA_20']
-            ema_50 = latest['EMA_50']
-            adx = latest['ADX']
-            rsi = latest['RSI']
-            atr = latest['ATR']
-            volume = latest['Volume']
-            volume_sma = latest['Volume_SMA']
+            ema_200 = indicators['EMA_200']
+            ema_20 = indicators['EMA_20']
+            ema_50 = indicators['EMA_50']
+            adx = indicators['ADX']
+            rsi = indicators['RSI']
+            atr = indicators['ATR']
+            volume = indicators['Volume']
+            volume_sma = indicators['Volume_SMA']
             
             # Check for NaN values
             if pd.isna(ema_200) or pd.isna(ema_20) or pd.isna(adx) or pd.isna(rsi) or pd.isna(atr):
@@ -957,6 +1029,15 @@ class AlphaEnsembleStrategy:
             if atr_percent < self.ATR_MIN_PERCENT or atr_percent > self.ATR_MAX_PERCENT:
                 return None  # Volatility outside acceptable range
             
+            # ===== LAYER 1: MARKET REGIME =====
+            
+            # Opt-in: Nifty must move in the trade direction (same filter as the backtest)
+            if self.LIVE_NIFTY_FILTER and nifty_change_pct is not None:
+                regime_passed, _ = self.check_nifty_alignment(
+                    nifty_change_pct, 'LONG' if trade_direction == 'BUY' else 'SHORT')
+                if not regime_passed:
+                    return None
+            
             # ===== LAYER 4: RISK MANAGEMENT =====
             
             # Calculate stop loss (ATR-based)
@@ -0,0 +1,136 @@
+"""
+Micro-benchmark: WebSocket binary tick decoding throughput
+Compares the original per-field struct.unpack_from parser with the precompiled
+decoder (single packets and NumPy batch) on synthetic LTP / Quote / SnapQuote packets.
+
+Usage: python benchmark_tick_decoder.py [packets]
+"""
+
+import struct
+import sys
+import time
+
+from ws_manager.tick_decoder import (
+    LTP_STRUCT, QUOTE_STRUCT, SNAP_QUOTE_STRUCT,
+    MODE_LTP, MODE_QUOTE, MODE_SNAP_QUOTE,
+    decode_tick, decode_batch,
+)
+
+
+def legacy_parse_binary_tick(data: bytes) -> dict:
+    """Original AngelWebSocketV2Manager._parse_binary_tick (baseline)."""
+    offset = 0
+    mode = struct.unpack_from('<B', data, offset)[0]
+    offset += 1
+    exchange_type = struct.unpack_from('<B', data, offset)[0]
+    offset += 1
+    token_bytes = struct.unpack_from('<25s', data, offset)[0]
+    token = token_bytes.decode('utf-8').rstrip('\x00')
+    offset += 25
+    sequence = struct.unpack_from('<q', data, offset)[0]
+    offset += 8
+    timestamp = struct.unpack_from('<q', data, offset)[0]
+    offset += 8
+    ltp = struct.unpack_from('<q', data, offset)[0] / 100.0
+    offset += 8
+    tick = {'mode': mode, 'exchange_type': exchange_type, 'token': token,
+            'sequence': sequence, 'timestamp': timestamp, 'ltp': ltp}
+    if mode == MODE_LTP:
+        return tick
+    if len(data) >= 123:
+        tick['last_traded_qty'] = struct.unpack_from('<q', data, offset)[0]
+        offset += 8
+        tick['avg_traded_price'] = struct.unpack_from('<q', data, offset)[0] / 100.0
+        offset += 8
+        tick['volume'] = struct.unpack_from('<q', data, offset)[0]
+        offset += 8
+        tick['total_buy_qty'] = struct.unpack_from('<d', data, offset)[0]
+        offset += 8
+        tick['total_sell_qty'] = struct.unpack_from('<d', data, offset)[0]
+        offset += 8
+        tick['open'] = struct.unpack_from('<q', data, offset)[0] / 100.0
+        offset += 8
+        tick['high'] = struct.unpack_from('<q', data, offset)[0] / 100.0
+        offset += 8
+        tick['low'] = struct.unpack_from('<q', data, offset)[0] / 100.0
+        offset += 8
+        tick['close'] = struct.unpack_from('<q', data, offset)[0] / 100.0
+        offset += 8
+    if mode == MODE_QUOTE:
+        return tick
+    if len(data) >= 379:
+        tick['last_traded_timestamp'] = struct.unpack_from('<q', data, offset)[0]
+        offset += 8
+        tick['open_interest'] = struct.unpack_from('<q', data, offset)[0]
+        offset += 8
+        offset += 8
+        offset += 200
+        tick['upper_circuit'] = struct.unpack_from('<q', data, offset)[0] / 100.0
+        offset += 8
+        tick['lower_circuit'] = struct.unpack_from('<q', data, offset)[0] / 100.0
+        offset += 8
+        tick['52_week_high'] = struct.unpack_from('<q', data, offset)[0] / 100.0
+        offset += 8
+        tick['52_week_low'] = struct.unpack_from('<q', data, offset)[0] / 100.0
+    return tick
+
+
+def make_packets(count: int, mode: int) -> list:
+    """Synthetic packets for 200 tokens with realistic field values."""
+    packets = []
+    ts = 1_700_000_000_000
+    for i in range(count):
+        token = str(1000 + i % 200).encode()
+        header = (mode, 1, token, i, ts + i * 5, 250_000 + i % 500)
+        if mode == MODE_LTP:
+            packets.append(LTP_STRUCT.pack(*header))
+            continue
+        quote = (10, 250_010, 1_000_000 + i, 5e5, 4e5, 249_000, 251_000, 248_500, 249_500)
+        if mode == MODE_QUOTE:
+            packets.append(QUOTE_STRUCT.pack(*header, *quote))
+        else:
+            snap = (ts, 12_345, 0, 270_000, 220_000, 300_000, 180_000)
+            packets.append(SNAP_QUOTE_STRUCT.pack(*header, *quote, *snap))
+    return packets
+
+
+def measure(label: str, func, packets: list, batch: bool = False) -> float:
+    start = time.perf_counter()
+    if batch:
+        func(packets)
+    else:
+        for packet in packets:
+            func(packet)
+    elapsed = time.perf_counter() - start
+    rate = len(packets) / elapsed
+    print(f"   {label:<28} {rate:>14,.0f} ticks/s")
+    return rate
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    print("\n" + "=" * 80)
+    print(f"⚡ TICK DECODER BENCHMARK ({count:,} packets per mode)")
+    print("=" * 80)
+
+    for mode, name in ((MODE_LTP, 'LTP (51 B)'), (MODE_QUOTE, 'Quote (123 B)'),
+                       (MODE_SNAP_QUOTE, 'SnapQuote (379 B)')):
+        packets = make_packets(count, mode)
+
+        # Sanity check: both decoders agree
+        decoded = decode_tick(packets[-1]).as_dict()
+        decoded.pop('depth', None)  # Not decoded by the original parser
+        assert decoded == legacy_parse_binary_tick(packets[-1])
+
+        print(f"\n📦 {name}")
+        before = measure('before: struct.unpack_from', legacy_parse_binary_tick, packets)
+        after = measure('after: decode_tick', decode_tick, packets)
+        batch = measure('after: decode_batch (NumPy)', decode_batch, packets, batch=True)
+        print(f"   Speedup: {after / before:.1f}x per packet, {batch / before:.1f}x batched")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    main()
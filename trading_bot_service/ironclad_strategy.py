@@ -27,15 +27,17 @@ class IroncladStrategy:
     Stateless Design: All state persisted to Firestore
     """
     
-    def __init__(self, db_client, dr_window_minutes: int = 60):
+    def __init__(self, db_client, dr_window_minutes: int = 60, indicator_cache=None):
         """
         Initialize strategy with Firestore client.
         
         Args:
             db_client: Firebase Firestore client instance
             dr_window_minutes: Defining Range window in minutes (default 60)
+            indicator_cache: Shared IndicatorCache (stock indicators computed once per bar)
         """
         self.db = db_client
+        self.indicator_cache = indicator_cache
         self.ist_tz = pytz.timezone('Asia/Kolkata')
         
         # Strategy parameters (immutable)
@@ -255,7 +257,8 @@ class IroncladStrategy:
         
         return df
     
-    def check_regime(self, nifty_df: pd.DataFrame, stock_df: pd.DataFrame) -> str:
+    def check_regime(self, nifty_df: pd.DataFrame, stock_df: pd.DataFrame,
+                     nifty_latest: Optional[Dict] = None) -> str:
         """
         Determine market regime using NIFTY trend strength and stock confirmation.
         
@@ -267,17 +270,20 @@ class IroncladStrategy:
         Args:
             nifty_df: NIFTY 50 DataFrame with indicators
             stock_df: Stock DataFrame with indicators
+            nifty_latest: Latest NIFTY indicator values (adx, sma_10..sma_200),
+                e.g. the engine's shared regime state; used instead of nifty_df
             
         Returns:
             "BULLISH", "BEARISH", or "NEUTRAL"
         """
-        if nifty_df.empty or stock_df.empty:
+        if (nifty_latest is None and (nifty_df is None or nifty_df.empty)) or stock_df.empty:
             logger.warning("Empty dataframes for regime check")
             return "NEUTRAL"
         
         try:
             # Get latest values
-            nifty_latest = nifty_df.iloc[-1]
+            if nifty_latest is None:
+                nifty_latest = nifty_df.iloc[-1]
             stock_latest = stock_df.iloc[-1]
             
             # Check 1: NIFTY ADX strength
@@ -506,7 +512,8 @@ class IroncladStrategy:
                 return entry_price * 1.02, entry_price * 0.97
     
     def run_analysis_cycle(self, nifty_df: pd.DataFrame, stock_df: pd.DataFrame, 
-                          symbol: str, bot_start_time: Optional[datetime] = None) -> Dict:
+                          symbol: str, bot_start_time: Optional[datetime] = None,
+                          nifty_latest: Optional[Dict] = None) -> Dict:
         """
         Main analysis cycle - orchestrates the entire strategy logic.
         
@@ -522,6 +529,8 @@ class IroncladStrategy:
             stock_df: Stock DataFrame (OHLCV)
             symbol: Stock symbol
             bot_start_time: Optional bot start timestamp (for DR calculation)
+            nifty_latest: Latest NIFTY indicator values computed once per cycle
+                (nifty_df is then not needed and may be None)
             
         Returns:
             Decision dictionary with keys:
@@ -560,11 +569,15 @@ class IroncladStrategy:
                 })
             
             # Step 2: Calculate indicators
-            nifty_df = self.calculate_indicators(nifty_df)
-            stock_df = self.calculate_indicators(stock_df)
+            if nifty_latest is None:
+                nifty_df = self.calculate_indicators(nifty_df)
+            if self.indicator_cache is not None:
+                stock_df = self.indicator_cache.frame(symbol, stock_df, 'ironclad', self.calculate_indicators)
+            else:
+                stock_df = self.calculate_indicators(stock_df)
             
             # Step 3: Check regime
-            regime = self.check_regime(nifty_df, stock_df)
+            regime = self.check_regime(nifty_df, stock_df, nifty_latest)
             
             # Save regime to state
             self.save_bot_state(symbol, {'regime': regime})
@@ -693,6 +693,40 @@ def bot_health_check():
             # WebSocket check
             if hasattr(bot.engine, 'ws_manager') and bot.engine.ws_manager:
                 health['websocket_connected'] = getattr(bot.engine.ws_manager, 'is_connected', False)
+                if hasattr(bot.engine.ws_manager, 'get_dispatch_stats'):
+                    health['tick_queue'] = bot.engine.ws_manager.get_dispatch_stats()
+                    if health['tick_queue']['dropped'] > 0:
+                        health['warnings'].append(f"{health['tick_queue']['dropped']} ticks dropped by full tick queue")
+            
+            if hasattr(bot.engine, 'get_feed_gap_stats'):
+                health['feed_gaps'] = bot.engine.get_feed_gap_stats()
+            
+            if hasattr(bot.engine, 'get_indicator_cache_stats'):
+                health['indicator_cache'] = bot.engine.get_indicator_cache_stats()
+            
+            if hasattr(bot.engine, 'get_event_stats'):
+                health['events'] = bot.engine.get_event_stats()
+            
+            if hasattr(bot.engine, 'get_scan_stats'):
+                health['scans'] = bot.engine.get_scan_stats()
+            
+            if hasattr(bot.engine, 'get_snapshot_stats'):
+                health['market_snapshot'] = bot.engine.get_snapshot_stats()
+            
+            if hasattr(bot.engine, 'get_regime_stats'):
+                health['market_regime'] = bot.engine.get_regime_stats()
+            
+            if hasattr(bot.engine, 'get_sr_level_stats'):
+                health['sr_levels'] = bot.engine.get_sr_level_stats()
+            
+            if hasattr(bot.engine, 'get_checklist_stats'):
+                health['checklist'] = bot.engine.get_checklist_stats()
+            
+            if hasattr(bot.engine, 'get_screening_stats'):
+                health['screening'] = bot.engine.get_screening_stats()
+            
+            if hasattr(bot.engine, 'get_margin_stats'):
+                health['margin'] = bot.engine.get_margin_stats()
             
             # Data checks
             if hasattr(bot.engine, 'latest_prices'):
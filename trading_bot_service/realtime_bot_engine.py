@@ -12,7 +12,7 @@ from datetime import datetime, timedelta, time as datetime_time
 from typing import Dict, List, Callable, Optional
 import pandas as pd
 import numpy as np
-from collections import defaultdict, deque
+from collections import deque
 
 # Firebase/Firestore imports for global access
 import firebase_admin
@@ -29,9 +29,31 @@ from bot_errors import (
 )
 from error_handler import ErrorHandler, with_error_handling, safe_execute, ErrorContext
 from health_monitor import HealthMonitor, get_health_monitor
+from trading.data.candle_store import CandleDataMap
+from trading.data.tick_router import TickRouter
+from trading.data.online_indicators import OnlineIndicators
+from trading.data.gap_tracker import FeedGapTracker
+from trading.data.timeframe_rollup import MultiTimeframeBars, HISTORICAL_INTERVALS
+from trading.data.indicator_cache import IndicatorCache
+from trading.data.indicator_panel import IndicatorPanel
+from trading.data.event_bus import EventBus, Event, BAR_CLOSED, PRICE_CROSSED
+from trading.data.scan_tracker import ScanTracker
+from trading.data.market_snapshot import MarketSnapshot, SnapshotPublisher
+from trading.universe_filter import UniverseFilter, Condition, stack_rows
+from trading.market_regime import MarketRegimeService, RegimeState, NIFTY_SYMBOL, NIFTY_TOKEN_INFO
+from trading.data.sr_levels import SRLevelBook
+from trading.margin_service import MarginService
 
 logger = logging.getLogger(__name__)
 
+# Bar timeframe whose close triggers each strategy's evaluation (others: '1m')
+STRATEGY_TIMEFRAMES = {
+    'alpha-ensemble': '5m',
+}
+
+# Longest wait between main-loop passes (emergency stop check, polling-mode evaluation)
+STRATEGY_HEARTBEAT_SECONDS = 5
+
 
 class RealtimeBotEngine:
     """
@@ -110,10 +132,29 @@ class RealtimeBotEngine:
         
         # Real-time data storage (thread-safe)
         self._lock = threading.RLock()
-        self.tick_data = defaultdict(lambda: deque(maxlen=5000))  # Last 5000 ticks per symbol (prevents data loss during high volume)
-        self.candle_data = {}  # Current candle data
+        self.tick_data = {}  # Last 5000 ticks per symbol, columnar TickBuffer (prevents data loss during high volume)
+        self.candle_data = CandleDataMap()  # Fixed-capacity candle store per symbol (reads are read-only views)
+        self._router = TickRouter()  # (exchange_type, token) → per-symbol feed slot (tick buffer + 1-min bar builder)
+        self._timeframe_bars = {}  # symbol → MultiTimeframeBars (5m / 15m / 1h rolled up from 1-min candles)
+        self._indicator_panels = {}  # timeframe → (bar key, IndicatorPanel) recomputed only after a bar close
+        self._indicator_cache = IndicatorCache()  # Per-bar memo shared by strategies and screening
+        self._event_bus = EventBus()  # Bar-close / price-level events that trigger strategy evaluation
+        self._scan_trackers = {}  # strategy → ScanTracker (candle generation each symbol was last evaluated at)
+        self._scan_reports = {}  # strategy → last scan-cycle report (evaluated vs skipped)
+        self._prefilters = {}  # analysis → UniverseFilter (vectorised last-bar gate before per-symbol analysis)
         self.latest_prices = {}  # Latest LTP per symbol
+        self._price_version = 0  # Incremented on every write to latest_prices
+        self._snapshots = SnapshotPublisher()  # Immutable candle/price snapshots read by strategy threads
+        self._market_regime = MarketRegimeService()  # NIFTY 50 state (index streamed like a symbol, never traded)
+        self._sr_levels = SRLevelBook(db=db_client)  # Per-symbol sorted S/R levels (Level 19), saved to Firestore
         self.symbol_tokens = {}  # Token mapping
+        self._shortlist = set()  # Symbols with a signal in the last scan (streamed in SnapQuote mode)
+        
+        # Feed gap detection + historical backfill (reconnects, sequence resets)
+        self._gap_tracker = FeedGapTracker()
+        self._backfill_thread = None
+        self._backfill_results = deque()  # (symbol, DataFrame) waiting to be spliced by the candle builder
+        self._backfill_manager = None  # HistoricalDataManager, created on first gap
         
         # 🚨 AUDIT OPTIMIZATION #2: Retest-based entry tracking
         self.pending_retests = {}  # Tracks breakout signals waiting for retest entry
@@ -121,7 +162,9 @@ class RealtimeBotEngine:
         
         # Trading managers (initialized on first use)
         self._pattern_detector = None
+        self._scan_executor = None  # Process pool for CPU-bound pattern scans (serial on small universes)
         self._execution_manager = None
+        self._margin_service = None  # Background-refreshed RMS margin for check 27 (live mode)
         self._order_manager = None
         self._risk_manager = None
         self._position_manager = None
@@ -205,6 +248,9 @@ class RealtimeBotEngine:
                 if not self.symbol_tokens:
                     raise Exception("Failed to fetch any symbol tokens, cannot continue")
             
+            # NIFTY 50 index: streamed, bootstrapped and backfilled with the universe for the regime service
+            self.symbol_tokens.setdefault(NIFTY_SYMBOL, dict(NIFTY_TOKEN_INFO))
+            
             # Step 2: Initialize trading managers
             logger.info("🔧 [DEBUG] Initializing trading managers...")
             self._initialize_managers()
@@ -287,44 +333,54 @@ class RealtimeBotEngine:
                 logger.error(f"❌ Pre-trade verification failed: {e}")
                 raise
             
-            # Step 9: Main strategy execution loop (runs every 5 seconds)
+            # Step 9: Main strategy loop (evaluations run on bar-close / price-level events)
+            strategy_timeframe = STRATEGY_TIMEFRAMES.get(self.strategy, '1m')
+            self._event_bus.subscribe(BAR_CLOSED, self._on_bars_closed, timeframes=[strategy_timeframe])
+            self._event_bus.subscribe(PRICE_CROSSED, self._on_levels_crossed)
+            
             logger.info("🚀 Real-time trading bot started successfully!")
             logger.info("Position monitoring: Every 0.5 seconds")
-            logger.info("Strategy analysis: Every 5 seconds")
+            logger.info(f"Strategy analysis: On every {strategy_timeframe} bar close (+ retest level crossings)")
             logger.info(f"Data updates: {'Real-time via WebSocket' if self.ws_manager else 'Polling mode'}")
             
             error_count = 0
             max_consecutive_errors = 10  # Stop only after 10 consecutive errors
+            last_stop_check = 0.0
             
             while running_flag() and self.is_running:
                 try:
-                    # 🚨 EMERGENCY STOP: Check Firestore flag for instant shutdown
-                    try:
-                        import firebase_admin
-                        from firebase_admin import firestore
-                        db = firestore.client()
-                        bot_config = db.collection('bot_configs').document(self.user_id).get()
-                        if bot_config.exists and bot_config.to_dict().get('emergency_stop', False):
-                            logger.critical("🚨 EMERGENCY STOP ACTIVATED - Shutting down bot immediately")
-                            self.is_running = False
-                            break
-                    except Exception as stop_check_err:
-                        logger.debug(f"Emergency stop check error (non-critical): {stop_check_err}")
-                    
-                    cycle_start = time.time()
-                    
-                    # Execute strategy analysis (every 5 seconds)
-                    self._analyze_and_trade()
+                    # 🚨 EMERGENCY STOP: Check Firestore flag for instant shutdown (once per heartbeat)
+                    if time.time() - last_stop_check >= STRATEGY_HEARTBEAT_SECONDS:
+                        last_stop_check = time.time()
+                        try:
+                            import firebase_admin
+                            from firebase_admin import firestore
+                            db = firestore.client()
+                            bot_config = db.collection('bot_configs').document(self.user_id).get()
+                            if bot_config.exists and bot_config.to_dict().get('emergency_stop', False):
+                                logger.critical("🚨 EMERGENCY STOP ACTIVATED - Shutting down bot immediately")
+                                self.is_running = False
+                                break
+                        except Exception as stop_check_err:
+                            logger.debug(f"Emergency stop check error (non-critical): {stop_check_err}")
+                        
+                        # EOD close, retest timeouts, streaming modes: on the clock, not on bar closes
+                        self._run_heartbeat_checks()
+                        
+                        # Persist S/R level indexes (throttled, so a restart only replays the latest bars)
+                        self._sr_levels.save()
+                    
+                    # Block until bars close / levels are crossed; handlers run the strategy here.
+                    # Positions are monitored independently every 0.5 seconds
+                    dispatched = self._event_bus.dispatch(timeout=STRATEGY_HEARTBEAT_SECONDS)
+                    
+                    # Polling mode: without ticks no bar ever closes - keep the timed evaluation
+                    if not dispatched and self.ws_manager is None:
+                        self._analyze_and_trade()
                     
                     # Reset error count on successful iteration
                     error_count = 0
                     
-                    # Sleep for 5 seconds (strategy doesn't need to run faster)
-                    # Positions are monitored independently every 0.5 seconds
-                    elapsed = time.time() - cycle_start
-                    sleep_time = max(0, 5 - elapsed)
-                    time.sleep(sleep_time)
-                    
                 except Exception as e:
                     error_count += 1
                     logger.error(f"Error in main loop (error #{error_count}): {e}", exc_info=True)
@@ -365,6 +421,14 @@ class RealtimeBotEngine:
         if self._candle_builder_thread and self._candle_builder_thread.is_alive():
             self._candle_builder_thread.join(timeout=2)
         
+        if self._scan_executor:
+            self._scan_executor.shutdown()
+        
+        self._sr_levels.save(force=True)
+        
+        if self._margin_service:
+            self._margin_service.stop()
+        
         logger.info("✅ Bot stopped successfully")
     
     def _initialize_websocket(self):
@@ -384,6 +448,10 @@ class RealtimeBotEngine:
             # Register tick callback
             self.ws_manager.add_tick_callback(self._on_tick)
             
+            # Ticks after a disconnect are checked for holes left by the outage
+            self.ws_manager.add_disconnect_callback(self._gap_tracker.mark_disconnect)
+            self.ws_manager.add_reconnect_callback(self._gap_tracker.mark_reconnect)
+            
             # Connect
             self.ws_manager.connect()
             logger.info("✅ WebSocket connected successfully")
@@ -400,24 +468,17 @@ class RealtimeBotEngine:
                 logger.warning("⚠️  No symbols to subscribe - skipping WebSocket subscription")
                 return
             
-            # Group tokens by exchange
-            exchange_tokens = defaultdict(list)
-            
+            routes = []
             for symbol, token_info in self.symbol_tokens.items():
                 exchange_type = self._get_exchange_type(token_info['exchange'])
-                exchange_tokens[exchange_type].append(token_info['token'])
-            
-            # Build subscription list
-            subscription_data = []
-            for exchange_type, tokens in exchange_tokens.items():
-                subscription_data.append({
-                    "exchangeType": exchange_type,
-                    "tokens": tokens
-                })
+                routes.append((symbol, exchange_type, str(token_info['token'])))
             
-            # Subscribe with LTP mode (fastest, 51 bytes per tick)
-            mode = 1  # LTP mode
-            self.ws_manager.subscribe(mode, subscription_data)
+            # Routing table must be in place before the first tick of the new subscription
+            self._router.rebuild(routes)
+            self.tick_data = {symbol: feed.ticks for symbol, feed in self._router.feeds.items()}
+            
+            # Universe in LTP mode (fastest, 51 bytes per tick); shortlist / positions upgraded
+            self._apply_subscription_modes(self._desired_subscription_modes())
             
             logger.info(f"✅ Subscribed to {len(self.symbol_tokens)} symbols via WebSocket")
             
@@ -425,6 +486,223 @@ class RealtimeBotEngine:
             logger.error(f"Failed to subscribe: {e}", exc_info=True)
             raise
     
+    def _desired_subscription_modes(self) -> Dict:
+        """
+        Streaming mode per subscribed token.
+        
+        - Every symbol: LTP (enough for bars and the scan)
+        - Open positions: Quote (volume / OHLC for exit management)
+        - Shortlisted symbols and pending retests: SnapQuote (best-5 depth for check 25)
+        """
+        ws = self.ws_manager
+        feeds = self._router.feeds
+        modes = {(feed.exchange_type, feed.token): ws.MODE_LTP for feed in feeds.values()}
+        
+        upgrades = []
+        if self._position_manager:
+            upgrades += [(symbol, ws.MODE_QUOTE) for symbol in self._position_manager.get_all_positions()]
+        upgrades += [(symbol, ws.MODE_SNAP_QUOTE) for symbol in self._shortlist | set(self.pending_retests)]
+        for symbol, mode in upgrades:
+            feed = feeds.get(symbol)
+            if feed is not None:
+                key = (feed.exchange_type, feed.token)
+                modes[key] = max(modes[key], mode)
+        return modes
+    
+    def _apply_subscription_modes(self, desired: Dict) -> Dict:
+        """
+        Send the desired modes. Tokens changing mode re-baseline their cumulative
+        volume, so the first Quote tick after LTP does not book the volume
+        traded in between into one bar.
+        """
+        subscriptions = self.ws_manager.subscriptions
+        with self._lock:
+            for feed in self._router.feeds.values():
+                key = (feed.exchange_type, feed.token)
+                if key in desired and subscriptions.mode_of(*key) != desired[key]:
+                    feed.bars.reset_volume()
+        return self.ws_manager.set_modes(desired)
+    
+    def _refresh_subscription_modes(self):
+        """Upgrade / downgrade symbols whose streaming mode changed (no frames if nothing did)."""
+        if not self.ws_manager or not self.ws_manager.is_connected:
+            return
+        try:
+            changes = self._apply_subscription_modes(self._desired_subscription_modes())
+            if changes['subscribed'] or changes['unsubscribed']:
+                logger.info(f"📡 Subscription modes updated: {self.ws_manager.subscriptions.counts()} (tokens per mode)")
+        except Exception as e:
+            logger.error(f"Failed to update subscription modes: {e}")
+    
+    def get_order_book(self, symbol: str, max_age: float = 5.0):
+        """
+        Live best-5 order book for a symbol.
+        
+        Args:
+            symbol: Trading symbol
+            max_age: Maximum seconds since the last depth update
+            
+        Returns:
+            OrderBook, or None if the symbol has no fresh depth (e.g. LTP-only subscription)
+        """
+        feed = self._router.feeds.get(symbol)
+        if feed is None or feed.book.age() > max_age:
+            return None
+        return feed.book
+    
+    def get_feed_gap_stats(self) -> Dict:
+        """Feed gap / backfill counters for health checks."""
+        stats = self._gap_tracker.get_stats()
+        stats['backfill_running'] = self._backfill_thread is not None and self._backfill_thread.is_alive()
+        return stats
+    
+    def get_indicator_cache_stats(self) -> Dict:
+        """Indicator memo hit / extension / miss counters for health checks."""
+        return self._indicator_cache.get_stats()
+    
+    def get_event_stats(self) -> Dict:
+        """Event bus counters for health checks."""
+        return self._event_bus.get_stats()
+    
+    def get_scan_stats(self) -> Dict:
+        """Last scan-cycle report per strategy (symbols evaluated vs skipped as unchanged)."""
+        stats = dict(self._scan_reports)
+        if self._scan_executor:
+            stats['pattern_pool'] = self._scan_executor.get_stats()
+        if self._prefilters:
+            stats['prefilters'] = {name: f.last_report for name, f in self._prefilters.items()}
+        return stats
+    
+    def get_snapshot_stats(self) -> Dict:
+        """Market snapshot version / publish counters and bytes copied (last strategy cycle and total)."""
+        return self._snapshots.get_stats()
+    
+    def _publish_snapshot(self) -> MarketSnapshot:
+        """Publish the current candles and prices as a new immutable snapshot (candle writers)."""
+        with self._lock:
+            return self._snapshots.publish(self.candle_data.copy(), self.latest_prices, self._price_version)
+    
+    def get_market_regime(self) -> Optional[RegimeState]:
+        """NIFTY 50 regime at the latest index bar (recomputed only when the index has a new bar)."""
+        return self._market_regime.update(self._market_snapshot().candles)
+    
+    def get_sr_levels(self, symbol: str):
+        """Sorted S/R levels of a symbol (SRLevels, or None before it is bootstrapped)."""
+        return self._sr_levels.get(symbol)
+    
+    def get_sr_level_stats(self) -> Dict:
+        """S/R level index counters for health reporting."""
+        return self._sr_levels.get_stats()
+    
+    def get_checklist_stats(self) -> Dict:
+        """30-point checklist per-check latency / rejection stats and current run order."""
+        if self._execution_manager is None:
+            return {}
+        return self._execution_manager.get_check_stats()
+    
+    def get_screening_stats(self) -> Dict:
+        """Advanced screening configuration and per-bar memo counters."""
+        if self._advanced_screening is None:
+            return {}
+        return self._advanced_screening.get_statistics()
+    
+    def get_margin_stats(self) -> Dict:
+        """RMS margin snapshot age / staleness and refresh counters (live mode only)."""
+        if self._margin_service is None:
+            return {}
+        return self._margin_service.get_stats()
+    
+    def get_regime_stats(self) -> Dict:
+        """Current NIFTY 50 regime and regime cache counters for health checks."""
+        return self._market_regime.get_stats()
+    
+    def _market_snapshot(self) -> MarketSnapshot:
+        """
+        Latest market snapshot for readers. Taken without the lock; only if
+        ticks arrived since it was published are the prices re-published once
+        (candle views are reused).
+        """
+        snapshot = self._snapshots.current
+        if snapshot.price_version != self._price_version:
+            with self._lock:
+                snapshot = self._snapshots.current
+                if snapshot.price_version != self._price_version:
+                    snapshot = self._snapshots.refresh_prices(self.latest_prices, self._price_version)
+        return snapshot
+    
+    def _scan_tracker(self, strategy: str) -> ScanTracker:
+        """Dirty-symbol tracker of one strategy (created on first scan)."""
+        tracker = self._scan_trackers.get(strategy)
+        if tracker is None:
+            tracker = self._scan_trackers[strategy] = ScanTracker(strategy)
+        return tracker
+    
+    def _alpha_prefilter(self) -> UniverseFilter:
+        """
+        AlphaEnsembleStrategy.analyze_symbol's threshold filters as a universe
+        pre-filter (each condition is the negation of one of its reject tests,
+        NaN handling included, so no symbol it would trade is dropped).
+        """
+        prefilter = self._prefilters.get('alpha-ensemble')
+        if prefilter is not None:
+            return prefilter
+        
+        alpha = self._alpha_ensemble
+        
+        def in_session(v):
+            return alpha.SESSION_START_TIME <= datetime.now().time() <= alpha.SESSION_END_TIME
+        
+        def ema200_side(v):
+            up, down = v['price'] > v['EMA_200'], v['price'] < v['EMA_200']
+            return (up & ~(v['EMA_20'] < v['EMA_200'])) | (down & ~(v['EMA_20'] > v['EMA_200']))
+        
+        def volume_ratio(v):
+            ratio = np.where(v['Volume_SMA'] > 0, v['Volume'] / v['Volume_SMA'], 0.0)
+            return ~(ratio < alpha.VOLUME_MULTIPLIER)
+        
+        def rsi_band(v):
+            rsi = v['RSI']
+            long_ok = ~((rsi < alpha.RSI_LONG_MIN) | (rsi > alpha.RSI_LONG_MAX))
+            short_ok = ~((rsi < alpha.RSI_SHORT_MIN) | (rsi > alpha.RSI_SHORT_MAX))
+            return np.where(v['price'] > v['EMA_200'], long_ok, short_ok)
+        
+        def atr_percent(v):
+            pct = v['ATR'] / v['price'] * 100
+            return ~((pct < alpha.ATR_MIN_PERCENT) | (pct > alpha.ATR_MAX_PERCENT))
+        
+        prefilter = self._prefilters['alpha-ensemble'] = UniverseFilter('alpha-ensemble', [
+            Condition('session_window', in_session),
+            Condition('indicators_ready',
+                      lambda v: ~np.isnan(np.stack([v[c] for c in ('EMA_200', 'EMA_20', 'ADX', 'RSI', 'ATR')])).any(axis=0),
+                      columns=('EMA_200', 'EMA_20', 'ADX', 'RSI', 'ATR')),
+            Condition('ema200_side', ema200_side, columns=('price', 'EMA_200', 'EMA_20')),
+            Condition('ema50_distance',
+                      lambda v: ~(np.abs(v['price'] - v['EMA_50']) / v['EMA_50'] * 100 > alpha.MAX_DISTANCE_FROM_50EMA),
+                      columns=('price', 'EMA_50')),
+            Condition('adx_trending', lambda v: ~(v['ADX'] < alpha.ADX_MIN_TRENDING), columns=('ADX',)),
+            Condition('volume_ratio', volume_ratio, columns=('Volume', 'Volume_SMA')),
+            Condition('rsi_band', rsi_band, columns=('price', 'EMA_200', 'RSI')),
+            Condition('atr_percent', atr_percent, columns=('price', 'ATR')),
+        ])
+        return prefilter
+    
+    def _mean_reversion_prefilter(self) -> Optional[UniverseFilter]:
+        """
+        MeanReversionStrategy.find_mean_reversion_setup's necessary conditions
+        on the candle store's own ADX / RSI columns (None without the strategy).
+        """
+        if self._mean_reversion is None:
+            return None
+        prefilter = self._prefilters.get('mean-reversion')
+        if prefilter is None:
+            mr = self._mean_reversion
+            prefilter = self._prefilters['mean-reversion'] = UniverseFilter('mean-reversion', [
+                Condition('adx_sideways', lambda v: ~(v['adx'] >= mr.MAX_ADX), columns=('adx',)),
+                Condition('rsi_extreme', lambda v: (v['rsi'] < mr.RSI_OVERSOLD) | (v['rsi'] > mr.RSI_OVERBOUGHT),
+                          columns=('rsi',)),
+            ])
+        return prefilter
+    
     def _get_exchange_type(self, exchange: str) -> int:
         """Convert exchange string to WebSocket exchange type"""
         mapping = {
@@ -449,22 +727,26 @@ class RealtimeBotEngine:
             if ltp == 0:
                 return
             
-            # Find symbol for this token
-            symbol = None
-            for sym, token_info in self.symbol_tokens.items():
-                if str(token_info['token']) == token:
-                    symbol = sym
-                    break
+            # Exchange time drives bars and tick history (wall clock only if the feed omits it)
+            ts_ms = tick_data.get('timestamp') or int(time.time() * 1000)
+            volume = tick_data.get('volume', 0)
             
-            if not symbol:
+            # Route to the symbol's feed slot (single hash lookup)
+            feed = self._router.route(tick_data.get('exchange_type', 1), token)
+            
+            if feed is None:
                 logger.debug(f"Tick received for unknown token: {token}")
                 return
+            symbol = feed.symbol
+            sequence = tick_data.get('sequence', 0)
+            gap = False
             
             # Thread-safe update
             with self._lock:
                 # Update latest price
                 old_price = self.latest_prices.get(symbol, 0)
                 self.latest_prices[symbol] = ltp
+                self._price_version += 1
                 
                 # Log first tick and significant price changes
                 if old_price == 0:
@@ -472,20 +754,124 @@ class RealtimeBotEngine:
                 elif abs(ltp - old_price) / old_price > 0.01:  # >1% change
                     logger.debug(f"📊 Price update: {symbol} {old_price:.2f} → {ltp:.2f}")
                 
+                # Update the open 1-minute bar in place (O(1) per tick)
+                feed.bars.update(ts_ms, ltp, volume)
+                
+                # Compare with the previous tick of this token (reconnect / sequence reset /
+                # feed-wide silence holes); first ticks only advance the feed clock
+                has_prev = feed.ticks.total_count > 0
+                gap = self._gap_tracker.observe(
+                    symbol, feed.ticks.last_ts_ms if has_prev else None,
+                    feed.ticks.last_sequence if has_prev else 0, ts_ms, sequence
+                )
+                
                 # Store tick data
-                self.tick_data[symbol].append({
-                    'timestamp': datetime.now(),
-                    'ltp': ltp,
-                    'volume': tick_data.get('volume', 0),
-                    'open': tick_data.get('open', ltp),
-                    'high': tick_data.get('high', ltp),
-                    'low': tick_data.get('low', ltp),
-                    'close': ltp
-                })
+                feed.ticks.append(ts_ms, sequence, ltp, volume)
+                
+                # SnapQuote ticks carry best-5 depth
+                depth = tick_data.get('depth')
+                if depth is not None:
+                    feed.book.update(depth, ts_ms)
+            
+            if gap:
+                self._start_backfill()
+            
+            # Retest zones etc. (no-op unless the symbol has watched levels)
+            self._event_bus.on_price(symbol, ltp)
             
         except Exception as e:
             logger.error(f"Error processing tick: {e}")
     
+    def _start_backfill(self):
+        """Start the backfill worker unless it is already running."""
+        if self._backfill_thread is not None and self._backfill_thread.is_alive():
+            return
+        self._backfill_thread = threading.Thread(target=self._run_backfill, daemon=True)
+        self._backfill_thread.start()
+    
+    def _run_backfill(self):
+        """
+        Fetch the missing 1-minute bars of every queued gap from the historical API.
+        
+        Runs on its own thread so the tick and candle threads never wait on REST
+        calls. Results are handed to the candle builder, which splices them in
+        before publishing the next bars.
+        """
+        from historical_data_manager import HistoricalDataManager
+        
+        RATE_LIMIT_DELAY = 0.4  # Same request spacing as the bootstrap
+        
+        if self._backfill_manager is None:
+            self._backfill_manager = HistoricalDataManager(
+                api_key=self.api_key,
+                jwt_token=self.jwt_token
+            )
+        
+        while self.is_running and self._gap_tracker.has_pending():
+            for symbol, first_bar, last_bar in self._gap_tracker.pop_pending():
+                token_info = self.symbol_tokens.get(symbol)
+                if not token_info:
+                    continue
+                try:
+                    df = self._backfill_manager.fetch_historical_data(
+                        symbol=symbol,
+                        token=token_info['token'],
+                        exchange=token_info['exchange'],
+                        interval='ONE_MINUTE',
+                        from_date=first_bar,
+                        to_date=last_bar,
+                        max_retries=3
+                    )
+                    if df is not None and len(df) > 0:
+                        if df.index.tz is not None:
+                            df.index = df.index.tz_localize(None)
+                        df = df[(df.index >= first_bar) & (df.index <= last_bar)]
+                        if len(df) > 0:
+                            self._backfill_results.append((symbol, df))
+                            logger.info(f"🩹 {symbol}: Backfilled {len(df)} bar(s) {first_bar:%H:%M}-{last_bar:%H:%M}")
+                    else:
+                        logger.warning(f"⚠️ {symbol}: No historical data for gap {first_bar:%H:%M}-{last_bar:%H:%M}")
+                except Exception as e:
+                    logger.error(f"Backfill failed for {symbol}: {e}")
+                finally:
+                    time.sleep(RATE_LIMIT_DELAY)
+    
+    def _splice_backfill(self, symbol: str, bars: pd.DataFrame):
+        """
+        Merge backfilled bars into a symbol's candle history.
+        
+        Fetched bars replace live bars with the same timestamp (those were built
+        from an incomplete tick stream). The window's indicators are recomputed
+        once and the online indicator state is warm-started from the merged series.
+        """
+        with self._lock:
+            store = self.candle_data.store(symbol)
+        if store is None or len(store) == 0:
+            return  # Nothing to repair - live bars start after the gap
+        
+        history = store.to_frame(indicators=False)
+        if not all(col in bars.columns for col in history.columns):
+            logger.warning(f"⚠️ {symbol}: Backfill missing OHLCV columns, skipping splice")
+            return
+        bars = bars[list(history.columns)]
+        merged = pd.concat([history, bars])
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        
+        merged = self._calculate_indicators(merged)
+        indicators = OnlineIndicators().warm_start(merged)
+        
+        with self._lock:
+            self.candle_data[symbol] = merged
+            self.candle_data.store(symbol).indicators = indicators
+            self._timeframes_for(symbol).seed_from_minutes(merged)
+        self._indicator_cache.invalidate(symbol)  # Bars changed under the same timestamps
+        if self._scan_executor:
+            self._scan_executor.reset_pivots(symbol)  # Also reaches the pool workers' pivot trackers
+        elif self._pattern_detector:
+            self._pattern_detector.reset_pivots(symbol)
+        self._sr_levels.catch_up(symbol, merged, rebuild=True)
+        logger.info(f"🩹 {symbol}: Spliced {len(bars)} backfilled bar(s) → {len(merged)} total candles")
+    
     def _continuous_position_monitoring(self):
         """
         Continuously monitor positions for stop loss/target hits.
@@ -505,8 +891,8 @@ class RealtimeBotEngine:
     
     def _continuous_candle_building(self):
         """
-        Continuously build 1-minute candles from tick data.
-        Runs every 1 second for faster indicator updates.
+        Continuously publish closed 1-minute candles built from tick data.
+        Runs every 1 second so a finished bar reaches strategies promptly.
         """
         logger.info("📊 Candle builder thread started (1s interval for faster updates)")
         
@@ -520,75 +906,147 @@ class RealtimeBotEngine:
                 time.sleep(1)
     
     def _build_candles(self):
-        """Build 1-minute candles from tick data and calculate technical indicators"""
+        """
+        Merge newly closed 1-minute bars into candle_data and refresh indicators.
+        
+        Ticks are aggregated incrementally in _on_tick, so this only does work for
+        symbols whose bar rolled over since the last pass (once per minute per symbol).
+        Indicator values for each new bar come from the symbol's OnlineIndicators
+        state, so the full history is never recalculated, and each bar is appended
+        to the symbol's fixed-capacity CandleStore in O(1).
+        The lock is held only to collect the closed bars and for each append.
+        """
+        # Repair gaps first so new bars continue the corrected series
+        spliced = bool(self._backfill_results)
+        while self._backfill_results:
+            symbol, bars = self._backfill_results.popleft()
+            self._splice_backfill(symbol, bars)
+        if self._gap_tracker.has_pending():
+            self._start_backfill()
+        
+        now_ms = int(time.time() * 1000)
+        new_bars = {}
+        events = []
+        
         with self._lock:
-            for symbol, ticks in self.tick_data.items():
-                if len(ticks) < 10:
-                    continue
-                
-                # Convert ticks to DataFrame
-                df = pd.DataFrame(list(ticks))
-                
-                if df.empty:
+            for symbol, feed in self._router.feeds.items():
+                # Close the open bar if its minute ended without a new tick
+                builder = feed.bars
+                builder.roll(now_ms)
+                if builder.closed_count > feed.bars_published:
+                    new_bars[symbol] = builder.closed_since(feed.bars_published)
+                    feed.bars_published = builder.closed_count
+        
+        for symbol, bars in new_bars.items():
+            with self._lock:
+                store = self.candle_data.store(symbol, create=True)
+            
+            if store.indicators is None:
+                # First bar for this symbol, or candle_data was replaced elsewhere - resync state
+                self._resync_indicators(symbol, store)
+                with self._lock:
+                    store = self.candle_data.store(symbol)
+            
+            indicators = store.indicators
+            # Closed bars are final: anything at or before the last stored candle is a duplicate
+            last_ts = store.last_timestamp
+            appended = 0
+            for bar in bars:
+                ts = bar.timestamp
+                if last_ts is not None and ts <= last_ts:
                     continue
-                
-                # Group by minute and create OHLC
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
-                df.set_index('timestamp', inplace=True)
-                
-                # Resample to 1-minute candles
-                candles = df.resample('1min').agg({
-                    'open': 'first',
-                    'high': 'max',
-                    'low': 'min',
-                    'close': 'last',
-                    'volume': 'sum'
-                }).dropna()
-                
-                # CRITICAL FIX: Rename columns to uppercase for pattern detector compatibility
-                # Pattern detector expects: 'Open', 'High', 'Low', 'Close', 'Volume'
-                # But resampled candles have lowercase: 'open', 'high', 'low', 'close', 'volume'
-                candles.columns = [col.capitalize() for col in candles.columns]
-                
-                # DEBUG: Check if historical data exists
-                has_historical = symbol in self.candle_data
-                historical_count = len(self.candle_data[symbol]) if has_historical else 0
-                
+                row = bar.as_dict()
+                row.update(indicators.update(bar.open, bar.high, bar.low, bar.close, bar.volume))
                 # CRITICAL FIX: APPEND new candles to historical data instead of replacing
-                # If we have historical data, merge it with new realtime candles
-                if symbol in self.candle_data and len(self.candle_data[symbol]) > 0:
-                    historical_df = self.candle_data[symbol]
-                    new_count = len(candles)
-                    
-                    # FIX timezone mismatch: Remove timezone info from both DataFrames before merging
-                    # Historical data is tz-naive, realtime data is tz-aware (IST)
-                    if historical_df.index.tz is not None:
-                        historical_df.index = historical_df.index.tz_localize(None)
-                    if candles.index.tz is not None:
-                        candles.index = candles.index.tz_localize(None)
-                    
-                    # ALWAYS combine historical + new candles
-                    combined = pd.concat([historical_df, candles])
-                    combined = combined[~combined.index.duplicated(keep='last')]
-                    combined = combined.sort_index()
-                    
-                    logger.info(f"📊 {symbol}: Merged {historical_count} historical + {new_count} new = {len(combined)} total candles")
-                    
-                    # Calculate indicators on FULL dataset (historical + new)
-                    if len(combined) >= 200:
-                        combined = self._calculate_indicators(combined)
-                    
-                    self.candle_data[symbol] = combined
-                else:
-                    # No historical data - use realtime only
-                    # Remove timezone info for consistency
-                    if candles.index.tz is not None:
-                        candles.index = candles.index.tz_localize(None)
-                    
-                    logger.info(f"📊 {symbol}: No historical data (had {historical_count}), using {len(candles)} realtime candles")
-                    if len(candles) >= 200:
-                        candles = self._calculate_indicators(candles)
-                    self.candle_data[symbol] = candles
+                with self._lock:
+                    store.append(ts, row)
+                    closed_timeframes = self._timeframes_for(symbol).update(ts, row)
+                self._sr_levels.update(symbol, ts, bar.high, bar.low)
+                events.append(Event(BAR_CLOSED, symbol, '1m', ts))
+                events.extend(Event(BAR_CLOSED, symbol, timeframe, ts) for timeframe in closed_timeframes)
+                appended += 1
+                last_ts = ts
+            
+            if appended:
+                logger.debug(f"📊 {symbol}: Closed {appended} bar(s) → {len(store)} total candles")
+        
+        # Readers see the new bars in one atomic snapshot swap, before strategies are woken
+        if new_bars or spliced:
+            self._publish_snapshot()
+        
+        # One wake-up for the whole pass (strategies evaluate once per batch of closes)
+        self._event_bus.publish(events)
+    
+    def _timeframes_for(self, symbol: str) -> MultiTimeframeBars:
+        """Rolled-up timeframes of a symbol (created on first use). Call with self._lock held."""
+        bars = self._timeframe_bars.get(symbol)
+        if bars is None:
+            bars = self._timeframe_bars[symbol] = MultiTimeframeBars()
+        return bars
+    
+    def get_bars(self, symbol: str, timeframe: str = '1m', include_partial: bool = False) -> Optional[pd.DataFrame]:
+        """
+        OHLCV candles of a symbol in any supported timeframe, from memory (no REST calls).
+        
+        Args:
+            symbol: Trading symbol
+            timeframe: '1m', '5m', '15m' or '1h'
+            include_partial: Append the still-forming bar (rolled-up timeframes only)
+            
+        Returns:
+            Read-only DataFrame (capitalized OHLCV, naive IST index) or None if unknown
+        """
+        with self._lock:
+            if timeframe == '1m':
+                return self.candle_data[symbol] if symbol in self.candle_data else None
+            bars = self._timeframe_bars.get(symbol)
+            return bars.to_frame(timeframe, include_partial) if bars is not None else None
+    
+    def _get_indicator_panel(self, timeframe: str, symbols: Optional[List[str]] = None, **params) -> IndicatorPanel:
+        """
+        Universe-wide indicators for one timeframe, computed in one vectorised pass.
+        
+        The panel is rebuilt only when some symbol's closed bars changed, so scans
+        between bar closes reuse it.
+        
+        Args:
+            timeframe: '1m', '5m', '15m' or '1h'
+            symbols: Symbols to include (default: the whole universe)
+            **params: IndicatorPanel parameters (periods)
+        """
+        frames = {symbol: self.get_bars(symbol, timeframe) for symbol in (self.symbols if symbols is None else symbols)}
+        key = (tuple(sorted(params.items())),) + tuple(
+            (symbol, len(df), df.index[-1]) for symbol, df in frames.items() if df is not None and len(df)
+        )
+        cached = self._indicator_panels.get(timeframe)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        start = time.time()
+        panel = IndicatorPanel(**params).compute(frames)
+        self._indicator_panels[timeframe] = (key, panel)
+        logger.debug(f"📐 {timeframe} indicator panel: {len(panel)} symbols in {(time.time() - start) * 1000:.0f}ms")
+        return panel
+    
+    def _resync_indicators(self, symbol: str, store):
+        """
+        Rebuild the online indicator state for a store that has none (new symbol,
+        or candle_data assigned without going through the bootstrap).
+        """
+        indicators = OnlineIndicators()
+        if len(store) == 0:
+            store.indicators = indicators
+            logger.info(f"📊 {symbol}: No historical data, building from realtime candles")
+            return
+        
+        history = store.to_frame(indicators=False)
+        indicators.warm_start(history)
+        if not store.has_indicators:
+            # Stored rows have no indicator values - compute them once for the window
+            with self._lock:
+                self.candle_data[symbol] = self._calculate_indicators(history.copy())
+                store = self.candle_data.store(symbol)
+        store.indicators = indicators
     
     def _calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -897,11 +1355,17 @@ class RealtimeBotEngine:
         # We use 0.4 seconds between requests = 2.5 requests/second (safe margin)
         RATE_LIMIT_DELAY = 0.4  # seconds between requests
         
-        for idx, symbol in enumerate(self.symbols, 1):
+        # Universe + the NIFTY 50 index (regime service)
+        bootstrap_symbols = list(self.symbols) + [NIFTY_SYMBOL]
+        
+        # S/R level indexes saved earlier today are only extended with the newer bars
+        self._sr_levels.begin_session(now.date(), bootstrap_symbols)
+        
+        for idx, symbol in enumerate(bootstrap_symbols, 1):
             try:
                 token_info = self.symbol_tokens.get(symbol)
                 if not token_info:
-                    logger.debug(f"⏭️  [{idx}/{len(self.symbols)}] {symbol}: No token info, skipping")
+                    logger.debug(f"⏭️  [{idx}/{len(bootstrap_symbols)}] {symbol}: No token info, skipping")
                     continue
                 
                 # Fetch 1-minute candles (with built-in retry logic for 403 errors)
@@ -921,7 +1385,7 @@ class RealtimeBotEngine:
                     required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
                     if not all(col in df.columns for col in required_columns):
                         fail_count += 1
-                        logger.warning(f"⏭️  [{idx}/{len(self.symbols)}] {symbol}: Invalid DataFrame - missing OHLC columns")
+                        logger.warning(f"⏭️  [{idx}/{len(bootstrap_symbols)}] {symbol}: Invalid DataFrame - missing OHLC columns")
                         logger.debug(f"   Available columns: {list(df.columns)}")
                         continue
                     
@@ -942,31 +1406,54 @@ class RealtimeBotEngine:
                             df = df[timestamp_series <= now_timestamp]
                             logger.info(f"   ✅ Filtered to {len(df)} valid candles (no future data)")
                     
-                    # Calculate indicators if we have enough data
-                    if len(df) >= 200:
-                        df = self._calculate_indicators(df)
+                    # Calculate indicators (only exposed to strategies once there are 200+ candles)
+                    df = self._calculate_indicators(df)
+                    
+                    # Online indicator state continues this series as live bars close
+                    indicators = OnlineIndicators().warm_start(df)
                     
                     # Store in candle_data (thread-safe)
                     with self._lock:
                         self.candle_data[symbol] = df
+                        self.candle_data.store(symbol).indicators = indicators
+                        self._timeframes_for(symbol).seed_from_minutes(df)
+                    self._sr_levels.catch_up(symbol, df)
+                    
+                    # Alpha-Ensemble trends on 15-minute EMA200 (~8 sessions): load that history once
+                    if self.strategy == 'alpha-ensemble':
+                        time.sleep(RATE_LIMIT_DELAY)
+                        trend_df = hist_manager.fetch_historical_data(
+                            symbol=symbol,
+                            token=token_info['token'],
+                            exchange=token_info['exchange'],
+                            interval=HISTORICAL_INTERVALS['15m'],
+                            from_date=from_date - timedelta(days=20),
+                            to_date=to_date,
+                            max_retries=3
+                        )
+                        if trend_df is not None and len(trend_df) > 0:
+                            with self._lock:
+                                self._timeframes_for(symbol).merge('15m', trend_df)
                     
                     success_count += 1
-                    logger.info(f"✅ [{idx}/{len(self.symbols)}] {symbol}: Loaded {len(df)} historical candles (validated)")
+                    logger.info(f"✅ [{idx}/{len(bootstrap_symbols)}] {symbol}: Loaded {len(df)} historical candles (validated)")
                 else:
                     fail_count += 1
-                    logger.debug(f"⏭️  [{idx}/{len(self.symbols)}] {symbol}: No historical data returned")
+                    logger.debug(f"⏭️  [{idx}/{len(bootstrap_symbols)}] {symbol}: No historical data returned")
                     
             except Exception as e:
                 fail_count += 1
-                logger.debug(f"⏭️  [{idx}/{len(self.symbols)}] {symbol}: Historical fetch failed: {e}")
+                logger.debug(f"⏭️  [{idx}/{len(bootstrap_symbols)}] {symbol}: Historical fetch failed: {e}")
                 # Continue with other symbols even if one fails
             
             finally:
                 # CRITICAL: ALWAYS rate limit between requests, regardless of success/failure
                 # This prevents cascading 403 errors when one request fails
-                if idx < len(self.symbols):  # Don't sleep after last symbol
+                if idx < len(bootstrap_symbols):  # Don't sleep after last symbol
                     time.sleep(RATE_LIMIT_DELAY)
         
+        self._publish_snapshot()
+        
         # CRITICAL FIX: Bootstrap failure is NOT fatal - bot can still work with live ticks
         if success_count == 0 and now < market_open_time:
             logger.warning("📊 No historical data available - Bot started before market open")
@@ -1066,6 +1553,7 @@ class RealtimeBotEngine:
     def _initialize_managers(self):
         """Initialize all trading managers"""
         from trading.patterns import PatternDetector
+        from trading.scan_executor import ScanExecutor
         try:
             from trading.execution_manager import ExecutionManager
         except ImportError as e:
@@ -1083,8 +1571,17 @@ class RealtimeBotEngine:
         logger.info(f"💰 Portfolio Value: ₹{portfolio_value:,.2f}")
         
         self._pattern_detector = PatternDetector()
+        self._scan_executor = ScanExecutor(self._pattern_detector)
+        if self.strategy in ['pattern', 'defining']:
+            self._scan_executor.start()  # Spawn pattern-scan workers now, not on the first bar close
+        # Live orders consume real funds: keep RMS margin fresh off the validation path
+        if self.trading_mode == 'live' and self.api_key and self.jwt_token:
+            self._margin_service = MarginService(self.api_key, self.jwt_token)
+            self._margin_service.start()
         if ExecutionManager:
-            self._execution_manager = ExecutionManager()
+            self._execution_manager = ExecutionManager(order_book_provider=self.get_order_book,
+                                                       market_regime_provider=self.get_market_regime,
+                                                       margin_provider=self._margin_service.snapshot if self._margin_service else None)
         else:
             self._execution_manager = None
             logger.warning("⚠️  ExecutionManager disabled - trades will skip 30-point validation")
@@ -1105,7 +1602,9 @@ class RealtimeBotEngine:
         screening_config.enable_tick_indicator = True  # Enable Level 22 (TICK)
         self._advanced_screening = AdvancedScreeningManager(
             config=screening_config,
-            portfolio_value=portfolio_value  # ✅ Use actual portfolio value
+            portfolio_value=portfolio_value,  # ✅ Use actual portfolio value
+            indicator_cache=self._indicator_cache,
+            sr_levels=self._sr_levels
         )
         logger.info("✅ Advanced Screening Manager initialized (fail-safe mode: ON, TICK: ON)")
         
@@ -1158,7 +1657,8 @@ class RealtimeBotEngine:
         if self.strategy in ['ironclad', 'both']:
             try:
                 from ironclad_strategy import IroncladStrategy
-                self._ironclad = IroncladStrategy(db_client=None, dr_window_minutes=60)
+                self._ironclad = IroncladStrategy(db_client=None, dr_window_minutes=60,
+                                                 indicator_cache=self._indicator_cache)
                 logger.info("✅ Ironclad strategy initialized")
             except ImportError as e:
                 logger.warning(f"⚠️  Ironclad strategy not available: {e}")
@@ -1173,7 +1673,8 @@ class RealtimeBotEngine:
                 self._alpha_ensemble = AlphaEnsembleStrategy(
                     api_key=self.api_key,
                     jwt_token=self.jwt_token,
-                    strategy_params=strategy_params
+                    strategy_params=strategy_params,
+                    indicator_cache=self._indicator_cache
                 )
                 logger.info(f"✅ Alpha-Ensemble strategy initialized with custom parameters")
             except ImportError as e:
@@ -1226,17 +1727,40 @@ class RealtimeBotEngine:
         
         return is_open
     
+    def _on_bars_closed(self, events: List[Event]):
+        """Bars of the strategy's timeframe closed: evaluate once for the whole batch."""
+        logger.debug(f"🕯️ {len(events)} bar close(s) ({events[-1].timeframe} @ {events[-1].timestamp}) → analyzing")
+        self._analyze_and_trade()
+    
+    def _on_levels_crossed(self, events: List[Event]):
+        """Price traded through a watched level: check pending retests right away."""
+        logger.debug(f"🎯 Level crossing(s): {', '.join(sorted({event.symbol for event in events}))}")
+        self._monitor_pending_retests()
+    
+    def _run_heartbeat_checks(self):
+        """
+        Time-driven upkeep, run from the main loop every STRATEGY_HEARTBEAT_SECONDS
+        whatever events arrive, so a stalled feed cannot hold back the 3:15 PM close.
+        """
+        # Check EOD auto-close (3:15 PM for safety before broker's 3:20 PM)
+        # 🚨 AUDIT OPTIMIZATION #2: Monitor pending retests (limit order entries, timeouts)
+        # Stream depth only for symbols the scan shortlisted or that hold a position
+        for check in (self._check_eod_auto_close, self._monitor_pending_retests, self._refresh_subscription_modes):
+            try:
+                check()
+            except Exception as e:
+                logger.error(f"❌ Heartbeat check {check.__name__} failed: {e}", exc_info=True)
+    
     def _analyze_and_trade(self):
         """
-        Main strategy execution (runs every 5 seconds).
-        Position monitoring happens independently every 0.5 seconds.
+        Main strategy execution (runs on each close of the strategy's bar timeframe).
+        Position monitoring happens independently every 0.5 seconds; EOD close,
+        retest timeouts and subscription modes run on the main-loop heartbeat.
         """
+        self._snapshots.begin_cycle()
         try:
             logger.debug(f"🔍 [DEBUG] _analyze_and_trade() called - Strategy: {self.strategy}")
             
-            # 🚨 AUDIT OPTIMIZATION #2: Monitor pending retests for limit order entries
-            self._monitor_pending_retests()
-            
             # Check if market is open before trading
             # CRITICAL FIX: Allow paper trading outside market hours for testing
             if not self._is_market_open():
@@ -1257,9 +1781,6 @@ class RealtimeBotEngine:
                 logger.debug("⏸️  LIQUIDITY FILTER: Skipping 12:00-14:30 (midday U-shape dip - 12.5% WR trap)")
                 return
             
-            # Check EOD auto-close (3:15 PM for safety before broker's 3:20 PM)
-            self._check_eod_auto_close()
-            
             if self.strategy == 'pattern':
                 logger.debug("📊 [DEBUG] Executing PATTERN strategy...")
                 self._execute_pattern_strategy()
@@ -1282,6 +1803,9 @@ class RealtimeBotEngine:
                 
         except Exception as e:
             logger.error(f"❌ [DEBUG] Error in strategy execution: {e}", exc_info=True)
+        
+        finally:
+            logger.debug(f"📦 Strategy cycle copied {self._snapshots.end_cycle()} bytes of market data")
     
     def _monitor_pending_retests(self):
         """
@@ -1305,8 +1829,7 @@ class RealtimeBotEngine:
             return  # No pending retests to monitor
         
         # Get current prices
-        with self._lock:
-            current_prices = self.latest_prices.copy()
+        current_prices = self._market_snapshot().prices
         
         # Check each pending retest
         symbols_to_remove = []
@@ -1377,6 +1900,7 @@ class RealtimeBotEngine:
             for symbol in symbols_to_remove:
                 if symbol in self.pending_retests:
                     del self.pending_retests[symbol]
+                self._event_bus.unwatch(symbol, 'retest')
     
     def _check_eod_auto_close(self):
         """
@@ -1410,8 +1934,7 @@ class RealtimeBotEngine:
                 logger.warning("⏰ EOD AUTO-CLOSE: 3:15 PM reached - Closing all INTRADAY positions")
                 
                 # Get latest prices
-                with self._lock:
-                    current_prices = self.latest_prices.copy()
+                current_prices = self._market_snapshot().prices
                 
                 # Close all positions
                 for symbol, position in positions.items():
@@ -1433,9 +1956,9 @@ class RealtimeBotEngine:
         Uses real-time prices vs open prices from candle data.
         """
         try:
-            with self._lock:
-                candle_copy = self.candle_data.copy()
-                prices_copy = self.latest_prices.copy()
+            snapshot = self._market_snapshot()
+            candle_copy = snapshot.candles
+            prices_copy = snapshot.prices
             
             advancing = declining = unchanged = 0
             
@@ -1449,7 +1972,8 @@ class RealtimeBotEngine:
                     continue
                 
                 # Get today's open price (first candle of the day)
-                open_price = float(df.iloc[0]['open'])
+                open_col = 'Open' if 'Open' in df.columns else 'open'
+                open_price = float(df[open_col].iloc[0])
                 current_price = prices_copy[symbol]
                 
                 # Calculate change threshold (0.1% to avoid noise)
@@ -1480,9 +2004,10 @@ class RealtimeBotEngine:
         # Update market internals BEFORE scanning (for TICK indicator)
         self._update_market_internals()
         
-        with self._lock:
-            candle_data_copy = self.candle_data.copy()
-            latest_prices_copy = self.latest_prices.copy()
+        # Immutable snapshot (read-only views, no lock or copy)
+        snapshot = self._market_snapshot()
+        candle_data_copy = snapshot.candles
+        latest_prices_copy = snapshot.prices
         
         # STEP 1: Scan all symbols and collect signals with confidence scores
         signals = []
@@ -1503,7 +2028,38 @@ class RealtimeBotEngine:
             except Exception as e:
                 logger.error(f"❌ [ACTIVITY] Scan cycle log failed: {e}", exc_info=True)
         
-        for symbol in self.symbols:
+        tracker = self._scan_tracker('pattern')
+        tracker.begin()
+        
+        # No new bars since this strategy last evaluated the symbol → same result, skip
+        changed = [symbol for symbol in self.symbols
+                   if tracker.should_evaluate(symbol, candle_data_copy.generation(symbol))]
+        
+        # Regime split of the whole universe in one pass over the last bars' ADX / RSI
+        eligible = [symbol for symbol in changed
+                    if candle_data_copy.length(symbol) >= 50 and not self._position_manager.has_position(symbol)]
+        last = candle_data_copy.last_values(eligible, ('adx', 'rsi'))
+        sideways = last['adx'] < 20
+        
+        # Sideways symbols only reach mean reversion if they can meet its thresholds
+        mr_prefilter = self._mean_reversion_prefilter()
+        sideways_symbols = [symbol for symbol, flag in zip(eligible, sideways) if flag]
+        if mr_prefilter is not None:
+            mr_candidates = set(mr_prefilter.apply(sideways_symbols, {c: v[sideways] for c, v in last.items()}))
+        else:
+            mr_candidates = set(sideways_symbols)
+        
+        # CPU-bound pattern detection for every trending candidate at once (worker processes
+        # on multi-core hosts); the per-symbol loop below consumes the results in order
+        trending = {}
+        for symbol, adx in zip(eligible, last['adx']):
+            if not adx < 20:
+                df = candle_data_copy[symbol]
+                if 'adx' not in df.columns or adx >= 20:  # No ADX yet → default 25 (trending)
+                    trending[symbol] = df
+        pattern_results = self._scan_executor.scan_patterns(trending)
+        
+        for symbol in changed:
             try:
                 # NEW: Log symbol scanning to activity feed
                 if self._activity_logger:
@@ -1519,7 +2075,7 @@ class RealtimeBotEngine:
                 # 50 candles ensures: RSI(14), MACD(26), EMA(20), BB(20), ATR(14), ADX(28)
                 # All patterns (Double Top/Bottom, Flags, Triangles) work optimally
                 # SMA50 available for trend confirmation
-                candle_count = len(candle_data_copy.get(symbol, []))
+                candle_count = candle_data_copy.length(symbol)
                 if symbol not in candle_data_copy or candle_count < 50:
                     logger.info(f"⏭️  [DEBUG] {symbol}: Skipping - insufficient candle data ({candle_count} candles, need 50+)")
                     
@@ -1547,7 +2103,7 @@ class RealtimeBotEngine:
                             logger.debug(f"Activity logger (skip) error: {e}")
                     continue
                 
-                df = candle_data_copy[symbol].copy()
+                df = candle_data_copy[symbol]  # Read-only view; strategies add columns to their own frame
                 
                 # � DUAL-REGIME SYSTEM: Trend-Following vs Mean Reversion
                 # ADX >= 20: Use trend-following strategies (breakouts, patterns)
@@ -1559,10 +2115,23 @@ class RealtimeBotEngine:
                     # 🔄 SIDEWAYS MARKET: Try Mean Reversion Strategy
                     logger.debug(f"🔄 [{symbol}] ADX {current_adx:.1f} < 20 → SIDEWAYS MARKET → Checking Mean Reversion")
                     
+                    if symbol not in mr_candidates:
+                        logger.debug(f"⏭️ [{symbol}] Mean reversion pre-filter: RSI not at an extreme")
+                        if self._activity_logger:
+                            try:
+                                self._activity_logger.log_symbol_skipped(
+                                    symbol=symbol,
+                                    reason=f"ADX={current_adx:.1f} < 20, no mean reversion setup"
+                                )
+                            except:
+                                pass
+                        continue
+                    
                     try:
                         # Calculate Bollinger Bands if not present
                         if 'BB_MIDDLE' not in df.columns:
-                            df = self._mean_reversion.calculate_indicators(df)
+                            df = self._indicator_cache.frame(symbol, df, 'mean_reversion',
+                                                             self._mean_reversion.calculate_indicators)
                         
                         # Find mean reversion setup
                         mr_signal = self._mean_reversion.find_mean_reversion_setup(df, symbol)
@@ -1604,7 +2173,7 @@ class RealtimeBotEngine:
                 # Pattern detection (detects both forming and confirmed patterns)
                 # ONLY runs if ADX >= 20 (trending) OR if mean reversion already found signal
                 if current_adx >= 20:
-                    pattern_details = self._pattern_detector.scan(df)
+                    pattern_details = pattern_results[symbol] if symbol in pattern_results else self._pattern_detector.scan(df, symbol)
                 # else: pattern_details already set by mean reversion above
                 
                 if not pattern_details:
@@ -1655,6 +2224,7 @@ class RealtimeBotEngine:
                 # 30-point validation (optional, only for tradeable patterns)
                 is_valid = True
                 if self._execution_manager:
+                    pattern_details.setdefault('symbol', symbol)  # Needed for live depth checks
                     is_valid = self._execution_manager.validate_trade_entry(df, pattern_details)
                 if not is_valid:
                     continue
@@ -1707,6 +2277,12 @@ class RealtimeBotEngine:
             except Exception as e:
                 logger.error(f"Error analyzing {symbol}: {e}", exc_info=True)
         
+        self._scan_reports[tracker.name] = tracker.end()
+        
+        # Shortlisted symbols are streamed with depth until they drop out of the scan
+        # (unchanged symbols keep their place until re-evaluated)
+        self._shortlist = {sig['symbol'] for sig in signals} | (self._shortlist & tracker.skipped_symbols)
+        
         # STEP 2: Rank signals by confidence * risk-reward ratio
         if signals:
             # Sort by composite score (confidence * RR ratio)
@@ -1722,7 +2298,30 @@ class RealtimeBotEngine:
             max_positions = self._risk_manager.risk_limits.max_positions
             available_slots = max_positions - current_positions
             
-            for sig in signals[:available_slots]:
+            # Advanced 24-Level Screening of the whole shortlist in one call (level inputs
+            # shared per symbol and bar; VaR is re-checked right before each order)
+            shortlist = signals[:available_slots]
+            screening_batch = [
+                {
+                    'symbol': sig['symbol'],
+                    'signal_data': {
+                        'action': 'BUY' if sig['pattern_details'].get('breakout_direction', 'up') == 'up' else 'SELL',
+                        'entry_price': sig['current_price'],
+                        'stop_loss': sig['stop_loss'],
+                        'target': sig['target'],
+                        'pattern_name': sig['pattern_details'].get('pattern_name'),
+                        'score': sig['confidence']
+                    },
+                    'df': candle_data_copy[sig['symbol']],
+                    'current_price': sig['current_price'],
+                }
+                for sig in shortlist
+            ]
+            screening = self._advanced_screening.validate_signals(
+                screening_batch, current_positions=self._position_manager.get_all_positions()
+            )
+            
+            for sig, screen_item, (is_screened, screen_reason) in zip(shortlist, screening_batch, screening.decisions):
                 try:
                     # CRITICAL FIX: Comprehensive position sizing validation
                     risk_per_share = abs(sig['current_price'] - sig['stop_loss'])
@@ -1766,22 +2365,14 @@ class RealtimeBotEngine:
                             pattern=sig['pattern_details'].get('pattern_name', 'Unknown')
                         )
                     
-                    signal_data = {
-                        'action': 'BUY' if sig['pattern_details'].get('breakout_direction', 'up') == 'up' else 'SELL',
-                        'entry_price': sig['current_price'],
-                        'stop_loss': sig['stop_loss'],
-                        'target': sig['target'],
-                        'pattern_name': sig['pattern_details'].get('pattern_name'),
-                        'score': sig['confidence']
-                    }
+                    signal_data = screen_item['signal_data']
                     
-                    is_screened, screen_reason = self._advanced_screening.validate_signal(
-                        symbol=sig['symbol'],
-                        signal_data=signal_data,
-                        df=candle_data_copy[sig['symbol']],
-                        current_positions=self._position_manager.get_all_positions(),
-                        current_price=sig['current_price']
-                    )
+                    # VaR against the positions open now (orders placed earlier in this loop included)
+                    if is_screened:
+                        var_ok, var_reason = self._advanced_screening.check_var_limit(
+                            sig['symbol'], signal_data, self._position_manager.get_all_positions())
+                        if not var_ok:
+                            is_screened, screen_reason = False, var_reason
                     
                     if not is_screened:
                         logger.warning(f"❌ [{sig['symbol']}] Advanced Screening BLOCKED: {screen_reason}")
@@ -1983,31 +2574,45 @@ class RealtimeBotEngine:
         # Update market internals BEFORE scanning (for TICK indicator)
         self._update_market_internals()
         
-        with self._lock:
-            candle_data_copy = self.candle_data.copy()
-            latest_prices_copy = self.latest_prices.copy()
+        # Immutable snapshot (read-only views, no lock or copy)
+        snapshot = self._market_snapshot()
+        candle_data_copy = snapshot.candles
+        latest_prices_copy = snapshot.prices
         
         # STEP 1: Scan all symbols and collect signals
         signals = []
         
+        # NIFTY 50 regime once per cycle (stock proxy only until the index has indicator history)
+        regime = self._market_regime.update(candle_data_copy)
+        nifty_latest = regime.indicators if regime is not None and regime.ready else None
+        
         logger.info(f"🛡️ Running Ironclad analysis on {len(self.symbols)} symbols...")
         
+        tracker = self._scan_tracker('ironclad')
+        tracker.begin()
+        
         for symbol in self.symbols:
+            # No new bars since this strategy last evaluated the symbol → same result, skip
+            if not tracker.should_evaluate(symbol, candle_data_copy.generation(symbol)):
+                continue
+            
             try:
-                if symbol not in candle_data_copy or len(candle_data_copy[symbol]) < 100:
+                if candle_data_copy.length(symbol) < 100:
                     continue
                 
                 if self._position_manager.has_position(symbol):
                     continue
                 
-                stock_df = candle_data_copy[symbol].copy()
-                nifty_df = stock_df.copy()  # Use stock as NIFTY proxy for now
+                stock_df = candle_data_copy[symbol]
+                # Fallback: stock as NIFTY proxy (separate frame, shared data)
+                nifty_df = candle_data_copy[symbol] if nifty_latest is None else None
                 
                 signal = self._ironclad.run_analysis_cycle(
                     nifty_df=nifty_df,
                     stock_df=stock_df,
                     symbol=symbol,
-                    bot_start_time=self.bot_start_time
+                    bot_start_time=self.bot_start_time,
+                    nifty_latest=nifty_latest
                 )
                 
                 if not signal or signal.get('action') == 'HOLD':
@@ -2043,6 +2648,12 @@ class RealtimeBotEngine:
             except Exception as e:
                 logger.error(f"Error in Ironclad analysis for {symbol}: {e}", exc_info=True)
         
+        self._scan_reports[tracker.name] = tracker.end()
+        
+        # Shortlisted symbols are streamed with depth until they drop out of the scan
+        # (unchanged symbols keep their place until re-evaluated)
+        self._shortlist = {sig['symbol'] for sig in signals} | (self._shortlist & tracker.skipped_symbols)
+        
         # STEP 2: Rank signals by Ironclad score
         if signals:
             signals.sort(key=lambda x: x['score'], reverse=True)
@@ -2056,14 +2667,38 @@ class RealtimeBotEngine:
             max_positions = self._risk_manager.risk_limits.max_positions
             available_slots = max_positions - current_positions
             
-            for sig in signals[:available_slots]:
+            # Advanced 24-Level Screening of the whole shortlist in one call
+            shortlist = signals[:available_slots]
+            screening_batch = []
+            for sig in shortlist:
+                signal = sig['signal']
+                current_price = latest_prices_copy.get(sig['symbol'], signal.get('entry_price', 0))
+                screening_batch.append({
+                    'symbol': sig['symbol'],
+                    'signal_data': {
+                        'action': signal.get('action'),
+                        'entry_price': current_price,
+                        'stop_loss': signal.get('stop_loss', current_price * 0.98),
+                        'target': signal.get('target', current_price * 1.05),
+                        'pattern_name': 'Ironclad DR Breakout',
+                        'score': sig['score']
+                    },
+                    'df': candle_data_copy[sig['symbol']],
+                    'current_price': current_price,
+                })
+            screening = self._advanced_screening.validate_signals(
+                screening_batch, current_positions=self._position_manager.get_all_positions()
+            )
+            
+            for sig, screen_item, (is_screened, screen_reason) in zip(shortlist, screening_batch, screening.decisions):
                 try:
                     signal = sig['signal']
                     symbol = sig['symbol']
+                    signal_data = screen_item['signal_data']
                     
-                    current_price = latest_prices_copy.get(symbol, signal.get('entry_price', 0))
-                    stop_loss = signal.get('stop_loss', current_price * 0.98)
-                    target = signal.get('target', current_price * 1.05)
+                    current_price = screen_item['current_price']
+                    stop_loss = signal_data['stop_loss']
+                    target = signal_data['target']
                     
                     # Position sizing
                     risk_per_share = abs(current_price - stop_loss)
@@ -2073,22 +2708,13 @@ class RealtimeBotEngine:
                     
                     # NEW: Advanced 24-Level Screening (before order placement)
                     logger.info(f"🔍 [{symbol}] Running Advanced 24-Level Screening...")
-                    signal_data = {
-                        'action': signal.get('action'),
-                        'entry_price': current_price,
-                        'stop_loss': stop_loss,
-                        'target': target,
-                        'pattern_name': 'Ironclad DR Breakout',
-                        'score': sig['score']
-                    }
                     
-                    is_screened, screen_reason = self._advanced_screening.validate_signal(
-                        symbol=symbol,
-                        signal_data=signal_data,
-                        df=candle_data_copy[symbol],
-                        current_positions=self._position_manager.get_all_positions(),
-                        current_price=current_price
-                    )
+                    # VaR against the positions open now (orders placed earlier in this loop included)
+                    if is_screened:
+                        var_ok, var_reason = self._advanced_screening.check_var_limit(
+                            symbol, signal_data, self._position_manager.get_all_positions())
+                        if not var_ok:
+                            is_screened, screen_reason = False, var_reason
                     
                     if not is_screened:
                         logger.warning(f"❌ [{symbol}] Advanced Screening BLOCKED: {screen_reason}")
@@ -2192,10 +2818,10 @@ class RealtimeBotEngine:
         
         logger.info("⭐ Running Alpha-Ensemble Multi-Timeframe Analysis...")
         
-        # Get real-time candle data and prices (thread-safe)
-        with self._lock:
-            candle_data_copy = self.candle_data.copy()
-            latest_prices_copy = self.latest_prices.copy()
+        # Get real-time candle data and prices (immutable snapshot: no lock, no copy)
+        snapshot = self._market_snapshot()
+        candle_data_copy = snapshot.candles
+        latest_prices_copy = snapshot.prices
         
         # Check current positions
         current_positions = self._position_manager.get_all_positions()
@@ -2206,20 +2832,46 @@ class RealtimeBotEngine:
             logger.info(f"⏸️  Max positions ({max_positions}) reached - skipping new signals")
             return
         
+        # Indicators for the whole universe, one vectorised pass per timeframe and bar close
+        panel_params = dict(
+            ema_spans=(20, 50, 200),
+            rsi_period=self._alpha_ensemble.RSI_PERIOD,
+            atr_period=self._alpha_ensemble.ATR_PERIOD,
+            adx_period=self._alpha_ensemble.ADX_PERIOD,
+        )
+        exec_panel = self._get_indicator_panel('5m', **panel_params)
+        trend_panel = self._get_indicator_panel('15m', **panel_params)
+        
         # Scan all symbols using Alpha-Ensemble logic
         signals = []
         
+        tracker = self._scan_tracker('alpha-ensemble')
+        tracker.begin()
+        
+        # STEP 1: Bars + latest indicator values per symbol (cheap lookups)
+        candidates = []
         for symbol in self.symbols:
+            # No new bars since this strategy last evaluated the symbol → same result, skip
+            if not tracker.should_evaluate(symbol, candle_data_copy.generation(symbol)):
+                continue
+            
             try:
-                # Skip if insufficient data (need 200 candles for EMA200)
-                if symbol not in candle_data_copy or len(candle_data_copy[symbol]) < 200:
-                    continue
-                
                 # Skip if already in position
                 if symbol in current_positions:
                     continue
                 
-                df = candle_data_copy[symbol].copy()
+                # Multi-timeframe: EMA200 trend on 15-min bars, execution filters on 5-min bars
+                trend_df = self.get_bars(symbol, '15m')
+                exec_df = self.get_bars(symbol, '5m')
+                if trend_df is None or len(trend_df) < 200 or exec_df is None or len(exec_df) < 50:
+                    # Not enough rolled-up history yet - fall back to 1-minute bars
+                    trend_df = None
+                    exec_df = None
+                    # Skip if insufficient data (need 200 candles for EMA200)
+                    if candle_data_copy.length(symbol) < 200:
+                        continue
+                
+                df = exec_df if exec_df is not None else candle_data_copy[symbol]
                 
                 # CRITICAL: Validate DataFrame has required columns before accessing
                 # Columns can be either lowercase ('close') or capitalized ('Close')
@@ -2230,8 +2882,50 @@ class RealtimeBotEngine:
                 
                 current_price = latest_prices_copy.get(symbol, float(df[close_col].iloc[-1]))
                 
+                # Latest indicator values from the panels (None → computed per symbol)
+                if trend_df is not None:
+                    indicators = exec_panel.latest(symbol)
+                    trend = trend_panel.latest(symbol)
+                    if indicators is not None and trend is not None:
+                        indicators['EMA_200'] = trend['EMA_200']
+                    else:
+                        indicators = None
+                else:
+                    indicators = None  # 1-minute fallback: filled from the minute panel below
+                
+                candidates.append((symbol, df, trend_df, current_price, indicators))
+                
+            except Exception as e:
+                logger.error(f"Error analyzing {symbol} with Alpha-Ensemble: {e}", exc_info=True)
+        
+        # 1-minute panel only for symbols without enough rolled-up history (usually none)
+        fallback = [c[0] for c in candidates if c[2] is None]
+        if fallback:
+            minute_panel = self._get_indicator_panel('1m', symbols=fallback, **panel_params)
+            candidates = [c if c[2] is not None else c[:4] + (minute_panel.latest(c[0]),) for c in candidates]
+        
+        # Nifty day change for the market regime layer (shared index state, once per cycle)
+        regime = self._market_regime.update(candle_data_copy)
+        nifty_change_pct = regime.day_change_pct if regime is not None else None
+        
+        # STEP 2: Threshold filters for all candidates in one vectorised pass
+        # (symbols without panel values pass - analyze_symbol computes theirs)
+        values, known = stack_rows([c[4] for c in candidates],
+                                   ('EMA_200', 'EMA_20', 'EMA_50', 'ADX', 'RSI', 'ATR', 'Volume', 'Volume_SMA'))
+        values['price'] = np.array([c[3] for c in candidates], dtype=np.float64)
+        survivors = set(self._alpha_prefilter().apply([c[0] for c in candidates], values, known))
+        
+        # STEP 3: Full analysis of the survivors only
+        for symbol, df, trend_df, current_price, indicators in candidates:
+            if symbol not in survivors:
+                continue
+            
+            try:
                 # Run Alpha-Ensemble analysis
-                signal = self._alpha_ensemble.analyze_symbol(df, symbol, current_price)
+                signal = self._alpha_ensemble.analyze_symbol(
+                    df, symbol, current_price, trend_df=trend_df, indicators=indicators,
+                    nifty_change_pct=nifty_change_pct
+                )
                 
                 if not signal or signal.get('action') == 'HOLD':
                     continue
@@ -2252,6 +2946,12 @@ class RealtimeBotEngine:
             except Exception as e:
                 logger.error(f"Error analyzing {symbol} with Alpha-Ensemble: {e}", exc_info=True)
         
+        self._scan_reports[tracker.name] = tracker.end()
+        
+        # Shortlisted symbols are streamed with depth until they drop out of the scan
+        # (unchanged symbols keep their place until re-evaluated)
+        self._shortlist = {sig['symbol'] for sig in signals} | (self._shortlist & tracker.skipped_symbols)
+        
         # Rank signals by Alpha-Ensemble score
         if signals:
             signals.sort(key=lambda x: x['score'], reverse=True)
@@ -2320,6 +3020,10 @@ class RealtimeBotEngine:
                                 'confidence': sig['score']
                             }
                         
+                        # Re-check as soon as price trades into the retest zone (not on the next bar)
+                        zone = (entry_price * 0.997, entry_price) if direction == 'up' else (entry_price, entry_price * 1.003)
+                        self._event_bus.watch_levels(symbol, 'retest', zone, price=current_price)
+                        
                         logger.info(f"📌 [{symbol}] RETEST MODE: Breakout detected @ ₹{entry_price:.2f}")
                         logger.info(f"   Waiting for retest (pullback) before entry with limit order")
                         logger.info(f"   This improves R:R and reduces slippage")
@@ -2539,6 +3243,10 @@ class RealtimeBotEngine:
                 # 🚨 AUDIT FIX: Record order execution for OTR tracking
                 self._otr_monitor.record_order_executed()
                 
+                # Funds changed - refresh margin now rather than at the next scheduled pass
+                if self._margin_service:
+                    self._margin_service.request_refresh()
+                
                 # Create position data with ML signal ID
                 position_data = {
                     'symbol': symbol,
@@ -2605,9 +3313,8 @@ class RealtimeBotEngine:
             if not positions:
                 return
             
-            # Get latest prices (thread-safe)
-            with self._lock:
-                current_prices = self.latest_prices.copy()
+            # Get latest prices (immutable snapshot, thread-safe without the lock)
+            current_prices = self._market_snapshot().prices
             
             # CRITICAL: Warn if no price data available
             if not current_prices:
@@ -2916,6 +3623,8 @@ class RealtimeBotEngine:
                     if exit_order:
                         order_id = exit_order.get('orderid', 'unknown')
                         logger.info(f"✅ LIVE exit order placed: {order_id}")
+                        if self._margin_service:
+                            self._margin_service.request_refresh()
                     else:
                         logger.error(f"❌ Failed to place exit order for {symbol}")
                 else:
@@ -3267,23 +3976,24 @@ class RealtimeBotEngine:
                     if timestamp in df.index:
                         candle = df.loc[timestamp]
                         
-                        # Add to candle_data (same format as real-time)
-                        if symbol not in self.candle_data:
-                            self.candle_data[symbol] = pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'])
-                        
-                        new_row = pd.DataFrame({
-                            'open': [candle['open']],
-                            'high': [candle['high']],
-                            'low': [candle['low']],
-                            'close': [candle['close']],
-                            'volume': [candle['volume']]
-                        }, index=[timestamp])
-                        
-                        self.candle_data[symbol] = pd.concat([self.candle_data[symbol], new_row])
+                        # Add to candle_data (same store as real-time, O(1) append)
+                        bar = {
+                            'Open': candle['open'],
+                            'High': candle['high'],
+                            'Low': candle['low'],
+                            'Close': candle['close'],
+                            'Volume': candle['volume']
+                        }
+                        with self._lock:
+                            self.candle_data.append(symbol, timestamp, bar)
+                            self._timeframes_for(symbol).update(timestamp, bar)
                         
                         # Update latest price
                         with self._lock:
                             self.latest_prices[symbol] = float(candle['close'])
+                            self._price_version += 1
+                
+                self._publish_snapshot()
                 
                 # Run strategy analysis at this timestamp
                 try:
@@ -3504,6 +4214,8 @@ class RealtimeBotEngine:
                     self.feed_token = feed_token
                     self.credentials['jwt_token'] = jwt_token
                     self.credentials['feed_token'] = feed_token
+                    if self._margin_service:
+                        self._margin_service.update_token(jwt_token)  # getRMS would keep the expired token
                     
                     logger.info("✅ Tokens refreshed successfully")
                     
@@ -10,7 +10,7 @@
 import pandas as pd
 # import pandas_ta as ta # TEMPORARILY DISABLED - not compatible with Python 3.11
 # TODO: Migrate to alternative library like ta-lib or implement indicators manually
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, Callable, Tuple, Optional
 import logging
 import requests
 
@@ -21,13 +21,27 @@ class ExecutionChecker:
     Performs Phase C of the Grandmaster Checklist: Final, Pre-Execution Confirmation.
     """
 
-    def __init__(self, api_key: Optional[str] = None, jwt_token: Optional[str] = None):
+    # Check 25 limits (live best-5 depth)
+    MAX_SPREAD_PCT = 0.15            # Max bid-ask spread as % of mid
+    MAX_SPREAD_TO_TARGET = 0.10      # Max spread as a fraction of the entry→target distance
+
+    def __init__(self, api_key: Optional[str] = None, jwt_token: Optional[str] = None,
+                 order_book_provider: Optional[Callable] = None, margin_provider: Optional[Callable] = None,
+                 reject_stale_margin: bool = False):
         """Initializes the Execution Checker.
         
         Args:
             api_key: Angel One API key (optional, for margin checks)
             jwt_token: User's JWT token (optional, for margin checks)
+            order_book_provider: Optional callable(symbol) -> OrderBook or None (live depth for check 25)
+            margin_provider: Optional callable() -> MarginSnapshot or None (background-refreshed
+                             RMS margin for check 27; replaces the blocking getRMS call)
+            reject_stale_margin: Fail check 27 when the margin snapshot is missing or stale
+                                 (default: pass with a warning, as on a failed fetch)
         """
+        self.order_book_provider = order_book_provider
+        self.margin_provider = margin_provider
+        self.reject_stale_margin = reject_stale_margin
         # In a real system, the ML model would be loaded here.
         # self.ml_model = load_model('confidence_model.pkl')
         self.api_key = api_key
@@ -75,8 +89,37 @@ class ExecutionChecker:
         return atr_pct < 3.0
     
     def check_25_spread_cost(self, data: pd.DataFrame, pattern_details: Dict[str, Any]) -> bool:
-        """Check 25: Spread Cost"""
-        # Ensure adequate liquidity (volume check)
+        """
+        Check 25: Spread Cost
+        Uses the live best-5 order book when available, otherwise falls back to a volume check.
+        """
+        book = None
+        symbol = pattern_details.get('symbol')
+        if self.order_book_provider and symbol:
+            try:
+                book = self.order_book_provider(symbol)
+            except Exception as e:
+                logger.debug(f"Check 25: order book unavailable for {symbol}: {e}")
+        
+        if book is not None and book.is_valid:
+            spread = book.spread()
+            spread_pct = book.spread_pct()
+            if spread_pct > self.MAX_SPREAD_PCT:
+                logger.warning(f"❌ Check 25: {symbol} spread {spread_pct:.3f}% > {self.MAX_SPREAD_PCT}%")
+                return False
+            
+            entry = pattern_details.get('breakout_price') or pattern_details.get('entry_price')
+            target = pattern_details.get('calculated_price_target') or pattern_details.get('target')
+            if entry and target and abs(target - entry) > 0:
+                spread_share = spread / abs(target - entry)
+                if spread_share > self.MAX_SPREAD_TO_TARGET:
+                    logger.warning(f"❌ Check 25: {symbol} spread ₹{spread:.2f} is {spread_share:.0%} of the move to target")
+                    return False
+            
+            logger.debug(f"✅ Check 25: {symbol} spread {spread_pct:.3f}% (imbalance {book.imbalance():+.2f})")
+            return True
+        
+        # No live depth: ensure adequate liquidity (volume check)
         if 'volume' not in data.columns:
             return True
         current_volume = data['volume'].iloc[-1]
@@ -93,20 +136,36 @@ class ExecutionChecker:
         """
         Check 27: Account Margin Availability
         Query Angel One RMS API for real margin availability
+        
+        With a margin_provider the margin comes from memory (refreshed in the
+        background); a missing or stale snapshot is reported explicitly.
         """
+        if self.margin_provider:
+            snapshot = self.margin_provider()
+            if snapshot is None or snapshot.stale:
+                status = ("no margin snapshot yet" if snapshot is None
+                          else f"margin snapshot stale ({snapshot.age:.0f}s > {snapshot.max_age:.0f}s)")
+                if self.reject_stale_margin:
+                    logger.warning(f"❌ Check 27: {status} - rejecting")
+                    return False
+                logger.warning(f"Check 27: {status}, passing by default")
+                return True
+            margin_data = snapshot.data
+        
         # If API credentials not provided, pass (backward compatibility)
-        if not self.api_key or not self.jwt_token:
+        elif not self.api_key or not self.jwt_token:
             logger.debug("Check 27: API credentials not available, skipping margin check")
             return True
         
-        try:
+        else:
             # Get available margin from Angel One RMS API
             margin_data = self._get_rms_margin()
             
             if not margin_data:
                 logger.warning("Check 27: Failed to fetch margin data, passing by default")
                 return True
-            
+        
+        try:
             # Extract available cash and margin
             available_cash = float(margin_data.get('availablecash', 0))
             available_margin = float(margin_data.get('availablelimitmargin', 0))
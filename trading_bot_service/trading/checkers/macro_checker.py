@@ -8,7 +8,7 @@
 # ==============================================================================
 
 import pandas as pd
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Callable, Optional
 
 # Import fundamental data fetcher
 try:
@@ -22,8 +22,14 @@ class MacroChecker:
     Performs Phase A of the Grandmaster Checklist: Strategic & Macro Environment Filter.
     """
 
-    def __init__(self):
-        """Initializes the Macro Checker."""
+    def __init__(self, market_regime_provider: Optional[Callable] = None):
+        """Initializes the Macro Checker.
+        
+        Args:
+            market_regime_provider: Optional callable() -> RegimeState or None
+                (shared NIFTY 50 state for check 1)
+        """
+        self.market_regime_provider = market_regime_provider
         self.fundamental_fetcher = None
         if FUNDAMENTALS_AVAILABLE:
             try:
@@ -37,6 +43,19 @@ class MacroChecker:
     
     def check_1_overall_market_trend(self, data: pd.DataFrame, pattern_details: Dict[str, Any]) -> bool:
         """Check 1: Overall market trend alignment"""
+        # NIFTY 50 vs its 50 SMA in the trade direction, when the index is streamed
+        regime = None
+        if self.market_regime_provider:
+            try:
+                regime = self.market_regime_provider()
+            except Exception as e:
+                print(f"Check 1: market regime unavailable: {e}")
+        if regime is not None and regime.ready:
+            index_sma_50 = regime.indicators['sma_50']
+            if pattern_details.get('breakout_direction', 'up') == 'down':
+                return regime.close < index_sma_50
+            return regime.close > index_sma_50
+        
         # Simplified: Check if price above 50 SMA
         if 'sma_50' in data.columns and len(data) > 50:
             return float(data['Close'].iloc[-1]) > float(data['sma_50'].iloc[-1])
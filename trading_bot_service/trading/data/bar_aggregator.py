@@ -0,0 +1,181 @@
+"""
+Streaming Bar Aggregator
+Builds 1-minute OHLCV bars incrementally from the tick stream
+"""
+
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Angel One exchange timestamps are epoch milliseconds; candles are labelled in IST
+# (naive) to match the historical API bars loaded at bootstrap.
+IST_OFFSET_MS = 5 * 3600 * 1000 + 30 * 60 * 1000
+ONE_MINUTE_MS = 60 * 1000
+_EPOCH = datetime(1970, 1, 1)
+
+
+def ms_to_ist(epoch_ms: int) -> datetime:
+    """Convert epoch milliseconds to a naive IST datetime."""
+    return _EPOCH + timedelta(milliseconds=epoch_ms + IST_OFFSET_MS)
+
+
+class Bar:
+    """Single OHLCV bar. Mutable only while it is the open bar of an aggregator."""
+
+    __slots__ = ('start_ms', 'open', 'high', 'low', 'close', 'volume', 'tick_count')
+
+    def __init__(self, start_ms: int, price: float, volume: float = 0.0):
+        self.start_ms = start_ms
+        self.open = price
+        self.high = price
+        self.low = price
+        self.close = price
+        self.volume = volume
+        self.tick_count = 1
+
+    @property
+    def timestamp(self) -> datetime:
+        """Bar start as naive IST datetime (same convention as historical candles)."""
+        return ms_to_ist(self.start_ms)
+
+    def as_dict(self) -> Dict:
+        return {
+            'Open': self.open,
+            'High': self.high,
+            'Low': self.low,
+            'Close': self.close,
+            'Volume': self.volume,
+        }
+
+    def __repr__(self):
+        return (f"Bar({self.timestamp:%H:%M} O={self.open} H={self.high} "
+                f"L={self.low} C={self.close} V={self.volume})")
+
+
+class BarAggregator:
+    """
+    Incremental per-symbol bar builder.
+
+    Each tick updates the open bar in place (O(1)). A bar is finalised only when
+    a tick from a later interval arrives, or when roll() is called after the
+    interval has ended. Closed bars are exposed as an append-only series indexed
+    by an absolute counter, so consumers can pull only what they haven't seen:
+
+        new_bars = aggregator.closed_since(last_seen)
+        last_seen = aggregator.closed_count
+    """
+
+    def __init__(self, interval_ms: int = ONE_MINUTE_MS, max_closed: int = 1000,
+                 close_grace_ms: int = 2000):
+        """
+        Args:
+            interval_ms: Bar length in milliseconds (default 1 minute)
+            max_closed: Closed bars retained for closed_since() readers
+            close_grace_ms: How long after the interval end roll() waits for
+                late ticks before closing the open bar
+        """
+        self.interval_ms = interval_ms
+        self.close_grace_ms = close_grace_ms
+        self.current_bar: Optional[Bar] = None
+        self._closed = deque(maxlen=max_closed)
+        self.closed_count = 0  # Absolute number of bars ever closed
+        self._last_cum_volume: Optional[float] = None
+
+    def _bucket(self, ts_ms: int) -> int:
+        return ts_ms - (ts_ms % self.interval_ms)
+
+    def _volume_delta(self, cum_volume: float) -> float:
+        """
+        Angel One reports volume as cumulative traded volume for the day, so bar
+        volume is the increase since the previous tick. A tick without volume
+        (LTP mode) drops the baseline: the next volume tick re-baselines with a
+        0 delta instead of booking everything traded in between into one bar.
+        """
+        if not cum_volume or cum_volume <= 0:
+            self._last_cum_volume = None
+            return 0.0
+        last = self._last_cum_volume
+        self._last_cum_volume = cum_volume
+        if last is None or cum_volume < last:
+            return 0.0
+        return float(cum_volume - last)
+
+    def reset_volume(self):
+        """Forget the cumulative-volume baseline (e.g. the token's streaming mode changed)."""
+        self._last_cum_volume = None
+
+    def _close_current(self) -> Optional[Bar]:
+        bar = self.current_bar
+        if bar is None:
+            return None
+        self._closed.append(bar)
+        self.closed_count += 1
+        self.current_bar = None
+        return bar
+
+    def update(self, ts_ms: int, price: float, cum_volume: float = 0.0) -> Optional[Bar]:
+        """
+        Apply one tick.
+
+        Args:
+            ts_ms: Tick time as epoch milliseconds
+            price: Last traded price
+            cum_volume: Cumulative day volume reported with the tick (0 if unknown)
+
+        Returns:
+            The bar that was closed by this tick, or None
+        """
+        volume = self._volume_delta(cum_volume)
+        bucket = self._bucket(ts_ms)
+        bar = self.current_bar
+
+        if bar is not None and bucket <= bar.start_ms:
+            # Same interval (late ticks are folded into the open bar - closed bars are final)
+            if price > bar.high:
+                bar.high = price
+            elif price < bar.low:
+                bar.low = price
+            bar.close = price
+            bar.volume += volume
+            bar.tick_count += 1
+            return None
+
+        closed = self._close_current()
+        self.current_bar = Bar(bucket, price, volume)
+        return closed
+
+    def roll(self, now_ms: int) -> Optional[Bar]:
+        """
+        Close the open bar if its interval has ended and no new tick arrived.
+
+        Args:
+            now_ms: Current time as epoch milliseconds
+
+        Returns:
+            The closed bar, or None
+        """
+        bar = self.current_bar
+        if bar is not None and now_ms >= bar.start_ms + self.interval_ms + self.close_grace_ms:
+            return self._close_current()
+        return None
+
+    def closed_since(self, index: int) -> List[Bar]:
+        """
+        Closed bars with absolute index >= index.
+
+        Bars older than the retention window are silently unavailable.
+        """
+        missing = self.closed_count - index
+        if missing <= 0:
+            return []
+        size = len(self._closed)
+        if missing >= size:
+            return list(self._closed)
+        return [self._closed[i] for i in range(size - missing, size)]
+
+    @property
+    def last_closed(self) -> Optional[Bar]:
+        return self._closed[-1] if self._closed else None
@@ -0,0 +1,291 @@
+"""
+Candle Store
+Fixed-capacity, array-backed OHLCV + indicator history per symbol
+"""
+
+import itertools
+import logging
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from trading.data.online_indicators import OnlineIndicators
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+INDICATOR_COLUMNS = OnlineIndicators.COLUMNS
+COLUMNS = OHLCV_COLUMNS + INDICATOR_COLUMNS
+
+# Two full sessions of 1-minute bars (previous day bootstrap + today)
+DEFAULT_CAPACITY = 750
+
+# Indicator columns are only exposed once the SMA-200 can exist (same contract
+# as RealtimeBotEngine._calculate_indicators callers)
+MIN_INDICATOR_BARS = 200
+
+_COLUMN_INDEX = {name: i for i, name in enumerate(COLUMNS)}
+_COLUMN_ALIASES = {name.lower(): name for name in OHLCV_COLUMNS}
+
+# Shared by all stores, so a store replaced by a new one never repeats a generation
+_generations = itertools.count(1)
+
+
+def _to_ns(timestamp) -> int:
+    """Naive (IST) datetime/Timestamp → int64 nanoseconds."""
+    ts = pd.Timestamp(timestamp)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return ts.value
+
+
+def _frame(ts: np.ndarray, data: np.ndarray, ncols: int) -> pd.DataFrame:
+    """Wrap read-only array slices in a DataFrame without copying them."""
+    index = pd.DatetimeIndex(ts.view('datetime64[ns]'), name='timestamp', copy=False)
+    return pd.DataFrame(data[:, :ncols], index=index, columns=list(COLUMNS[:ncols]), copy=False)
+
+
+class CandleView:
+    """
+    Immutable snapshot of a CandleStore window.
+
+    Holds read-only slices of the store's arrays. The store never writes inside
+    a published window (appends go past its end and compaction moves to a new
+    buffer), so a view stays valid and unchanged without copying anything.
+    """
+
+    __slots__ = ('_ts', '_data', '_ncols', 'generation')
+
+    def __init__(self, ts: np.ndarray, data: np.ndarray, ncols: int, generation: int = 0):
+        ts.flags.writeable = False
+        data.flags.writeable = False
+        self._ts = ts
+        self._data = data
+        self._ncols = ncols
+        self.generation = generation  # Store generation the snapshot was taken at
+
+    def __len__(self) -> int:
+        return len(self._ts)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Read-only DataFrame over the snapshot (new frame object, shared data)."""
+        return _frame(self._ts, self._data, self._ncols)
+
+
+class CandleStore:
+    """
+    Last `capacity` candles of one symbol in preallocated NumPy arrays.
+
+    Rows live in a buffer of capacity + slack. Appends write one row past the
+    current window; when the buffer end is reached the window is moved to a
+    fresh buffer (amortised O(1), old views keep the old buffer). Memory per
+    symbol is therefore bounded for the whole session.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, slack: Optional[int] = None):
+        """
+        Args:
+            capacity: Maximum number of candles retained
+            slack: Extra rows appended before the window is compacted
+                (default capacity // 2)
+        """
+        self.capacity = capacity
+        self._rows = capacity + (slack if slack is not None else max(capacity // 2, 1))
+        self._ts = np.zeros(self._rows, dtype=np.int64)
+        self._data = np.full((self._rows, len(COLUMNS)), np.nan)
+        self._start = 0
+        self._end = 0
+        self.total_count = 0  # Candles ever appended/loaded (not capped by capacity)
+        self.has_indicators = False
+        self.indicators: Optional[OnlineIndicators] = None  # Online state continuing this series
+        self.generation = next(_generations)  # Changes whenever the candles change (append / reload)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, capacity: int = DEFAULT_CAPACITY) -> 'CandleStore':
+        """
+        Build a store from an OHLCV(+indicator) DataFrame indexed by timestamp.
+
+        Column names are matched case-insensitively for OHLCV; unknown columns
+        are ignored. Only the last `capacity` rows are kept.
+        """
+        store = cls(capacity)
+        df = df.rename(columns=lambda col: _COLUMN_ALIASES.get(col, col) if isinstance(col, str) else col)
+        tail = df.iloc[-capacity:]
+        n = len(tail)
+
+        index = tail.index
+        if isinstance(index, pd.DatetimeIndex):
+            if index.tz is not None:
+                index = index.tz_localize(None)
+            store._ts[:n] = index.as_unit('ns').asi8
+        else:
+            store._ts[:n] = [_to_ns(ts) for ts in index]
+
+        for name in COLUMNS:
+            if name in tail.columns:
+                store._data[:n, _COLUMN_INDEX[name]] = tail[name].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        store._end = n
+        store.total_count = len(df)
+        store.has_indicators = 'sma_200' in tail.columns
+        return store
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def last_timestamp(self) -> Optional[pd.Timestamp]:
+        if self._end == self._start:
+            return None
+        return pd.Timestamp(self._ts[self._end - 1])
+
+    def _compact(self):
+        """Move the live window to the start of a new buffer."""
+        n = self._end - self._start
+        ts = np.zeros(self._rows, dtype=np.int64)
+        data = np.full((self._rows, len(COLUMNS)), np.nan)
+        ts[:n] = self._ts[self._start:self._end]
+        data[:n] = self._data[self._start:self._end]
+        self._ts, self._data = ts, data
+        self._start, self._end = 0, n
+
+    def append(self, timestamp, values: Dict[str, float]):
+        """
+        Append one candle.
+
+        Args:
+            timestamp: Candle start (naive IST datetime)
+            values: Column → value (capitalized OHLCV and indicator names);
+                missing columns are stored as NaN
+        """
+        if self._end == self._rows:
+            self._compact()
+        if self._end == self._start and self.total_count == 0:
+            self.has_indicators = 'sma_200' in values
+
+        row = self._data[self._end]
+        for name, value in values.items():
+            col = _COLUMN_INDEX.get(_COLUMN_ALIASES.get(name, name))
+            if col is not None:
+                row[col] = value
+        self._ts[self._end] = _to_ns(timestamp)
+        self._end += 1
+        if self._end - self._start > self.capacity:
+            self._start += 1
+        self.total_count += 1
+        self.generation = next(_generations)
+
+    def view(self, indicators: Optional[bool] = None) -> CandleView:
+        """
+        Zero-copy snapshot of the current window.
+
+        Args:
+            indicators: Include indicator columns. Default: only when the store
+                has indicator values and at least MIN_INDICATOR_BARS candles.
+        """
+        if indicators is None:
+            indicators = self.has_indicators and len(self) >= MIN_INDICATOR_BARS
+        ncols = len(COLUMNS) if indicators else len(OHLCV_COLUMNS)
+        return CandleView(self._ts[self._start:self._end], self._data[self._start:self._end], ncols,
+                          self.generation)
+
+    def to_frame(self, indicators: Optional[bool] = None) -> pd.DataFrame:
+        """Read-only DataFrame view of the current window."""
+        return self.view(indicators).to_frame()
+
+
+class CandleSnapshot(Mapping):
+    """Point-in-time {symbol: DataFrame} mapping backed by CandleViews."""
+
+    def __init__(self, views: Dict[str, CandleView]):
+        self._views = views
+
+    def __getitem__(self, symbol: str) -> pd.DataFrame:
+        return self._views[symbol].to_frame()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._views)
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def length(self, symbol: str) -> int:
+        """Candle count for a symbol (0 if absent) without building a frame."""
+        view = self._views.get(symbol)
+        return len(view) if view is not None else 0
+
+    def generation(self, symbol: str) -> int:
+        """Candle generation of a symbol at snapshot time (0 if absent)."""
+        view = self._views.get(symbol)
+        return view.generation if view is not None else 0
+
+    def last_values(self, symbols: Iterable[str], columns: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Last-bar values of `columns` for many symbols as {column: array}.
+
+        NaN where the symbol is absent, empty, or does not expose the column
+        (indicator columns before MIN_INDICATOR_BARS), i.e. exactly when
+        `column in df.columns` would be False for its frame.
+        """
+        symbols = list(symbols)
+        columns = list(columns)
+        out = np.full((len(columns), len(symbols)), np.nan)
+        positions = [_COLUMN_INDEX[_COLUMN_ALIASES.get(column, column)] for column in columns]
+        for j, symbol in enumerate(symbols):
+            view = self._views.get(symbol)
+            if view is None or not len(view):
+                continue
+            last = view._data[-1]
+            for i, position in enumerate(positions):
+                if position < view._ncols:
+                    out[i, j] = last[position]
+        return dict(zip(columns, out))
+
+
+class CandleDataMap(MutableMapping):
+    """
+    Drop-in replacement for the engine's {symbol: DataFrame} candle_data dict.
+
+    Reads return read-only DataFrame views; assigning a DataFrame (bootstrap,
+    replay) loads it into a fresh CandleStore. copy() returns a CandleSnapshot,
+    which shares data with the stores instead of duplicating it.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._stores: Dict[str, CandleStore] = {}
+
+    def __getitem__(self, symbol: str) -> pd.DataFrame:
+        return self._stores[symbol].to_frame()
+
+    def __setitem__(self, symbol: str, df: pd.DataFrame):
+        self._stores[symbol] = CandleStore.from_frame(df, self.capacity)
+
+    def __delitem__(self, symbol: str):
+        del self._stores[symbol]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._stores)
+
+    def __len__(self) -> int:
+        return len(self._stores)
+
+    def __contains__(self, symbol) -> bool:
+        return symbol in self._stores
+
+    def store(self, symbol: str, create: bool = False) -> Optional[CandleStore]:
+        """Underlying CandleStore for a symbol (optionally creating an empty one)."""
+        store = self._stores.get(symbol)
+        if store is None and create:
+            store = self._stores[symbol] = CandleStore(self.capacity)
+        return store
+
+    def append(self, symbol: str, timestamp, values: Dict[str, float]):
+        """Append one candle to a symbol's store (created on first use)."""
+        self.store(symbol, create=True).append(timestamp, values)
+
+    def copy(self) -> CandleSnapshot:
+        """Zero-copy snapshot of every symbol's current window."""
+        return CandleSnapshot({symbol: store.view() for symbol, store in self._stores.items()})
@@ -0,0 +1,191 @@
+"""
+Event Bus
+Bar-close and price-level events that drive strategy evaluation
+"""
+
+import logging
+import threading
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BAR_CLOSED = 'bar_closed'
+PRICE_CROSSED = 'price_crossed'
+
+
+class Event:
+    """One bus event. Bar events carry the bar timestamp, level events the price and level."""
+
+    __slots__ = ('kind', 'symbol', 'timeframe', 'timestamp', 'price', 'level', 'key')
+
+    def __init__(self, kind: str, symbol: str, timeframe: Optional[str] = None,
+                 timestamp: Optional[datetime] = None, price: Optional[float] = None,
+                 level: Optional[float] = None, key: Optional[str] = None):
+        self.kind = kind
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.timestamp = timestamp
+        self.price = price
+        self.level = level
+        self.key = key
+
+    def __repr__(self):
+        if self.kind == BAR_CLOSED:
+            return f"Event({self.kind} {self.symbol} {self.timeframe} {self.timestamp})"
+        return f"Event({self.kind} {self.symbol} {self.key}@{self.level} ltp={self.price})"
+
+
+class EventBus:
+    """
+    Queue of events published by the feed threads and dispatched on the
+    strategy thread.
+
+    Handlers subscribe to an event kind (bar closes optionally filtered by
+    timeframe). dispatch() blocks until events arrive, drains everything queued
+    and calls each handler once with the batch of events it matches, so a whole
+    universe closing the same minute triggers one evaluation, not one per symbol.
+
+    Price levels are watched per symbol; on_price() publishes PRICE_CROSSED when
+    a tick moves from one side of a watched level to the other.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._handlers: Dict[str, List[tuple]] = defaultdict(list)  # kind → [(timeframes or None, handler)]
+
+        self._levels_lock = threading.Lock()
+        self._levels: Dict[str, Dict[str, List[float]]] = {}  # symbol → {key: [levels]}
+        self._last_price: Dict[str, float] = {}  # Last price of watched symbols
+
+        # Counters
+        self.published = defaultdict(int)
+        self.dispatches = 0
+        self.handler_calls = 0
+
+    # ========== Subscriptions ==========
+
+    def subscribe(self, kind: str, handler: Callable[[List[Event]], None],
+                  timeframes: Optional[Iterable[str]] = None):
+        """
+        Register a handler for an event kind.
+
+        Args:
+            kind: BAR_CLOSED or PRICE_CROSSED
+            handler: Called with the list of matching events of one dispatch
+            timeframes: Bar timeframes to receive (None = all)
+        """
+        self._handlers[kind].append((set(timeframes) if timeframes is not None else None, handler))
+
+    # ========== Publishing ==========
+
+    def publish(self, events: Iterable[Event]):
+        """Queue events (any thread) and wake the dispatcher once."""
+        events = list(events)
+        if not events:
+            return
+        with self._cond:
+            self._queue.extend(events)
+            for event in events:
+                self.published[event.kind] += 1
+            self._cond.notify_all()
+
+    def watch_levels(self, symbol: str, key: str, levels: Iterable[float], price: Optional[float] = None):
+        """
+        Publish PRICE_CROSSED when `symbol` trades through any of `levels`.
+
+        Args:
+            key: Owner of the levels (replaces previous levels with the same key)
+            price: Current price as the starting side (else taken from the next tick)
+        """
+        with self._levels_lock:
+            self._levels.setdefault(symbol, {})[key] = list(levels)
+            if price:
+                self._last_price[symbol] = price
+
+    def unwatch(self, symbol: str, key: Optional[str] = None):
+        """Stop watching one key's levels of a symbol (all keys if None)."""
+        with self._levels_lock:
+            watched = self._levels.get(symbol)
+            if watched is None:
+                return
+            if key is None:
+                watched.clear()
+            else:
+                watched.pop(key, None)
+            if not watched:
+                del self._levels[symbol]
+                self._last_price.pop(symbol, None)
+
+    def on_price(self, symbol: str, price: float) -> bool:
+        """
+        Check a new price against the symbol's watched levels (tick path, O(1)
+        for unwatched symbols).
+
+        Returns:
+            True if a crossing was published
+        """
+        if symbol not in self._levels:
+            return False
+        crossings = []
+        with self._levels_lock:
+            watched = self._levels.get(symbol)
+            if not watched:
+                return False
+            previous = self._last_price.get(symbol)
+            self._last_price[symbol] = price
+            if previous is None or previous == price:
+                return False
+            for key, levels in watched.items():
+                for level in levels:
+                    if (previous < level) != (price < level):
+                        crossings.append(Event(PRICE_CROSSED, symbol, price=price, level=level, key=key))
+        self.publish(crossings)
+        return bool(crossings)
+
+    # ========== Dispatching ==========
+
+    def dispatch(self, timeout: float) -> int:
+        """
+        Wait up to `timeout` seconds for events, then deliver everything queued.
+
+        Returns:
+            Number of events dispatched (0 on timeout)
+        """
+        with self._cond:
+            if not self._queue:
+                self._cond.wait(timeout)
+            events = list(self._queue)
+            self._queue.clear()
+        if not events:
+            return 0
+
+        self.dispatches += 1
+        by_kind = defaultdict(list)
+        for event in events:
+            by_kind[event.kind].append(event)
+
+        for kind, kind_events in by_kind.items():
+            for timeframes, handler in self._handlers.get(kind, []):
+                matched = kind_events if timeframes is None else [
+                    event for event in kind_events if event.timeframe in timeframes
+                ]
+                if not matched:
+                    continue
+                self.handler_calls += 1
+                try:
+                    handler(matched)
+                except Exception as e:
+                    logger.error(f"Event handler {getattr(handler, '__name__', handler)} failed: {e}", exc_info=True)
+        return len(events)
+
+    def get_stats(self) -> Dict:
+        return {
+            'queued': len(self._queue),
+            'published': dict(self.published),
+            'dispatches': self.dispatches,
+            'handler_calls': self.handler_calls,
+            'watched_symbols': len(self._levels),
+        }
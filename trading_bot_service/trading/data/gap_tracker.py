@@ -0,0 +1,148 @@
+"""
+Feed Gap Tracker
+Detects holes in each token's tick stream and queues minute windows for backfill
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from trading.data.bar_aggregator import ONE_MINUTE_MS, ms_to_ist
+
+logger = logging.getLogger(__name__)
+
+
+class FeedGapTracker:
+    """
+    Per-token sequence / exchange-timestamp gap detection.
+
+    The previous tick of a token (timestamp + sequence, kept by its TickBuffer)
+    is compared with the new one. At least one whole bar interval with no ticks
+    counts as a gap when the stream was interrupted in between:
+    - the WebSocket disconnected at or after the previous tick, or
+    - the sequence number went backwards (stream restarted), or
+    - the whole feed (every token) was silent for longer than max_silence_ms
+      in between (missed data without a detected disconnect). A single quiet
+      token is not a gap: illiquid symbols can go minutes without a trade.
+
+    Each gap is stored as the inclusive range of bar starts to refetch (the
+    partial bar before the hole + the missing ones), merged per symbol, until a backfill worker takes it with pop_pending().
+    """
+
+    def __init__(self, interval_ms: int = ONE_MINUTE_MS, max_silence_ms: int = 3 * ONE_MINUTE_MS):
+        """
+        Args:
+            interval_ms: Bar interval the backfill is expressed in
+            max_silence_ms: Market-wide feed silence treated as a gap even without a reconnect
+        """
+        self.interval_ms = interval_ms
+        self.max_silence_ms = max_silence_ms
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Tuple[int, int]] = {}  # symbol → (first_missing_ms, last_missing_ms)
+        self._last_disconnect_ms = 0
+        self._feed_last_ms = None  # Latest tick timestamp of any token
+        self._feed_silences = deque(maxlen=64)  # (last tick before, first tick after) feed-wide silences
+
+        # Counters
+        self.gaps_detected = 0
+        self.sequence_resets = 0
+        self.disconnects = 0
+        self.reconnects = 0
+
+    def _bucket(self, ts_ms: int) -> int:
+        return ts_ms - (ts_ms % self.interval_ms)
+
+    def mark_disconnect(self, disconnected_ms: Optional[int] = None):
+        """
+        Record that the feed dropped (ticks up to this may be followed by a hole).
+        Must run before the reconnect resubscribes, or its snapshot ticks slip through.
+        """
+        self._last_disconnect_ms = disconnected_ms or int(time.time() * 1000)
+        self.disconnects += 1
+
+    def mark_reconnect(self, reconnected_ms: Optional[int] = None):
+        """Record that the feed was re-established (counted only; the outage is marked at disconnect)."""
+        self.reconnects += 1
+
+    def observe(self, symbol: str, prev_ts_ms: Optional[int], prev_sequence: int, ts_ms: int, sequence: int) -> bool:
+        """
+        Check the transition from a token's previous tick to the new one.
+
+        Call for every tick (prev_ts_ms None for a token's first tick) so the
+        feed-wide silence clock sees all of them.
+
+        Returns:
+            True if a gap was recorded
+        """
+        feed_last = self._feed_last_ms
+        if feed_last is None or ts_ms > feed_last:
+            if feed_last is not None and ts_ms - feed_last > self.max_silence_ms:
+                self._feed_silences.append((feed_last, ts_ms))
+            self._feed_last_ms = ts_ms
+        if prev_ts_ms is None:
+            return False
+
+        sequence_reset = sequence < prev_sequence
+        if sequence_reset:
+            self.sequence_resets += 1
+
+        first_missing = self._bucket(prev_ts_ms) + self.interval_ms
+        last_missing = self._bucket(ts_ms) - self.interval_ms
+        if last_missing < first_missing:
+            return False  # No whole interval missing
+
+        interrupted = (
+            sequence_reset
+            or prev_ts_ms <= self._last_disconnect_ms
+            or self._feed_silent_between(prev_ts_ms, ts_ms)
+        )
+        if not interrupted:
+            return False
+
+        # The bar holding the last tick before the gap is incomplete too - refetch it
+        first_missing = self._bucket(prev_ts_ms)
+
+        with self._lock:
+            existing = self._pending.get(symbol)
+            if existing:
+                first_missing = min(first_missing, existing[0])
+                last_missing = max(last_missing, existing[1])
+            self._pending[symbol] = (first_missing, last_missing)
+            self.gaps_detected += 1
+
+        logger.warning(
+            f"🕳️ {symbol}: feed gap {ms_to_ist(first_missing):%H:%M}-{ms_to_ist(last_missing):%H:%M} "
+            f"(seq {prev_sequence}→{sequence})"
+        )
+        return True
+
+    def _feed_silent_between(self, prev_ts_ms: int, ts_ms: int) -> bool:
+        """A feed-wide silence lies between a token's previous and new tick."""
+        return any(start >= prev_ts_ms and end <= ts_ms for start, end in reversed(self._feed_silences))
+
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def pop_pending(self) -> List[Tuple[str, datetime, datetime]]:
+        """
+        Take all queued gaps.
+
+        Returns:
+            List of (symbol, first_missing_bar, last_missing_bar) as naive IST datetimes
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return [(symbol, ms_to_ist(first), ms_to_ist(last)) for symbol, (first, last) in pending.items()]
+
+    def get_stats(self) -> Dict:
+        return {
+            'pending_gaps': len(self._pending),
+            'gaps_detected': self.gaps_detected,
+            'sequence_resets': self.sequence_resets,
+            'disconnects': self.disconnects,
+            'reconnects': self.reconnects,
+            'feed_silences': len(self._feed_silences),
+        }
@@ -0,0 +1,255 @@
+"""
+Indicator Cache
+Per-bar memoization of indicator series shared by strategies and screening levels
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from trading.data.indicator_panel import _adx, _atr, _ewm
+from trading.data.online_indicators import RollingMean
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class _Entry:
+    __slots__ = ('last_ts', 'length', 'values', 'state', 'nbytes')
+
+    def __init__(self, last_ts, length: int, values, state, nbytes: int):
+        self.last_ts = last_ts
+        self.length = length
+        self.values = values
+        self.state = state  # Recursion state for one-step extension (None = recompute on new bars)
+        self.nbytes = nbytes
+
+
+class IndicatorCache:
+    """
+    LRU memo of indicator results keyed by (symbol, timeframe, indicator, params).
+
+    A lookup with the same bar set (same last bar timestamp and length) returns
+    the stored result. When the frame has gained bars after the cached last bar,
+    recursive indicators (EMA, SMA, RSI, ATR) are extended by the new steps only;
+    everything else is recomputed once for the new bar. Each result therefore
+    costs at most one computation per bar close, however often scans run.
+
+    Extended series continue from the bars they were first computed on (the
+    same convention as OnlineIndicators). Once the candle window slides, a
+    fresh computation on the window starts its recursion later, so EMA values
+    at the early window bars can differ from it by whole points; the gap decays
+    with the EMA's span towards the latest bar.
+
+    Returned arrays / frames are shared: treat them as read-only.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Tuple, _Entry]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        # Counters
+        self.hits = 0
+        self.extensions = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ========== Public indicators ==========
+
+    def ema(self, symbol: str, df: pd.DataFrame, span: int, column: str = 'Close',
+            timeframe: str = '1m') -> np.ndarray:
+        """Series.ewm(span=span, adjust=False).mean() of df[column]."""
+        alpha = 2.0 / (span + 1.0)
+        return self._series(('ema', column, span), symbol, timeframe, df,
+                            lambda frame: self._ewm_full(frame[column], alpha),
+                            lambda state, frame: self._ewm_extend(state, frame[column], alpha))
+
+    def sma(self, symbol: str, df: pd.DataFrame, window: int, column: str = 'Close',
+            timeframe: str = '1m') -> np.ndarray:
+        """Series.rolling(window).mean() of df[column]."""
+        return self._series(('sma', column, window), symbol, timeframe, df,
+                            lambda frame: self._sma_extend(RollingMean(window), frame[column]),
+                            lambda state, frame: self._sma_extend(state, frame[column]))
+
+    def rsi(self, symbol: str, df: pd.DataFrame, window: int = 14, timeframe: str = '1m') -> np.ndarray:
+        """ta RSIIndicator(window).rsi() of df['Close']."""
+        return self._series(('rsi', window), symbol, timeframe, df,
+                            lambda frame: self._rsi_full(frame['Close'], window),
+                            lambda state, frame: self._rsi_extend(state, frame['Close'], window))
+
+    def atr(self, symbol: str, df: pd.DataFrame, window: int = 14, timeframe: str = '1m') -> np.ndarray:
+        """ta AverageTrueRange(window).average_true_range()."""
+        return self._series(('atr', window), symbol, timeframe, df,
+                            lambda frame: self._atr_full(frame, window),
+                            lambda state, frame: self._atr_extend(state, frame, window))
+
+    def adx(self, symbol: str, df: pd.DataFrame, window: int = 14, timeframe: str = '1m') -> np.ndarray:
+        """ta ADXIndicator(window).adx() (recomputed once per new bar)."""
+        def compute(frame):
+            high, low, close = (frame[c].to_numpy(dtype=np.float64)[np.newaxis] for c in ('High', 'Low', 'Close'))
+            return _adx(high, low, close, window)[0], None
+        return self._series(('adx', window), symbol, timeframe, df, compute, None)
+
+    def frame(self, symbol: str, df: pd.DataFrame, name: str,
+              compute: Callable[[pd.DataFrame], pd.DataFrame], timeframe: str = '1m') -> pd.DataFrame:
+        """
+        Memoize a whole-frame indicator function (e.g. a strategy's
+        calculate_indicators) for the current bar set. `compute` may modify and
+        return its argument; it receives `df` itself.
+        """
+        key = (symbol, timeframe, 'frame', name)
+        last_ts = df.index[-1] if len(df) else None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.last_ts == last_ts and entry.length == len(df):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.values
+
+        result = compute(df)
+        nbytes = int(result.memory_usage(index=True, deep=False).sum()) if isinstance(result, pd.DataFrame) else 0
+        self._store(key, _Entry(last_ts, len(df), result, None, nbytes), miss=True)
+        return result
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """Drop cached results for one symbol (e.g. after history was rewritten) or all."""
+        with self._lock:
+            for key in [k for k in self._entries if symbol is None or k[0] == symbol]:
+                self._bytes -= self._entries.pop(key).nbytes
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.extensions + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'extensions': self.extensions,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits + self.extensions) / lookups if lookups else 0.0,
+        }
+
+    # ========== Lookup / storage ==========
+
+    def _series(self, indicator: Tuple, symbol: str, timeframe: str, df: pd.DataFrame,
+                compute: Callable, extend: Optional[Callable]) -> np.ndarray:
+        key = (symbol, timeframe) + indicator
+        n = len(df)
+        if n == 0:
+            return np.empty(0)
+        index = df.index
+        last_ts = index[-1]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if entry.last_ts == last_ts and entry.length == n:
+                    self.hits += 1
+                    return entry.values
+
+                # Extend from the position of the cached last bar in the new frame.
+                # Done under the lock: extension mutates the entry's state.
+                if extend is not None and entry.state is not None:
+                    pos = index.searchsorted(entry.last_ts)
+                    if pos < n - 1 and index[pos] == entry.last_ts and pos < entry.length:
+                        new_values, state = extend(entry.state, df.iloc[pos + 1:])
+                        values = np.concatenate((entry.values[entry.length - pos - 1:], new_values))
+                        self._store(key, _Entry(last_ts, n, values, state, values.nbytes), miss=False)
+                        return values
+
+        values, state = compute(df)
+        self._store(key, _Entry(last_ts, n, values, state, values.nbytes), miss=True)
+        return values
+
+    def _store(self, key: Tuple, entry: _Entry, miss: bool):
+        with self._lock:
+            if miss:
+                self.misses += 1
+            else:
+                self.extensions += 1
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._entries[key] = entry
+            self._bytes += entry.nbytes
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+
+    # ========== Indicator kernels (full + one-step extension) ==========
+
+    @staticmethod
+    def _ew_step(value: float, cur: float, alpha: float) -> float:
+        old_wt = 1.0 - alpha
+        return (old_wt * value + alpha * cur) / (old_wt + alpha) if value != cur else value
+
+    def _ewm_full(self, series: pd.Series, alpha: float):
+        values = _ewm(series.to_numpy(dtype=np.float64)[np.newaxis], alpha, 1)[0]
+        return values, values[-1]
+
+    def _ewm_extend(self, state: float, series: pd.Series, alpha: float):
+        out = np.empty(len(series))
+        for i, cur in enumerate(series.to_numpy(dtype=np.float64)):
+            state = self._ew_step(state, cur, alpha)
+            out[i] = state
+        return out, state
+
+    @staticmethod
+    def _sma_extend(state: RollingMean, series: pd.Series):
+        values = np.array([state.update(x) for x in series.to_numpy(dtype=np.float64)])
+        return values, state
+
+    def _rsi_full(self, close: pd.Series, window: int):
+        state = (None, None, None, 0)  # (emaup, emadn, last close, bars seen)
+        return self._rsi_extend(state, close, window)
+
+    def _rsi_extend(self, state: Tuple, close: pd.Series, window: int):
+        emaup, emadn, prev, count = state
+        alpha = 1.0 / window
+        out = np.empty(len(close))
+        for i, cur in enumerate(close.to_numpy(dtype=np.float64)):
+            diff = cur - prev if prev is not None else 0.0
+            up = diff if diff > 0 else 0.0
+            down = -diff if diff < 0 else 0.0
+            if count == 0:
+                emaup, emadn = up, down
+            else:
+                emaup = self._ew_step(emaup, up, alpha)
+                emadn = self._ew_step(emadn, down, alpha)
+            count += 1
+            prev = cur
+            if count < window:
+                out[i] = np.nan
+            elif emadn == 0:
+                out[i] = 100.0
+            else:
+                out[i] = 100 - (100 / (1 + emaup / emadn))
+        return out, (emaup, emadn, prev, count)
+
+    def _atr_full(self, frame: pd.DataFrame, window: int):
+        high, low, close = (frame[c].to_numpy(dtype=np.float64)[np.newaxis] for c in ('High', 'Low', 'Close'))
+        values = _atr(high, low, close, window)[0]
+        state = (values[-1], close[0, -1]) if len(values) >= window else None
+        return values, state
+
+    def _atr_extend(self, state: Tuple, frame: pd.DataFrame, window: int):
+        atr, prev_close = state
+        out = np.empty(len(frame))
+        highs = frame['High'].to_numpy(dtype=np.float64)
+        lows = frame['Low'].to_numpy(dtype=np.float64)
+        closes = frame['Close'].to_numpy(dtype=np.float64)
+        for i in range(len(frame)):
+            tr = max(highs[i] - lows[i], abs(highs[i] - prev_close), abs(lows[i] - prev_close))
+            atr = (atr * (window - 1) + tr) / float(window)
+            prev_close = closes[i]
+            out[i] = atr
+        return out, (atr, prev_close)
@@ -0,0 +1,298 @@
+"""
+Indicator Panel
+Cross-sectional (symbols × time) indicator computation for the whole universe
+"""
+
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+OHLCV = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+# ---------------------------------------------------------------------------
+# Kernels: x is (symbols, time), every row fully populated. Recursions run over
+# time with one NumPy operation across all symbols per step, using the same
+# arithmetic as the per-series pandas / `ta` implementations they replace.
+# All kernels are causal (column t depends on columns <= t only), so rows of
+# different lengths can share a matrix left-aligned, padded at the end.
+# ---------------------------------------------------------------------------
+
+def _ewm(x: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """Series.ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean() per row."""
+    out = np.empty_like(x)
+    old_wt = 1.0 - alpha
+    value = x[:, 0].copy()
+    out[:, 0] = value
+    for t in range(1, x.shape[1]):
+        cur = x[:, t]
+        value = np.where(value != cur, (old_wt * value + alpha * cur) / (old_wt + alpha), value)
+        out[:, t] = value
+    out[:, :min_periods - 1] = np.nan
+    return out
+
+
+def _ema(x: np.ndarray, span: int) -> np.ndarray:
+    """ta EMAIndicator(window=span).ema_indicator() per row."""
+    return _ewm(x, 2.0 / (span + 1.0), span)
+
+
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """Series.rolling(window).mean() per row (pandas roll_mean kernel, see RollingMean)."""
+    n, length = x.shape
+    out = np.full_like(x, np.nan)
+    total = np.zeros(n)
+    comp_add = np.zeros(n)
+    comp_remove = np.zeros(n)
+    neg_ct = np.zeros(n, dtype=np.int64)
+    same_count = np.zeros(n, dtype=np.int64)
+    prev_value = x[:, 0].copy()
+    for t in range(length):
+        if t >= window:
+            val = x[:, t - window]
+            y = -val - comp_remove
+            s = total + y
+            comp_remove = s - total - y
+            total = s
+            neg_ct -= np.signbit(val)
+        val = x[:, t]
+        y = val - comp_add
+        s = total + y
+        comp_add = s - total - y
+        total = s
+        neg_ct += np.signbit(val)
+        same_count = np.where(val == prev_value, same_count + 1, 1)
+        prev_value = val
+        if t < window - 1:
+            continue
+        result = total / window
+        result = np.where(same_count >= window, prev_value, result)
+        result = np.where((neg_ct == 0) & (result < 0), 0.0, result)
+        result = np.where((neg_ct == window) & (result > 0), 0.0, result)
+        out[:, t] = result
+    return out
+
+
+def _rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """Population (ddof=0) rolling standard deviation per row."""
+    out = np.full_like(x, np.nan)
+    if x.shape[1] >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=1)
+        out[:, window - 1:] = windows.std(axis=2)
+    return out
+
+
+def _rsi(close: np.ndarray, window: int) -> np.ndarray:
+    """ta RSIIndicator(window).rsi() per row."""
+    diff = np.zeros_like(close)
+    diff[:, 1:] = close[:, 1:] - close[:, :-1]
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    emaup = _ewm(up, 1.0 / window, window)
+    emadn = _ewm(down, 1.0 / window, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(emadn == 0, 100.0, 100 - (100 / (1 + emaup / emadn)))
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    tr = high - low
+    prev_close = close[:, :-1]
+    tr[:, 1:] = np.maximum(tr[:, 1:], np.maximum(np.abs(high[:, 1:] - prev_close),
+                                                  np.abs(low[:, 1:] - prev_close)))
+    return tr
+
+
+def _atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
+    """ta AverageTrueRange(window).average_true_range() per row (0 before the window fills)."""
+    tr = _true_range(high, low, close)
+    atr = np.zeros_like(tr)
+    if tr.shape[1] < window:
+        return atr
+    atr[:, window - 1] = tr[:, 0:window].mean(axis=1)
+    for t in range(window, tr.shape[1]):
+        atr[:, t] = (atr[:, t - 1] * (window - 1) + tr[:, t]) / float(window)
+    return atr
+
+
+def _wilder_sum(x: np.ndarray, window: int) -> np.ndarray:
+    """ta ADXIndicator running sums (x[:, 0] is the undefined first difference)."""
+    length = x.shape[1] - (window - 1)
+    out = np.zeros((x.shape[0], length))
+    out[:, 0] = x[:, 1:window + 1].sum(axis=1)
+    for i in range(1, length - 1):
+        out[:, i] = out[:, i - 1] - (out[:, i - 1] / float(window)) + x[:, window + i]
+    return out
+
+
+def _adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
+    """ta ADXIndicator(window).adx() per row (NaN when the series is too short for ta)."""
+    n, length = close.shape
+    if length < 2 * window:
+        return np.full_like(close, np.nan)
+
+    dm = np.zeros_like(close)
+    prev_close = close[:, :-1]
+    dm[:, 1:] = np.maximum(high[:, 1:], prev_close) - np.minimum(low[:, 1:], prev_close)
+
+    diff_up = np.zeros_like(high)
+    diff_down = np.zeros_like(low)
+    diff_up[:, 1:] = high[:, 1:] - high[:, :-1]
+    diff_down[:, 1:] = low[:, :-1] - low[:, 1:]
+    pos = np.where((diff_up > diff_down) & (diff_up > 0), diff_up, 0.0)
+    neg = np.where((diff_down > diff_up) & (diff_down > 0), diff_down, 0.0)
+
+    trs = _wilder_sum(dm, window)
+    dip_sum = _wilder_sum(pos, window)
+    din_sum = _wilder_sum(neg, window)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dip = np.where(trs != 0, 100 * (dip_sum / trs), 0.0)
+        din = np.where(trs != 0, 100 * (din_sum / trs), 0.0)
+        di_sum = dip + din
+        dx = np.where(di_sum != 0, 100 * np.abs((dip - din) / di_sum), 0.0)
+
+    adx = np.zeros_like(trs)
+    adx[:, window] = dx[:, 0:window].mean(axis=1)
+    for i in range(window + 1, trs.shape[1]):
+        adx[:, i] = ((adx[:, i - 1] * (window - 1)) + dx[:, i - 1]) / float(window)
+    return np.concatenate((np.zeros((n, window - 1)), adx), axis=1)
+
+
+def _session_vwap(index: pd.DatetimeIndex, high: np.ndarray, low: np.ndarray,
+                  close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """VWAP reset at each calendar day (same as AlphaEnsembleStrategy.calculate_vwap), one series."""
+    typical_pv = (high + low + close) / 3 * volume
+    vwap = np.empty_like(close)
+    days = index.normalize().asi8
+    bounds = np.flatnonzero(np.diff(days)) + 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for segment in np.split(np.arange(len(index)), bounds):
+            start, stop = segment[0], segment[-1] + 1
+            vwap[start:stop] = np.cumsum(typical_pv[start:stop]) / np.cumsum(volume[start:stop])
+    return vwap
+
+
+class IndicatorPanel:
+    """
+    Indicators for many symbols computed together.
+
+    Each symbol's bars are stacked left-aligned into (symbols, time) matrices
+    (position t = the symbol's own t-th bar, rows shorter than the longest
+    padded at the end with their last bar), so symbols whose timestamps differ
+    (skipped minutes, backfills, shorter history) still share one vectorised
+    pass. Every indicator is causal, so a row's values up to its own length
+    equal the per-symbol computation; only the session VWAP, which needs the
+    row's timestamps, is computed per row. Per-symbol results are read back
+    as DataFrame views or latest-value dicts.
+
+    Columns (names as used by AlphaEnsembleStrategy):
+    EMA_<n> for each span, RSI, ATR, ADX, Volume_SMA,
+    BB_Upper / BB_Middle / BB_Lower, VWAP.
+    """
+
+    def __init__(self, ema_spans: Iterable[int] = (20, 50, 200), rsi_period: int = 14,
+                 atr_period: int = 14, adx_period: int = 14, volume_sma_period: int = 20,
+                 bb_period: int = 20, bb_std: float = 2.0):
+        self.ema_spans = tuple(ema_spans)
+        self.rsi_period = rsi_period
+        self.atr_period = atr_period
+        self.adx_period = adx_period
+        self.volume_sma_period = volume_sma_period
+        self.bb_period = bb_period
+        self.bb_std = bb_std
+        self.columns = tuple(f'EMA_{span}' for span in self.ema_spans) + (
+            'RSI', 'ATR', 'ADX', 'Volume_SMA', 'BB_Upper', 'BB_Middle', 'BB_Lower', 'VWAP')
+
+        self._matrices: Dict[str, np.ndarray] = {}  # column → (symbols, time) matrix
+        self._rows: Dict[str, Tuple[int, pd.DatetimeIndex]] = {}  # symbol → (row, its own index)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def symbols(self):
+        return self._rows.keys()
+
+    def compute(self, frames: Dict[str, pd.DataFrame]) -> 'IndicatorPanel':
+        """
+        (Re)compute the panel from per-symbol OHLCV frames (capitalized columns,
+        DatetimeIndex). Empty frames and frames with missing prices are skipped.
+
+        Returns:
+            self
+        """
+        members = []
+        for symbol, df in frames.items():
+            if df is None or len(df) == 0:
+                continue
+            values = df[list(OHLCV)].to_numpy(dtype=np.float64)
+            if np.isnan(values[:, :4]).any():
+                logger.debug(f"{symbol}: NaN prices, excluded from indicator panel")
+                continue
+            members.append((symbol, df.index, values))
+
+        self._matrices = {}
+        self._rows = {}
+        if not members:
+            return self
+        width = max(len(index) for _, index, _ in members)
+        stacked = np.empty((len(members), width, len(OHLCV)))  # (symbols, time, 5)
+        for row, (symbol, index, values) in enumerate(members):
+            stacked[row, :len(index)] = values
+            stacked[row, len(index):] = values[-1]  # Padding: never read back
+            self._rows[symbol] = (row, index)
+        self._matrices = self._compute_matrices(stacked)
+
+        # Per-row pieces: VWAP needs the row's own days, and ta returns NaN / 0
+        # for series too short for ADX / ATR (decided by the row's length)
+        vwap = np.full((len(members), width), np.nan)
+        for symbol, (row, index) in self._rows.items():
+            n = len(index)
+            vwap[row, :n] = _session_vwap(index, self._matrices['High'][row, :n], self._matrices['Low'][row, :n],
+                                          self._matrices['Close'][row, :n], self._matrices['Volume'][row, :n])
+            if n < 2 * self.adx_period:
+                self._matrices['ADX'][row] = np.nan
+            if n < self.atr_period:
+                self._matrices['ATR'][row] = 0.0
+        self._matrices['VWAP'] = vwap
+        return self
+
+    def _compute_matrices(self, ohlcv: np.ndarray) -> Dict[str, np.ndarray]:
+        open_, high, low, close, volume = (np.ascontiguousarray(ohlcv[:, :, i]) for i in range(5))
+        out = {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}
+        for span in self.ema_spans:
+            out[f'EMA_{span}'] = _ema(close, span)
+        out['RSI'] = _rsi(close, self.rsi_period)
+        out['ATR'] = _atr(high, low, close, self.atr_period)
+        out['ADX'] = _adx(high, low, close, self.adx_period)
+        out['Volume_SMA'] = _rolling_mean(volume, self.volume_sma_period)
+        middle = _rolling_mean(close, self.bb_period)
+        band = self.bb_std * _rolling_std(close, self.bb_period)
+        out['BB_Middle'] = middle
+        out['BB_Upper'] = middle + band
+        out['BB_Lower'] = middle - band
+        return out
+
+    def view(self, symbol: str) -> Optional[pd.DataFrame]:
+        """OHLCV + indicator DataFrame for one symbol (None if not in the panel)."""
+        location = self._rows.get(symbol)
+        if location is None:
+            return None
+        row, index = location
+        n = len(index)
+        return pd.DataFrame({name: matrix[row, :n] for name, matrix in self._matrices.items()}, index=index, copy=False)
+
+    def latest(self, symbol: str) -> Optional[Dict[str, float]]:
+        """Last-bar values {column: float} for one symbol (None if not in the panel)."""
+        location = self._rows.get(symbol)
+        if location is None:
+            return None
+        row, index = location
+        return {name: float(matrix[row, len(index) - 1]) for name, matrix in self._matrices.items()}
@@ -0,0 +1,94 @@
+"""
+Market Snapshot
+Versioned, immutable candle + price snapshots published for strategy threads
+"""
+
+import logging
+import sys
+import time
+from types import MappingProxyType
+from typing import Dict, Mapping
+
+from trading.data.candle_store import CandleSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class MarketSnapshot:
+    """
+    Candles and last traded prices at one point in time.
+
+    `candles` is a CandleSnapshot of read-only views (no bar data copied) and
+    `prices` a read-only mapping over a private copy of the LTPs. Nothing in a
+    snapshot changes after it is published, so any number of threads can
+    read it without the engine lock.
+    """
+
+    __slots__ = ('version', 'candles', 'prices', 'price_version', 'published_at', 'copied_bytes')
+
+    def __init__(self, version: int, candles: CandleSnapshot, prices: Mapping[str, float], price_version: int):
+        frozen = dict(prices)
+        self.version = version
+        self.candles = candles
+        self.prices: Mapping[str, float] = MappingProxyType(frozen)
+        self.price_version = price_version  # Tick counter the prices were taken at
+        self.published_at = time.time()
+        self.copied_bytes = sys.getsizeof(frozen)  # Price table only: candle views share the stores' arrays
+
+
+class SnapshotPublisher:
+    """
+    Holder of the current MarketSnapshot.
+
+    Writers build a new snapshot while holding their own lock and publish it
+    by replacing one reference (atomic in CPython); readers just read
+    `current`. Copied bytes are accumulated so each strategy cycle can report
+    how much data it caused to be copied.
+    """
+
+    def __init__(self):
+        self.current = MarketSnapshot(0, CandleSnapshot({}), {}, 0)
+        self.publishes = 0
+        self.price_refreshes = 0
+        self.bytes_copied = 0
+        self.last_cycle_bytes = 0
+        self._cycle_start_bytes = 0
+
+    def publish(self, candles: CandleSnapshot, prices: Mapping[str, float], price_version: int) -> MarketSnapshot:
+        """
+        Publish new candles (and the current prices). Call with the writers' lock held.
+        """
+        self.publishes += 1
+        return self._swap(candles, prices, price_version)
+
+    def refresh_prices(self, prices: Mapping[str, float], price_version: int) -> MarketSnapshot:
+        """
+        Publish newer prices with the current candles. Call with the writers' lock held.
+        """
+        self.price_refreshes += 1
+        return self._swap(self.current.candles, prices, price_version)
+
+    def _swap(self, candles: CandleSnapshot, prices: Mapping[str, float], price_version: int) -> MarketSnapshot:
+        snapshot = MarketSnapshot(self.current.version + 1, candles, prices, price_version)
+        self.bytes_copied += snapshot.copied_bytes
+        self.current = snapshot
+        return snapshot
+
+    def begin_cycle(self):
+        self._cycle_start_bytes = self.bytes_copied
+
+    def end_cycle(self) -> int:
+        """Bytes copied since begin_cycle()."""
+        self.last_cycle_bytes = self.bytes_copied - self._cycle_start_bytes
+        return self.last_cycle_bytes
+
+    def get_stats(self) -> Dict:
+        return {
+            'version': self.current.version,
+            'symbols': len(self.current.candles),
+            'age_seconds': round(time.time() - self.current.published_at, 3),
+            'publishes': self.publishes,
+            'price_refreshes': self.price_refreshes,
+            'bytes_copied': self.bytes_copied,
+            'last_cycle_bytes_copied': self.last_cycle_bytes,
+        }
@@ -0,0 +1,235 @@
+"""
+Online Indicator Engine
+Incrementally updates the realtime engine's indicator set one closed bar at a time
+"""
+
+import logging
+import math
+from collections import deque
+from typing import Dict, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+
+
+class RollingMean:
+    """
+    O(1) rolling mean that reproduces pandas' Series.rolling(window).mean().
+
+    Mirrors the pandas roll_mean kernel: separately compensated (Kahan) add and
+    remove sums, NaN values skipped, and the constant-window shortcut, so the
+    results are bit-identical to the vectorised formula, not just close.
+    """
+
+    __slots__ = ('window', '_values', '_nobs', '_sum', '_comp_add', '_comp_remove',
+                 '_neg_ct', '_same_count', '_prev_value', '_started')
+
+    def __init__(self, window: int):
+        self.window = window
+        self._values = deque()
+        self._nobs = 0
+        self._sum = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._neg_ct = 0
+        self._same_count = 0
+        self._prev_value = NAN
+        self._started = False
+
+    def _add(self, val: float):
+        if val == val:
+            self._nobs += 1
+            y = val - self._comp_add
+            t = self._sum + y
+            self._comp_add = t - self._sum - y
+            self._sum = t
+            if math.copysign(1.0, val) < 0:
+                self._neg_ct += 1
+            if val == self._prev_value:
+                self._same_count += 1
+            else:
+                self._same_count = 1
+            self._prev_value = val
+
+    def _remove(self, val: float):
+        if val == val:
+            self._nobs -= 1
+            y = -val - self._comp_remove
+            t = self._sum + y
+            self._comp_remove = t - self._sum - y
+            self._sum = t
+            if math.copysign(1.0, val) < 0:
+                self._neg_ct -= 1
+
+    def update(self, val: float) -> float:
+        if not self._started:
+            self._started = True
+            self._prev_value = val
+        self._values.append(val)
+        if len(self._values) > self.window:
+            self._remove(self._values.popleft())
+        self._add(val)
+
+        nobs = self._nobs
+        if nobs < self.window or nobs <= 0:
+            return NAN
+        result = self._sum / nobs
+        if self._same_count >= nobs:
+            result = self._prev_value
+        elif self._neg_ct == 0 and result < 0:
+            result = 0.0
+        elif self._neg_ct == nobs and result > 0:
+            result = 0.0
+        return result
+
+
+class EWMean:
+    """O(1) equivalent of Series.ewm(span=span, adjust=False).mean()."""
+
+    __slots__ = ('_alpha', '_old_wt', '_value')
+
+    def __init__(self, span: int):
+        self._alpha = 2.0 / (span + 1.0)
+        self._old_wt = 1.0 - self._alpha
+        self._value = None
+
+    def update(self, val: float) -> float:
+        if self._value is None:
+            self._value = val
+        elif self._value != val:
+            # Same arithmetic as the pandas ewm kernel (including the normalisation)
+            self._value = (self._old_wt * self._value + self._alpha * val) / (self._old_wt + self._alpha)
+        return self._value
+
+
+def _safe_div(num: float, den: float) -> float:
+    """Float division with pandas semantics for zero denominators."""
+    if den == 0:
+        if num == 0 or num != num:
+            return NAN
+        return math.copysign(math.inf, num)
+    return num / den
+
+
+class OnlineIndicators:
+    """
+    Per-symbol stateful indicator set for RealtimeBotEngine.
+
+    Consumes one closed bar at a time and returns the same columns, with the
+    same values, as RealtimeBotEngine._calculate_indicators would produce for
+    that row on the full history:
+    sma_10/20/50/100/200, rsi, macd, macd_signal, macd_hist, atr, adx,
+    dmi_plus, dmi_minus, vwap, volume_sma.
+    """
+
+    COLUMNS = (
+        'sma_10', 'sma_20', 'sma_50', 'sma_100', 'sma_200',
+        'rsi', 'macd', 'macd_signal', 'macd_hist',
+        'atr', 'adx', 'dmi_plus', 'dmi_minus',
+        'vwap', 'volume_sma',
+    )
+
+    def __init__(self):
+        self._sma = {period: RollingMean(period) for period in (10, 20, 50, 100, 200)}
+        self._gain = RollingMean(14)
+        self._loss = RollingMean(14)
+        self._ema_12 = EWMean(12)
+        self._ema_26 = EWMean(26)
+        self._macd_signal = EWMean(9)
+        self._tr = RollingMean(14)
+        self._plus_dm = RollingMean(14)
+        self._minus_dm = RollingMean(14)
+        self._dx = RollingMean(14)
+        self._volume_sma = RollingMean(10)
+        self._cum_pv = 0.0
+        self._cum_volume = 0
+        self._prev_high: Optional[float] = None
+        self._prev_low: Optional[float] = None
+        self._prev_close: Optional[float] = None
+        self.bar_count = 0
+        self.last: Dict[str, float] = {}
+
+    def update(self, open_: float, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        """
+        Apply one closed bar.
+
+        Returns:
+            Dict of indicator values for this bar (NaN during warm-up)
+        """
+        prev_high, prev_low, prev_close = self._prev_high, self._prev_low, self._prev_close
+        first = prev_close is None
+
+        values = {
+            'sma_10': self._sma[10].update(close),
+            'sma_20': self._sma[20].update(close),
+            'sma_50': self._sma[50].update(close),
+            'sma_100': self._sma[100].update(close),
+            'sma_200': self._sma[200].update(close),
+        }
+
+        # RSI (14) - simple rolling means of gains/losses
+        delta = NAN if first else close - prev_close
+        gain = self._gain.update(delta if delta > 0 else 0.0)
+        loss = self._loss.update(-delta if delta < 0 else 0.0)
+        rs = gain / (1e-10 if loss == 0 else loss)
+        values['rsi'] = 100 - (100 / (1 + rs))
+
+        # MACD (12, 26, 9)
+        macd = self._ema_12.update(close) - self._ema_26.update(close)
+        macd_signal = self._macd_signal.update(macd)
+        values['macd'] = macd
+        values['macd_signal'] = macd_signal
+        values['macd_hist'] = macd - macd_signal
+
+        # ATR (14)
+        if first:
+            tr = NAN
+        else:
+            tr = max(high - low, max(abs(high - prev_close), abs(low - prev_close)))
+        atr = self._tr.update(tr)
+        values['atr'] = atr
+
+        # ADX (14) with DMI
+        if first:
+            plus_dm = minus_dm = 0.0
+        else:
+            high_diff = high - prev_high
+            low_diff = prev_low - low
+            plus_dm = high_diff if (high_diff > low_diff and high_diff > 0) else 0.0
+            minus_dm = low_diff if (low_diff > high_diff and low_diff > 0) else 0.0
+        atr_den = 1e-10 if atr == 0 else atr
+        plus_di = 100 * (self._plus_dm.update(plus_dm) / atr_den)
+        minus_di = 100 * (self._minus_dm.update(minus_dm) / atr_den)
+        di_sum = plus_di + minus_di
+        dx = 100 * abs(plus_di - minus_di) / (1e-10 if di_sum == 0 else di_sum)
+        values['adx'] = self._dx.update(dx)
+        values['dmi_plus'] = plus_di
+        values['dmi_minus'] = minus_di
+
+        # VWAP (cumulative over the whole series, like the batch formula)
+        self._cum_pv += volume * (high + low + close) / 3
+        self._cum_volume += volume
+        values['vwap'] = _safe_div(self._cum_pv, self._cum_volume)
+
+        values['volume_sma'] = self._volume_sma.update(volume)
+
+        self._prev_high, self._prev_low, self._prev_close = high, low, close
+        self.bar_count += 1
+        self.last = values
+        return values
+
+    def warm_start(self, df: pd.DataFrame) -> 'OnlineIndicators':
+        """
+        Replay bootstrapped history so the next update() continues the series.
+
+        Args:
+            df: OHLCV DataFrame with capitalized columns (Open, High, Low, Close, Volume)
+        """
+        columns = [df[col].tolist() for col in ('Open', 'High', 'Low', 'Close', 'Volume')]
+        for open_, high, low, close, volume in zip(*columns):
+            self.update(open_, high, low, close, volume)
+        logger.debug(f"Online indicators warm-started from {len(df)} bars")
+        return self
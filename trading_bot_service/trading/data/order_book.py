@@ -0,0 +1,132 @@
+"""
+Order Book
+Compact best-5 market depth per symbol from SnapQuote ticks
+"""
+
+import logging
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BID = 0
+ASK = 1
+LEVELS = 5
+
+# Column layout of OrderBook.levels[side, level]
+PRICE = 0
+QUANTITY = 1
+ORDERS = 2
+
+
+class OrderBook:
+    """
+    Best-5 bid/ask depth for one symbol in a fixed (2, 5, 3) float64 array:
+    levels[side, level] = (price, quantity, orders), side 0 = bid, 1 = ask,
+    level 0 = best. Updated in place from decoded SnapQuote depth, so there is
+    no allocation per tick.
+    """
+
+    __slots__ = ('levels', 'exchange_ts_ms', 'updated_at', 'update_count')
+
+    def __init__(self):
+        self.levels = np.zeros((2, LEVELS, 3), dtype=np.float64)
+        self.exchange_ts_ms = 0
+        self.updated_at = 0.0  # Local time.time() of the last update
+        self.update_count = 0
+
+    def update(self, depth: np.ndarray, exchange_ts_ms: int = 0):
+        """
+        Replace the book with a decoded depth block.
+
+        Args:
+            depth: ws_manager.tick_decoder.DEPTH_DTYPE records (flag 0 = buy,
+                otherwise sell; price in paise), best level first per side
+            exchange_ts_ms: Exchange timestamp of the packet
+        """
+        levels = self.levels
+        levels.fill(0.0)
+        is_buy = depth['flag'] == 0
+        for side, mask in ((BID, is_buy), (ASK, ~is_buy)):
+            side_depth = depth[mask][:LEVELS]
+            n = len(side_depth)
+            levels[side, :n, PRICE] = side_depth['price'] / 100.0
+            levels[side, :n, QUANTITY] = side_depth['quantity']
+            levels[side, :n, ORDERS] = side_depth['orders']
+        self.exchange_ts_ms = exchange_ts_ms
+        self.updated_at = time.time()
+        self.update_count += 1
+
+    # ========== Accessors ==========
+
+    @property
+    def best_bid(self) -> float:
+        return float(self.levels[BID, 0, PRICE])
+
+    @property
+    def best_ask(self) -> float:
+        return float(self.levels[ASK, 0, PRICE])
+
+    @property
+    def is_valid(self) -> bool:
+        """Both sides quoted and not crossed."""
+        bid, ask = self.best_bid, self.best_ask
+        return bid > 0 and ask > 0 and ask >= bid
+
+    def age(self, now: Optional[float] = None) -> float:
+        """Seconds since the last update (inf if never updated)."""
+        if not self.update_count:
+            return float('inf')
+        return (now if now is not None else time.time()) - self.updated_at
+
+    def spread(self) -> Optional[float]:
+        """Best ask - best bid in rupees."""
+        return self.best_ask - self.best_bid if self.is_valid else None
+
+    def mid(self) -> Optional[float]:
+        return (self.best_ask + self.best_bid) / 2 if self.is_valid else None
+
+    def spread_pct(self) -> Optional[float]:
+        """Spread as a percentage of mid."""
+        if not self.is_valid:
+            return None
+        bid, ask = self.best_bid, self.best_ask
+        return (ask - bid) / ((ask + bid) / 2) * 100
+
+    def microprice(self) -> Optional[float]:
+        """Top-of-book size-weighted price (leans towards the thinner side)."""
+        if not self.is_valid:
+            return None
+        bid, ask = self.best_bid, self.best_ask
+        bid_qty, ask_qty = float(self.levels[BID, 0, QUANTITY]), float(self.levels[ASK, 0, QUANTITY])
+        total = bid_qty + ask_qty
+        if total <= 0:
+            return (ask + bid) / 2
+        return (bid * ask_qty + ask * bid_qty) / total
+
+    def imbalance(self, depth: int = 1) -> Optional[float]:
+        """
+        (bid qty - ask qty) / (bid qty + ask qty) over the top `depth` levels.
+        +1 = all bids, -1 = all asks.
+        """
+        if not self.is_valid:
+            return None
+        bid_qty = self.levels[BID, :depth, QUANTITY].sum()
+        ask_qty = self.levels[ASK, :depth, QUANTITY].sum()
+        total = bid_qty + ask_qty
+        return float((bid_qty - ask_qty) / total) if total > 0 else 0.0
+
+    def snapshot(self) -> Dict:
+        """Summary for logging / health output."""
+        return {
+            'best_bid': self.best_bid,
+            'best_ask': self.best_ask,
+            'spread': self.spread(),
+            'spread_pct': self.spread_pct(),
+            'mid': self.mid(),
+            'microprice': self.microprice(),
+            'imbalance': self.imbalance(),
+            'age_seconds': self.age(),
+        }
@@ -0,0 +1,71 @@
+"""
+Scan Tracker
+Remembers the candle generation each symbol was last evaluated at by a strategy
+"""
+
+import logging
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class ScanTracker:
+    """
+    Per-strategy dirty-symbol filter.
+
+    Every change to a symbol's candles gives its CandleStore a new generation.
+    A strategy evaluates a symbol only if the generation differs from the one it
+    last evaluated, so symbols without new bars since the previous scan are
+    skipped with one dict lookup.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._seen: Dict[str, int] = {}  # symbol → generation last evaluated
+
+        # Current cycle
+        self.evaluated = 0
+        self.skipped = 0
+        self.skipped_symbols = set()
+
+        # Totals
+        self.cycles = 0
+        self.total_evaluated = 0
+        self.total_skipped = 0
+        self.last_report: Dict = {}
+
+    def begin(self):
+        """Start a scan cycle."""
+        self.evaluated = 0
+        self.skipped = 0
+        self.skipped_symbols = set()
+
+    def should_evaluate(self, symbol: str, generation: int) -> bool:
+        """True (and marked as evaluated) if the symbol has new data since its last evaluation."""
+        if self._seen.get(symbol) == generation:
+            self.skipped += 1
+            self.skipped_symbols.add(symbol)
+            return False
+        self._seen[symbol] = generation
+        self.evaluated += 1
+        return True
+
+    def end(self) -> Dict:
+        """
+        Finish the scan cycle.
+
+        Returns:
+            Cycle report {'evaluated', 'skipped', 'cycles', 'total_evaluated', 'total_skipped'}
+        """
+        self.cycles += 1
+        self.total_evaluated += self.evaluated
+        self.total_skipped += self.skipped
+        self.last_report = {
+            'evaluated': self.evaluated,
+            'skipped': self.skipped,
+            'cycles': self.cycles,
+            'total_evaluated': self.total_evaluated,
+            'total_skipped': self.total_skipped,
+        }
+        logger.info(f"📋 {self.name} scan: {self.evaluated} evaluated, {self.skipped} skipped (no new bars)")
+        return self.last_report
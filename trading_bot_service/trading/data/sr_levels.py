@@ -0,0 +1,315 @@
+"""
+S/R Levels
+Per-symbol sorted support / resistance level index, kept across restarts
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Bars on each side of a confirmed intraday swing high / low
+SWING_STRENGTH = 2
+
+# Intraday swing levels kept per symbol (oldest dropped first)
+MAX_SWING_LEVELS = 100
+
+# Seconds between Firestore saves of changed indexes
+SAVE_INTERVAL_SECONDS = 300
+
+
+def floor_pivots(high: float, low: float, close: float) -> Dict[str, float]:
+    """Classic floor pivots of one session (same formulas as IroncladStrategy.calculate_indicators)."""
+    pivot = (high + low + close) / 3
+    return {
+        'S2': pivot - (high - low),
+        'S1': 2 * pivot - high,
+        'P': pivot,
+        'R1': 2 * pivot - low,
+        'R2': pivot + (high - low),
+    }
+
+
+class SRLevels:
+    """
+    Immutable sorted price levels with O(log n) queries.
+
+    `kinds[i]` labels `prices[i]`: floor pivots (S2, S1, P, R1, R2 of the
+    previous session) or intraday swing highs / lows (SH, SL).
+    """
+
+    __slots__ = ('prices', 'kinds')
+
+    def __init__(self, prices: Tuple[float, ...] = (), kinds: Tuple[str, ...] = ()):
+        self.prices = prices
+        self.kinds = kinds
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def nearest(self, price: float) -> Optional[Tuple[float, str]]:
+        """Closest level to price (either side)."""
+        i = bisect_left(self.prices, price)
+        candidates = [j for j in (i - 1, i) if 0 <= j < len(self.prices)]
+        if not candidates:
+            return None
+        j = min(candidates, key=lambda k: abs(self.prices[k] - price))
+        return self.prices[j], self.kinds[j]
+
+    def support_below(self, price: float) -> Optional[Tuple[float, str]]:
+        """Highest level at or below price."""
+        i = bisect_right(self.prices, price)
+        return (self.prices[i - 1], self.kinds[i - 1]) if i > 0 else None
+
+    def resistance_above(self, price: float) -> Optional[Tuple[float, str]]:
+        """Lowest level strictly above price."""
+        i = bisect_right(self.prices, price)
+        return (self.prices[i], self.kinds[i]) if i < len(self.prices) else None
+
+    def count_within(self, price: float, tolerance_pct: float) -> int:
+        """Confluence: number of levels within ±tolerance_pct % of price."""
+        band = price * tolerance_pct / 100.0
+        return bisect_right(self.prices, price + band) - bisect_left(self.prices, price - band)
+
+
+class SRLevelIndex:
+    """
+    Support / resistance levels of one symbol for one session.
+
+    Built from the previous session's floor pivots plus swing highs / lows
+    confirmed in the 1-minute bars, then extended bar by bar: a swing is
+    confirmed SWING_STRENGTH bars after its extreme, so each bar costs O(1)
+    plus an O(n) insert when it confirms a level (n ≤ MAX_SWING_LEVELS + 5).
+    Readers get `levels`, an immutable SRLevels replaced on every change, so
+    queries never see a half-updated index.
+    """
+
+    def __init__(self, session: date):
+        self.session = session
+        self.levels = SRLevels()
+        self.last_bar: Optional[pd.Timestamp] = None  # Last bar consumed
+        self._floor: Dict[str, float] = {}
+        self._swings: deque = deque()  # (price, kind) in confirmation order
+        self._window: deque = deque(maxlen=2 * SWING_STRENGTH + 1)  # (high, low) of the last bars
+        self.dirty = False  # Changed since last saved
+
+    def set_floor(self, high: float, low: float, close: float):
+        self._floor = floor_pivots(high, low, close)
+        self._rebuild()
+
+    def _rebuild(self):
+        pairs = sorted([(price, kind) for kind, price in self._floor.items()] + list(self._swings))
+        self.levels = SRLevels(tuple(p for p, _ in pairs), tuple(k for _, k in pairs))
+        self.dirty = True
+
+    def _add(self, price: float, kind: str):
+        levels = self.levels
+        i = bisect_right(levels.prices, price)
+        prices = levels.prices[:i] + (price,) + levels.prices[i:]
+        kinds = levels.kinds[:i] + (kind,) + levels.kinds[i:]
+        self._swings.append((price, kind))
+        if len(self._swings) > MAX_SWING_LEVELS:
+            old_price, old_kind = self._swings.popleft()
+            j = bisect_left(prices, old_price)
+            while kinds[j] != old_kind:
+                j += 1
+            prices = prices[:j] + prices[j + 1:]
+            kinds = kinds[:j] + kinds[j + 1:]
+        self.levels = SRLevels(prices, kinds)
+
+    def update(self, timestamp, high: float, low: float) -> bool:
+        """
+        Consume one closed bar (bars at or before last_bar are ignored).
+
+        Returns:
+            True if the bar confirmed a new level
+        """
+        timestamp = pd.Timestamp(timestamp)
+        if self.last_bar is not None and timestamp <= self.last_bar:
+            return False
+        self.last_bar = timestamp
+        self.dirty = True
+
+        window = self._window
+        window.append((high, low))
+        if len(window) < window.maxlen:
+            return False
+
+        k = SWING_STRENGTH
+        bars = list(window)
+        mid_high, mid_low = bars[k]
+        left, right = bars[:k], bars[k + 1:]
+        confirmed = False
+        if mid_high > max(h for h, _ in left) and mid_high >= max(h for h, _ in right):
+            self._add(mid_high, 'SH')
+            confirmed = True
+        if mid_low < min(l for _, l in left) and mid_low <= min(l for _, l in right):
+            self._add(mid_low, 'SL')
+            confirmed = True
+        return confirmed
+
+    def to_dict(self) -> Dict:
+        return {
+            'session': self.session.isoformat(),
+            'floor': dict(self._floor),
+            'swings': [[price, kind] for price, kind in self._swings],
+            'window': [[high, low] for high, low in self._window],
+            'last_bar': self.last_bar.isoformat() if self.last_bar is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SRLevelIndex':
+        index = cls(date.fromisoformat(data['session']))
+        index._floor = {kind: float(price) for kind, price in data.get('floor', {}).items()}
+        index._swings.extend((float(price), kind) for price, kind in data.get('swings', []))
+        index._window.extend((float(high), float(low)) for high, low in data.get('window', []))
+        if data.get('last_bar'):
+            index.last_bar = pd.Timestamp(data['last_bar'])
+        index._rebuild()
+        index.dirty = False
+        return index
+
+
+class SRLevelBook:
+    """
+    SRLevelIndex per symbol for the current session, persisted to Firestore
+    (collection `sr_levels`, one document per symbol).
+
+    At startup the indexes saved earlier in the same session are loaded and
+    only extended with the bars after their last one, so a restart does not
+    rebuild them from the full history.
+    """
+
+    COLLECTION = 'sr_levels'
+
+    def __init__(self, db=None):
+        self.db = db
+        self.session: Optional[date] = None
+        self._indexes: Dict[str, SRLevelIndex] = {}
+        self._lock = threading.Lock()  # Writers and saves (readers use the immutable levels)
+        self._last_save = 0.0
+
+        # Counters
+        self.loaded = 0
+        self.built = 0
+        self.saves = 0
+
+    def get(self, symbol: str) -> Optional[SRLevels]:
+        """Current levels of a symbol (None if it has no index)."""
+        index = self._indexes.get(symbol)
+        return index.levels if index is not None else None
+
+    def begin_session(self, session: date, symbols: Iterable[str]):
+        """
+        Start a session: load the symbols' indexes saved for it (others are
+        built by catch_up from history).
+        """
+        with self._lock:
+            if session != self.session:
+                self._indexes = {}
+            self.session = session
+        if self.db is None:
+            return
+        try:
+            refs = [self.db.collection(self.COLLECTION).document(symbol) for symbol in symbols]
+            for doc in self.db.get_all(refs):
+                data = doc.to_dict() if doc.exists else None
+                if not data or data.get('session') != session.isoformat():
+                    continue
+                with self._lock:
+                    self._indexes[doc.id] = SRLevelIndex.from_dict(data)
+                self.loaded += 1
+            logger.info(f"📐 S/R levels: loaded {self.loaded} saved index(es) for {session}")
+        except Exception as e:
+            logger.warning(f"Could not load saved S/R levels: {e}")
+
+    def catch_up(self, symbol: str, df: pd.DataFrame, rebuild: bool = False):
+        """
+        Extend a symbol's index with the bars of `df` after its last bar
+        (building it first if missing, or if `rebuild` after history changed;
+        a new index starts at the session's first bar).
+
+        Args:
+            df: 1-minute bars (capitalized OHLC, naive IST index)
+        """
+        if self.session is None or len(df) == 0:
+            return
+        with self._lock:
+            index = self._indexes.get(symbol)
+            if index is None or rebuild:
+                index = SRLevelIndex(self.session)
+                previous = df[df.index.date < self.session]
+                if len(previous):
+                    day = previous[previous.index.date == previous.index[-1].date()]
+                    index.set_floor(float(day['High'].max()), float(day['Low'].min()), float(day['Close'].iloc[-1]))
+                self._indexes[symbol] = index
+                self.built += 1
+
+            if index.last_bar is not None:
+                start = df.index.searchsorted(index.last_bar, side='right')
+            else:
+                start = df.index.searchsorted(pd.Timestamp(self.session))  # Swings are intraday: session bars only
+            highs = df['High'].to_numpy(dtype=float)
+            lows = df['Low'].to_numpy(dtype=float)
+            for i in range(start, len(df)):
+                index.update(df.index[i], highs[i], lows[i])
+
+    def update(self, symbol: str, timestamp, high: float, low: float):
+        """Consume one closed live bar of a symbol (ignored until its index exists)."""
+        index = self._indexes.get(symbol)
+        if index is None:
+            return
+        with self._lock:
+            index.update(timestamp, high, low)
+
+    def save(self, force: bool = False) -> int:
+        """
+        Write changed indexes (at most once per SAVE_INTERVAL_SECONDS unless forced).
+
+        Returns:
+            Number of documents written
+        """
+        if self.db is None or (not force and time.time() - self._last_save < SAVE_INTERVAL_SECONDS):
+            return 0
+        self._last_save = time.time()
+        with self._lock:
+            changed = {symbol: index.to_dict() for symbol, index in self._indexes.items() if index.dirty}
+            for symbol in changed:
+                self._indexes[symbol].dirty = False
+        if not changed:
+            return 0
+        try:
+            items = list(changed.items())
+            for start in range(0, len(items), 500):  # Firestore batch limit
+                batch = self.db.batch()
+                for symbol, data in items[start:start + 500]:
+                    batch.set(self.db.collection(self.COLLECTION).document(symbol), data)
+                batch.commit()
+            self.saves += 1
+            logger.debug(f"📐 S/R levels: saved {len(changed)} index(es)")
+            return len(changed)
+        except Exception as e:
+            logger.warning(f"Could not save S/R levels: {e}")
+            with self._lock:
+                for symbol in changed:
+                    if symbol in self._indexes:
+                        self._indexes[symbol].dirty = True
+            return 0
+
+    def get_stats(self) -> Dict:
+        indexes = list(self._indexes.values())
+        return {
+            'session': self.session.isoformat() if self.session else None,
+            'symbols': len(indexes),
+            'levels': sum(len(index.levels) for index in indexes),
+            'loaded': self.loaded,
+            'built': self.built,
+            'saves': self.saves,
+        }
@@ -0,0 +1,91 @@
+"""
+Columnar Tick Buffer
+Fixed-size struct-of-arrays ring of recent ticks per symbol
+"""
+
+import logging
+from typing import Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TICK_CAPACITY = 5000
+
+
+class TickBuffer:
+    """
+    Ring buffer of the last `capacity` ticks for one symbol.
+
+    Each field is its own preallocated NumPy column, so an append is four scalar
+    writes (no per-tick dict/datetime objects) and read-out is vectorised:
+        exchange_ts_ms (int64), sequence (int64), ltp (float64), volume (int64)
+    """
+
+    __slots__ = ('capacity', 'ts_ms', 'sequence', 'ltp', 'volume', '_next', 'total_count')
+
+    def __init__(self, capacity: int = DEFAULT_TICK_CAPACITY):
+        self.capacity = capacity
+        self.ts_ms = np.zeros(capacity, dtype=np.int64)
+        self.sequence = np.zeros(capacity, dtype=np.int64)
+        self.ltp = np.zeros(capacity, dtype=np.float64)
+        self.volume = np.zeros(capacity, dtype=np.int64)
+        self._next = 0  # Slot the next tick is written to
+        self.total_count = 0  # Ticks ever appended
+
+    def __len__(self) -> int:
+        return min(self.total_count, self.capacity)
+
+    def append(self, ts_ms: int, sequence: int, ltp: float, volume: int = 0):
+        """
+        Record one tick (O(1), overwrites the oldest when full).
+
+        Args:
+            ts_ms: Exchange timestamp in epoch milliseconds
+            sequence: Exchange sequence number
+            ltp: Last traded price
+            volume: Cumulative day volume (0 in LTP mode)
+        """
+        i = self._next
+        self.ts_ms[i] = ts_ms
+        self.sequence[i] = sequence
+        self.ltp[i] = ltp
+        self.volume[i] = volume
+        self._next = i + 1 if i + 1 < self.capacity else 0
+        self.total_count += 1
+
+    def _ordered(self, column: np.ndarray, n: int) -> np.ndarray:
+        """Last n values of a column, oldest first (always a copy)."""
+        start = self._next - n
+        if start >= 0:
+            return column[start:self._next].copy()
+        return np.concatenate((column[start:], column[:self._next]))
+
+    def last(self, n: int = None) -> Dict[str, np.ndarray]:
+        """
+        Most recent ticks in arrival order.
+
+        Args:
+            n: Number of ticks (default: everything buffered)
+
+        Returns:
+            Dict of column name → array (ts_ms, sequence, ltp, volume)
+        """
+        size = len(self)
+        n = size if n is None else min(n, size)
+        return {
+            'ts_ms': self._ordered(self.ts_ms, n),
+            'sequence': self._ordered(self.sequence, n),
+            'ltp': self._ordered(self.ltp, n),
+            'volume': self._ordered(self.volume, n),
+        }
+
+    @property
+    def last_ts_ms(self) -> int:
+        """Exchange timestamp of the newest tick (0 if empty)."""
+        return int(self.ts_ms[self._next - 1]) if self.total_count else 0
+
+    @property
+    def last_sequence(self) -> int:
+        """Sequence number of the newest tick (0 if empty)."""
+        return int(self.sequence[self._next - 1]) if self.total_count else 0
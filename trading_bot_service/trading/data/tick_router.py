@@ -0,0 +1,85 @@
+"""
+Tick Router
+Routes WebSocket ticks to per-symbol feed slots with a single hash lookup
+"""
+
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+
+from trading.data.bar_aggregator import BarAggregator
+from trading.data.order_book import OrderBook
+from trading.data.tick_buffer import TickBuffer
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolFeed:
+    """Per-symbol slot holding everything the tick path writes to."""
+
+    __slots__ = ('symbol', 'exchange_type', 'token', 'ticks', 'bars', 'bars_published', 'book')
+
+    def __init__(self, symbol: str, exchange_type: int, token: str):
+        self.symbol = symbol
+        self.exchange_type = exchange_type
+        self.token = token
+        self.ticks = TickBuffer()
+        self.bars = BarAggregator()
+        self.bars_published = 0  # Closed bars already merged into candle_data
+        self.book = OrderBook()  # Best-5 depth (filled only while subscribed in SnapQuote mode)
+
+    def __repr__(self):
+        return f"SymbolFeed({self.symbol} {self.exchange_type}:{self.token})"
+
+
+class TickRouter:
+    """
+    (exchange_type, token) → SymbolFeed routing table.
+
+    The table is rebuilt off the receive path and published by swapping a single
+    reference, so readers always see either the old or the new table in full.
+    Slots of symbols that stay subscribed are carried over, keeping their tick
+    history and open bar.
+    """
+
+    def __init__(self):
+        self._table: Dict[Tuple[int, str], SymbolFeed] = {}
+        self._feeds: Dict[str, SymbolFeed] = {}
+
+    def route(self, exchange_type: int, token: str) -> Optional[SymbolFeed]:
+        """Feed slot for a tick (None if the token is not subscribed)."""
+        return self._table.get((exchange_type, token))
+
+    @property
+    def feeds(self) -> Dict[str, SymbolFeed]:
+        """Current {symbol: SymbolFeed} (do not mutate)."""
+        return self._feeds
+
+    def rebuild(self, entries: Iterable[Tuple[str, int, str]]):
+        """
+        Replace the routing table.
+
+        Args:
+            entries: (symbol, exchange_type, token) for every subscribed symbol
+        """
+        feeds = {}
+        table = {}
+        for symbol, exchange_type, token in entries:
+            token = str(token)
+            feed = self._feeds.get(symbol)
+            if feed is None or feed.exchange_type != exchange_type or feed.token != token:
+                feed = SymbolFeed(symbol, exchange_type, token)
+            feeds[symbol] = feed
+            table[(exchange_type, token)] = feed
+
+        # Publish (reference assignment is atomic)
+        self._feeds = feeds
+        self._table = table
+        logger.debug(f"Tick routing table rebuilt: {len(table)} tokens")
+
+    def remove(self, symbols: Iterable[str]):
+        """Drop symbols from the routing table (e.g. after unsubscribe)."""
+        drop = set(symbols)
+        self.rebuild(
+            (feed.symbol, feed.exchange_type, feed.token)
+            for feed in self._feeds.values() if feed.symbol not in drop
+        )
@@ -0,0 +1,198 @@
+"""
+Timeframe Rollup
+Builds 5m / 15m / 1h bars incrementally from closed 1-minute bars
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from trading.data.candle_store import CandleStore, OHLCV_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Bar length in minutes per timeframe name
+TIMEFRAMES = {
+    '1m': 1,
+    '5m': 5,
+    '15m': 15,
+    '1h': 60,
+}
+
+# Angel One historical API interval for each rolled-up timeframe
+HISTORICAL_INTERVALS = {
+    '5m': 'FIVE_MINUTE',
+    '15m': 'FIFTEEN_MINUTE',
+    '1h': 'ONE_HOUR',
+}
+
+# NSE session opens 09:15 IST; buckets are anchored there (hourly bars are 09:15-10:15, ...)
+SESSION_OPEN_MINUTE = 9 * 60 + 15
+
+# Bars kept per timeframe (15m EMA200 needs 200 bars ≈ 8 sessions)
+ROLLUP_CAPACITY = 400
+
+
+def bucket_offset(timestamp: datetime, minutes: int) -> int:
+    """Minutes between the bucket start and `timestamp` (0 .. minutes - 1)."""
+    return (timestamp.hour * 60 + timestamp.minute - SESSION_OPEN_MINUTE) % minutes
+
+
+def bucket_start(timestamp: datetime, minutes: int) -> datetime:
+    """Start of the `minutes`-long bucket containing `timestamp`."""
+    minute = timestamp.replace(second=0, microsecond=0)
+    return minute - timedelta(minutes=bucket_offset(timestamp, minutes))
+
+
+def resample_minutes(df: pd.DataFrame, minutes: int) -> pd.DataFrame:
+    """Aggregate a 1-minute OHLCV frame into session-anchored `minutes` bars."""
+    ohlcv = df[list(OHLCV_COLUMNS)]
+    bars = ohlcv.resample(
+        f'{minutes}min', origin='start_day', offset=f'{SESSION_OPEN_MINUTE % minutes}min',
+        label='left', closed='left',
+    ).agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'})
+    return bars.dropna(subset=['Open'])
+
+
+class TimeframeRollup:
+    """
+    One higher timeframe of one symbol.
+
+    Closed 1-minute bars are folded into the open bucket in O(1). The bucket is
+    closed and appended to a CandleStore as soon as its last minute arrives (or
+    a minute from a later bucket does, e.g. the short 15:15 hourly bar), so the
+    rolled-up series never waits on the next bucket.
+    """
+
+    def __init__(self, minutes: int, capacity: int = ROLLUP_CAPACITY):
+        self.minutes = minutes
+        self.store = CandleStore(capacity)
+        self._open: Optional[list] = None  # [bucket_start, open, high, low, close, volume]
+        self._last_minute: Optional[pd.Timestamp] = None  # Last 1-minute bar folded in
+
+    def _close_open_bar(self) -> bool:
+        """Append the open bar. Returns False if history already held its bucket."""
+        start, open_, high, low, close, volume = self._open
+        self._open = None
+        last_ts = self.store.last_timestamp
+        if last_ts is not None and pd.Timestamp(start) <= last_ts:
+            return False  # Already loaded from history
+        self.store.append(start, {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume})
+        return True
+
+    def update(self, timestamp: datetime, open_: float, high: float, low: float,
+               close: float, volume: float) -> bool:
+        """
+        Fold one closed 1-minute bar in.
+
+        Returns:
+            True if a bar of this timeframe was closed
+        """
+        start = bucket_start(timestamp, self.minutes)
+        self._last_minute = pd.Timestamp(timestamp)
+        closed = False
+        bar = self._open
+        if bar is not None and bar[0] != start:
+            closed = self._close_open_bar()
+            bar = None
+
+        if bar is None:
+            self._open = [start, open_, high, low, close, volume]
+        else:
+            bar[2] = max(bar[2], high)
+            bar[3] = min(bar[3], low)
+            bar[4] = close
+            bar[5] += volume
+
+        if bucket_offset(timestamp, self.minutes) == self.minutes - 1:
+            closed = self._close_open_bar() or closed
+        return closed
+
+    def merge(self, bars: pd.DataFrame):
+        """
+        Merge closed bars of this timeframe (historical API or resampled minutes).
+        Rows already stored are replaced by `bars` for the same timestamp.
+        Buckets ending after the last 1-minute bar folded in are still forming
+        (e.g. the API's current bar on an intraday start) and are dropped: the
+        live minutes close them.
+        """
+        if bars is None or len(bars) == 0:
+            return
+        bars = bars[list(OHLCV_COLUMNS)]
+        if bars.index.tz is not None:
+            bars = bars.tz_localize(None)
+        if self._last_minute is not None:
+            complete = bars.index + pd.Timedelta(minutes=self.minutes) <= self._last_minute + pd.Timedelta(minutes=1)
+            bars = bars[complete]
+            if len(bars) == 0:
+                return
+        if len(self.store):
+            bars = pd.concat([self.store.to_frame(indicators=False), bars])
+            bars = bars[~bars.index.duplicated(keep='last')].sort_index()
+        self.store = CandleStore.from_frame(bars, self.store.capacity)
+
+    def seed_from_minutes(self, df: pd.DataFrame):
+        """
+        Rebuild this timeframe's bars covered by a 1-minute history frame.
+        An incomplete last bucket becomes the open bar and keeps filling live.
+        """
+        if df is None or len(df) == 0:
+            return
+        if df.index.tz is not None:
+            df = df.tz_localize(None)
+        bars = resample_minutes(df, self.minutes)
+        self._open = None
+        last_minute = self._last_minute = df.index[-1]
+        if bucket_offset(last_minute, self.minutes) != self.minutes - 1:
+            row = bars.iloc[-1]
+            self._open = [bars.index[-1].to_pydatetime(), row['Open'], row['High'],
+                          row['Low'], row['Close'], row['Volume']]
+            bars = bars.iloc[:-1]
+        self.merge(bars)
+
+    def to_frame(self, include_partial: bool = False) -> pd.DataFrame:
+        """OHLCV frame of closed bars (plus the forming bar if requested)."""
+        frame = self.store.to_frame(indicators=False)
+        if include_partial and self._open is not None:
+            start, *values = self._open
+            partial = pd.DataFrame([values], index=pd.DatetimeIndex([start]), columns=list(OHLCV_COLUMNS))
+            frame = pd.concat([frame, partial])
+        return frame
+
+
+class MultiTimeframeBars:
+    """All rolled-up timeframes of one symbol, fed from its 1-minute bars."""
+
+    def __init__(self, timeframes: Iterable[str] = ('5m', '15m', '1h'), capacity: int = ROLLUP_CAPACITY):
+        self.rollups: Dict[str, TimeframeRollup] = {
+            timeframe: TimeframeRollup(TIMEFRAMES[timeframe], capacity) for timeframe in timeframes
+        }
+
+    def update(self, timestamp: datetime, bar: Dict[str, float]) -> List[str]:
+        """
+        Fold one closed 1-minute bar (capitalized OHLCV dict) into every timeframe.
+
+        Returns:
+            Timeframes whose bar closed with this minute
+        """
+        return [
+            timeframe for timeframe, rollup in self.rollups.items()
+            if rollup.update(timestamp, bar['Open'], bar['High'], bar['Low'], bar['Close'], bar['Volume'])
+        ]
+
+    def seed_from_minutes(self, df: pd.DataFrame):
+        for rollup in self.rollups.values():
+            rollup.seed_from_minutes(df)
+
+    def merge(self, timeframe: str, bars: pd.DataFrame):
+        self.rollups[timeframe].merge(bars)
+
+    def to_frame(self, timeframe: str, include_partial: bool = False) -> Optional[pd.DataFrame]:
+        rollup = self.rollups.get(timeframe)
+        return rollup.to_frame(include_partial) if rollup is not None else None
+
+    def length(self, timeframe: str) -> int:
+        rollup = self.rollups.get(timeframe)
+        return len(rollup.store) if rollup is not None else 0
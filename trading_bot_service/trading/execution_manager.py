@@ -8,8 +8,10 @@
 # ==============================================================================
 
 import pandas as pd
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, List, Optional
 import logging # Using standard logging
+import threading
+import time
 
 
 # Import the checker modules using relative imports
@@ -22,26 +24,152 @@ from .checkers.execution_checker import ExecutionChecker
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
+# (check number, checker attribute, method name, description) in the fixed checklist order
+CHECKLIST = (
+    # Macro Checks (1-8)
+    (1, 'macro_checker', 'check_1_overall_market_trend', 'Overall Market Trend Alignment'),
+    (2, 'macro_checker', 'check_2_sector_strength', 'Sector Strength Confirmation'),
+    (3, 'macro_checker', 'check_3_economic_calendar_impact', 'Economic Calendar Impact'),
+    (4, 'macro_checker', 'check_4_intermarket_analysis', 'Intermarket Analysis Confirmation'),
+    (5, 'macro_checker', 'check_5_geopolitical_events', 'Geopolitical Events Assessment'),
+    (6, 'macro_checker', 'check_6_liquidity_conditions', 'Liquidity Conditions Assessment'),
+    (7, 'macro_checker', 'check_7_volatility_regime', 'Volatility Regime Confirmation'),
+    (8, 'macro_checker', 'check_8_major_news_announcements', 'Major News Announcements Check'),
+    # Pattern Checks (9-22)
+    (9, 'pattern_checker', 'check_9_pattern_quality', 'Pattern Quality and Maturity'),
+    (10, 'pattern_checker', 'check_10_breakout_volume_confirmation', 'Breakout Volume Confirmation'),
+    (11, 'pattern_checker', 'check_11_breakout_price_action', 'Breakout Price Action Strength'),
+    (12, 'pattern_checker', 'check_12_false_breakout_risk', 'False Breakout Risk Assessment'),
+    (13, 'pattern_checker', 'check_13_distance_to_nearest_support_resistance', 'Distance to Nearest Major Support/Resistance'),
+    (14, 'pattern_checker', 'check_14_confluence_with_fibonacci_levels', 'Confluence with Fibonacci Levels'),
+    (15, 'pattern_checker', 'check_15_prior_trend_leading_to_pattern', 'Prior Trend Leading to Pattern'),
+    (16, 'pattern_checker', 'check_16_volume_trend_during_pattern', 'Volume Trend During Pattern Formation'),
+    (17, 'pattern_checker', 'check_17_confluence_with_price_action', 'Confluence with Price Action'),
+    (18, 'pattern_checker', 'check_18_pattern_relative_to_volatility', 'Pattern Size Relative to Volatility'),
+    (19, 'pattern_checker', 'check_19_breakout_bar_relative_to_pattern', 'Breakout Bar Size Relative to Pattern'),
+    (20, 'pattern_checker', 'check_20_confluence_with_wave_count', 'Confluence with Elliott Wave Count'),
+    (21, 'pattern_checker', 'check_21_pattern_on_multiple_timeframes', 'Pattern Confirmation on Multiple Timeframes'),
+    (22, 'pattern_checker', 'check_22_sentiment_confluence', 'Sentiment Confluence'),
+    # Execution Checks (23-30)
+    (23, 'execution_checker', 'check_23_entry_timing', 'Optimal Entry Timing'),
+    (24, 'execution_checker', 'check_24_slippage_tolerance', 'Slippage Tolerance'),
+    (25, 'execution_checker', 'check_25_spread_cost', 'Spread Cost'),
+    (26, 'execution_checker', 'check_26_commission_and_fees', 'Commission and Fees'),
+    (27, 'execution_checker', 'check_27_account_margin', 'Account Margin Availability'),
+    (28, 'execution_checker', 'check_28_system_health', 'Trading System Health'),
+    (29, 'execution_checker', 'check_29_risk_per_trade', 'Risk Per Trade'),
+    (30, 'execution_checker', 'check_30_final_risk_assessment', 'Final Cumulative Risk Assessment'),
+)
+
+# Validations between re-rankings of the check order
+REORDER_INTERVAL = 25
+
+# Checks that read live state (wall clock, order book depth, RMS margin) and so
+# run on every validation; the others depend only on the bar and the signal
+LIVE_CHECKS = {23, 25, 27}
+
+# pattern_details fields identifying a signal within one bar (pattern and strategy signal layouts)
+SIGNAL_KEY_FIELDS = ('pattern_name', 'breakout_direction', 'action', 'breakout_price', 'entry_price',
+                     'initial_stop_loss', 'stop_loss', 'calculated_price_target', 'target', 'position_size')
+
+
+class CheckStats:
+    """Latency and rejection counters of one checklist check."""
+
+    __slots__ = ('number', 'description', 'calls', 'rejections', 'total_seconds')
+
+    def __init__(self, number: int, description: str):
+        self.number = number
+        self.description = description
+        self.calls = 0
+        self.rejections = 0
+        self.total_seconds = 0.0
+
+    @property
+    def avg_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+    @property
+    def rejection_rate(self) -> float:
+        """Smoothed (Laplace) rejection probability, 0.5 before the first call."""
+        return (self.rejections + 1) / (self.calls + 2)
+
+    @property
+    def rank(self) -> float:
+        """
+        Expected cost per rejection. Running independent pass/fail filters by
+        ascending cost / P(reject) minimises the expected cost of a validation;
+        checks never timed yet rank 0 so they are measured first.
+        """
+        return self.avg_seconds / self.rejection_rate
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'check': self.number,
+            'description': self.description,
+            'calls': self.calls,
+            'rejections': self.rejections,
+            'rejection_rate': round(self.rejections / self.calls, 4) if self.calls else None,
+            'avg_ms': round(self.avg_seconds * 1000, 3),
+        }
+
+
 class ExecutionManager:
     """
     Orchestrates the 30-Point Grandmaster Checklist to validate potential trade entries.
     """
 
-    def __init__(self):
-        """Initializes the ExecutionManager with instances of the checker modules."""
-        self.macro_checker = MacroChecker()
+    def __init__(self, order_book_provider: Optional[Callable] = None,
+                 market_regime_provider: Optional[Callable] = None,
+                 margin_provider: Optional[Callable] = None,
+                 adaptive_order: bool = True):
+        """Initializes the ExecutionManager with instances of the checker modules.
+
+        Args:
+            order_book_provider: Optional callable(symbol) -> OrderBook or None,
+                                 used by the execution checks for live market depth.
+            market_regime_provider: Optional callable() -> RegimeState or None,
+                                    the shared NIFTY 50 state for the macro checks.
+            margin_provider: Optional callable() -> MarginSnapshot or None, the
+                             background-refreshed RMS margin for check 27.
+            adaptive_order: Run the checks cheapest-and-most-selective first (from
+                            their measured latency and rejection rate) instead of 1-30.
+        """
+        self.macro_checker = MacroChecker(market_regime_provider=market_regime_provider)
         self.pattern_checker = AdvancedPriceActionAnalyzer()
-        self.execution_checker = ExecutionChecker()
+        self.execution_checker = ExecutionChecker(order_book_provider=order_book_provider,
+                                                  margin_provider=margin_provider)
+        self.adaptive_order = adaptive_order
+
+        # Bound check methods + stats in checklist order; _order is the current run order
+        self._checks = [(getattr(getattr(self, checker), method), CheckStats(number, description))
+                        for number, checker, method, description in CHECKLIST]
+        self._order: List[int] = list(range(len(self._checks)))
+        self._stats_lock = threading.Lock()
+        self.validations = 0
+        self.reorders = 0
+
+        # Per-bar memo of the bar-dependent checks: symbol → (bar key, {signal key: verdict}),
+        # verdict = number of the failing check, or 0 if all of them passed
+        self._verdicts: Dict[str, tuple] = {}
+        self.memo_hits = 0
+        self.memo_misses = 0
         logging.info("ExecutionManager initialized with checker modules.")
 
 
     def validate_trade_entry(self, data: pd.DataFrame, pattern_details: Dict[str, Any]) -> bool:
         """
         Applies the comprehensive 30-Point Grandmaster Checklist to validate a trade entry signal.
-        Calls checks sequentially from Macro, Pattern, and Execution Checkers.
         The trade is only validated if ALL 30 checks pass.
         If any check fails, the process is aborted immediately, and the specific failure is logged.
 
+        The checks are independent, so the order they run in does not change
+        the result; with adaptive_order they run ranked by measured cost per
+        rejection (re-ranked every REORDER_INTERVAL validations), so the
+        slow network-bound checks only run for entries the cheap ones let through.
+        Verdicts of the bar-dependent checks are memoized per symbol, bar and
+        signal, so a repeated validation within one bar only re-runs LIVE_CHECKS.
+
         Args:
             data: Price and volume data DataFrame.
             pattern_details: Dictionary from PatternDetector containing pattern information
@@ -57,118 +185,108 @@ class ExecutionManager:
         pattern_name = pattern_details.get('pattern_name', 'Unknown Pattern')
         logging.info(f"EXECUTION_MANAGER: Starting 30-Point Grandmaster Checklist for potential trade based on '{pattern_name}'.")
 
+        # Same symbol, bar and signal as an earlier validation: only the live checks run again
+        memo = self._bar_verdicts(data, pattern_details)
+        signal_key = tuple(pattern_details.get(field) for field in SIGNAL_KEY_FIELDS)
+        cached = memo.get(signal_key) if memo is not None else None
+        if cached:
+            with self._stats_lock:
+                self.memo_hits += 1
+            logging.warning(f"EXECUTION_MANAGER: CHECK FAILED: {cached}. "
+                            f"{self._checks[cached - 1][1].description}. (same bar, cached)")
+            return False
+        if cached == 0:
+            with self._stats_lock:
+                self.memo_hits += 1
+        elif memo is not None:
+            with self._stats_lock:
+                self.memo_misses += 1
+
         # --- 30-Point Grandmaster Checklist Orchestration ---
-        # Calls to checker methods are sequential. Failure at any point aborts the process.
-
-        # Macro Checks (1-8)
-        logging.info("EXECUTION_MANAGER: Running Macro Checks (1-8)...")
-        if not self.macro_checker.check_1_overall_market_trend(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 1. Overall Market Trend Alignment.")
-             return False
-        if not self.macro_checker.check_2_sector_strength(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 2. Sector Strength Confirmation.")
-             return False
-        if not self.macro_checker.check_3_economic_calendar_impact(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 3. Economic Calendar Impact.")
-             return False
-        if not self.macro_checker.check_4_intermarket_analysis(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 4. Intermarket Analysis Confirmation.")
-             return False
-        if not self.macro_checker.check_5_geopolitical_events(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 5. Geopolitical Events Assessment.")
-             return False
-        if not self.macro_checker.check_6_liquidity_conditions(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 6. Liquidity Conditions Assessment.")
-             return False
-        if not self.macro_checker.check_7_volatility_regime(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 7. Volatility Regime Confirmation.")
-             return False
-        if not self.macro_checker.check_8_major_news_announcements(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 8. Major News Announcements Check.")
-             return False
-        logging.info("EXECUTION_MANAGER: Macro Checks (1-8) Passed.")
-
-
-        # Pattern Checks (9-22)
-        logging.info("EXECUTION_MANAGER: Running Pattern Checks (9-22)...")
-        if not self.pattern_checker.check_9_pattern_quality(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 9. Pattern Quality and Maturity.")
-             return False
-        if not self.pattern_checker.check_10_breakout_volume_confirmation(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 10. Breakout Volume Confirmation.")
-             return False
-        if not self.pattern_checker.check_11_breakout_price_action(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 11. Breakout Price Action Strength.")
-             return False
-        if not self.pattern_checker.check_12_false_breakout_risk(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 12. False Breakout Risk Assessment.")
-             return False
-        if not self.pattern_checker.check_13_distance_to_nearest_support_resistance(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 13. Distance to Nearest Major Support/Resistance.")
-             return False
-        if not self.pattern_checker.check_14_confluence_with_fibonacci_levels(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 14. Confluence with Fibonacci Levels.")
-             return False
-        if not self.pattern_checker.check_15_prior_trend_leading_to_pattern(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 15. Prior Trend Leading to Pattern.")
-             return False
-        if not self.pattern_checker.check_16_volume_trend_during_pattern(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 16. Volume Trend During Pattern Formation.")
-             return False
-        if not self.pattern_checker.check_17_confluence_with_price_action(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 17. Confluence with Price Action.")
-             return False
-        if not self.pattern_checker.check_18_pattern_relative_to_volatility(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 18. Pattern Size Relative to Volatility.")
-             return False
-        if not self.pattern_checker.check_19_breakout_bar_relative_to_pattern(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 19. Breakout Bar Size Relative to Pattern.")
-             return False
-        if not self.pattern_checker.check_20_confluence_with_wave_count(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 20. Confluence with Elliott Wave Count.")
-             return False
-        if not self.pattern_checker.check_21_pattern_on_multiple_timeframes(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 21. Pattern Confirmation on Multiple Timeframes.")
-             return False
-        if not self.pattern_checker.check_22_sentiment_confluence(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 22. Sentiment Confluence.")
-             return False
-        logging.info("EXECUTION_MANAGER: Pattern Checks (9-22) Passed.")
-
-
-        # Execution Checks (23-30)
-        logging.info("EXECUTION_MANAGER: Running Execution Checks (23-30)...")
-        if not self.execution_checker.check_23_entry_timing(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 23. Optimal Entry Timing.")
-             return False
-        if not self.execution_checker.check_24_slippage_tolerance(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 24. Slippage Tolerance.")
-             return False
-        if not self.execution_checker.check_25_spread_cost(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 25. Spread Cost.")
-             return False
-        if not self.execution_checker.check_26_commission_and_fees(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 26. Commission and Fees.")
-             return False
-        if not self.execution_checker.check_27_account_margin(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 27. Account Margin Availability.")
-             return False
-        if not self.execution_checker.check_28_system_health(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 28. Trading System Health.")
-             return False
-        if not self.execution_checker.check_29_risk_per_trade(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 29. Risk Per Trade.")
-             return False
-        if not self.execution_checker.check_30_final_risk_assessment(data, pattern_details):
-             logging.warning("EXECUTION_MANAGER: CHECK FAILED: 30. Final Cumulative Risk Assessment.")
-             return False
-        logging.info("EXECUTION_MANAGER: Execution Checks (23-30) Passed.")
+        # Checks run one at a time. Failure at any point aborts the process.
+        bar_checks_run = 0
+        for position in self._order:
+            check, stats = self._checks[position]
+            live = stats.number in LIVE_CHECKS
+            if cached == 0 and not live:
+                continue
+            started = time.perf_counter()
+            passed = check(data, pattern_details)
+            elapsed = time.perf_counter() - started
+            with self._stats_lock:
+                stats.calls += 1
+                stats.total_seconds += elapsed
+                if not passed:
+                    stats.rejections += 1
+            if not passed:
+                logging.warning(f"EXECUTION_MANAGER: CHECK FAILED: {stats.number}. {stats.description}.")
+                if memo is not None and not live:
+                    memo[signal_key] = stats.number
+                self._count_validation()
+                return False
+            if not live:
+                bar_checks_run += 1
 
+        if memo is not None and cached is None and bar_checks_run == len(CHECKLIST) - len(LIVE_CHECKS):
+            memo[signal_key] = 0
+        self._count_validation()
 
         # --- All Checks Passed ---
         logging.info(f"EXECUTION_MANAGER: All 30 Grandmaster Checklist Checks Passed for '{pattern_name}'. Trade entry is VALID.")
         return True
 
+    def _bar_verdicts(self, data: pd.DataFrame, pattern_details: Dict[str, Any]) -> Optional[Dict]:
+        """
+        Memoized verdicts of the symbol's current bar (None without a symbol).
+
+        The bar key is the frame's length and last timestamp plus the NIFTY 50
+        regime generation (read by check 1); a new bar drops the old verdicts.
+        """
+        symbol = pattern_details.get('symbol')
+        if not symbol or len(data) == 0:
+            return None
+        regime_generation = None
+        if self.macro_checker.market_regime_provider:
+            try:
+                regime = self.macro_checker.market_regime_provider()
+                regime_generation = regime.generation if regime is not None else None
+            except Exception:
+                regime_generation = None
+        bar_key = (len(data), data.index[-1], regime_generation)
+        with self._stats_lock:
+            entry = self._verdicts.get(symbol)
+            if entry is None or entry[0] != bar_key:
+                entry = self._verdicts[symbol] = (bar_key, {})
+            return entry[1]
+
+    def _count_validation(self):
+        """Count a completed validation and re-rank the checks every REORDER_INTERVAL."""
+        with self._stats_lock:
+            self.validations += 1
+            if not self.adaptive_order or self.validations % REORDER_INTERVAL:
+                return
+            # Stable sort: equal ranks keep checklist order
+            order = sorted(range(len(self._checks)), key=lambda i: self._checks[i][1].rank)
+            if order != self._order:
+                self._order = order  # Replaced whole: validations in flight keep iterating the old list
+                self.reorders += 1
+                logging.info("EXECUTION_MANAGER: Check order re-ranked: "
+                             + ", ".join(str(self._checks[i][1].number) for i in order))
+
+    def get_check_stats(self) -> Dict[str, Any]:
+        """Per-check latency and rejection counters, in the current run order."""
+        with self._stats_lock:
+            return {
+                'adaptive_order': self.adaptive_order,
+                'validations': self.validations,
+                'reorders': self.reorders,
+                'memo_hits': self.memo_hits,
+                'memo_misses': self.memo_misses,
+                'live_checks': sorted(LIVE_CHECKS),
+                'order': [self._checks[i][1].number for i in self._order],
+                'checks': [self._checks[i][1].to_dict() for i in self._order],
+            }
+
     # You might add other methods here for potential future use, but validate_trade_entry
     # is the primary interface for the checklist.
 
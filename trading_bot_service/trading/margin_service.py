@@ -0,0 +1,181 @@
+"""
+Margin Service
+Angel One RMS funds / margin kept fresh by a background thread for check 27
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+RMS_URL = "https://apiconnect.angelone.in/rest/secure/angelbroking/user/v1/getRMS"
+
+# Seconds between scheduled refreshes
+DEFAULT_REFRESH_SECONDS = 60
+
+# Snapshots older than this are reported stale to the checklist
+DEFAULT_MAX_AGE_SECONDS = 180
+
+
+class MarginSnapshot:
+    """RMS limits as of one successful fetch (`data` is the getRMS `data` object)."""
+
+    __slots__ = ('data', 'fetched_at', 'max_age')
+
+    def __init__(self, data: Dict, fetched_at: float, max_age: float):
+        self.data = data
+        self.fetched_at = fetched_at
+        self.max_age = max_age
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    @property
+    def stale(self) -> bool:
+        """Older than the service's staleness bound."""
+        return self.age > self.max_age
+
+    @property
+    def available(self) -> float:
+        """Available cash + available limit margin."""
+        return float(self.data.get('availablecash', 0) or 0) + float(self.data.get('availablelimitmargin', 0) or 0)
+
+
+class MarginService:
+    """
+    Background-refreshed RMS margin.
+
+    A daemon thread fetches getRMS every `refresh_seconds`, and at once after
+    request_refresh() (called after each order fill), so trade validation
+    reads the last snapshot from memory and never waits on the network.
+    A failed fetch keeps the previous snapshot; readers see it age past
+    `max_age_seconds` and become `stale`.
+    """
+
+    def __init__(self, api_key: str, jwt_token: str, refresh_seconds: float = DEFAULT_REFRESH_SECONDS,
+                 max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS, fetcher: Optional[Callable[[], Optional[Dict]]] = None):
+        """
+        Args:
+            api_key: Angel One API key
+            jwt_token: User's JWT token
+            refresh_seconds: Scheduled refresh interval
+            max_age_seconds: Staleness bound reported with each snapshot
+            fetcher: Optional callable() -> RMS data dict or None (defaults to the getRMS REST call)
+        """
+        self.api_key = api_key
+        self.jwt_token = jwt_token
+        self.refresh_seconds = refresh_seconds
+        self.max_age_seconds = max_age_seconds
+        self._fetch = fetcher or self._fetch_rms
+        self._snapshot: Optional[MarginSnapshot] = None
+        self._wake = threading.Event()
+        self._running = False
+        self._thread = None
+
+        # Counters
+        self.refreshes = 0
+        self.failures = 0
+        self.requested = 0
+        self.last_error = None
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='margin-service', daemon=True)
+        self._thread.start()
+        logger.info(f"💰 Margin service started (refresh every {self.refresh_seconds:.0f}s, "
+                    f"stale after {self.max_age_seconds:.0f}s)")
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2)
+
+    def request_refresh(self):
+        """Refresh as soon as possible (e.g. after an order fill changed the funds)."""
+        self.requested += 1
+        self._wake.set()
+
+    def update_token(self, jwt_token: str):
+        """Use a refreshed JWT from now on and fetch with it at once (clears the last error)."""
+        self.jwt_token = jwt_token
+        self.last_error = None
+        self._wake.set()
+
+    def snapshot(self) -> Optional[MarginSnapshot]:
+        """Last fetched margin (None until the first successful fetch)."""
+        return self._snapshot
+
+    def refresh(self) -> bool:
+        """Fetch now on the calling thread. Returns True on success."""
+        try:
+            data = self._fetch()
+        except Exception as e:
+            data = None
+            self.last_error = str(e)
+        if not data:
+            self.failures += 1
+            return False
+        self._snapshot = MarginSnapshot(data, time.time(), self.max_age_seconds)
+        self.refreshes += 1
+        self.last_error = None
+        return True
+
+    def _run(self):
+        while self._running:
+            self._wake.clear()
+            self.refresh()
+            # Retry failures sooner than the schedule so the snapshot goes stale as late as possible
+            wait = self.refresh_seconds if self.last_error is None and self._snapshot is not None \
+                else min(self.refresh_seconds, 10)
+            self._wake.wait(wait)
+
+    def _fetch_rms(self) -> Optional[Dict]:
+        """getRMS REST call (data object, or None on any error)."""
+        headers = {
+            'Authorization': f'Bearer {self.jwt_token}',
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+            'X-UserType': 'USER',
+            'X-SourceID': 'WEB',
+            'X-ClientLocalIP': '127.0.0.1',
+            'X-ClientPublicIP': '127.0.0.1',
+            'X-MACAddress': '00:00:00:00:00:00',
+            'X-PrivateKey': self.api_key
+        }
+        try:
+            response = requests.get(RMS_URL, headers=headers, timeout=10)
+        except requests.exceptions.Timeout:
+            self.last_error = "RMS API call timed out"
+            logger.error(self.last_error)
+            return None
+        if response.status_code != 200:
+            self.last_error = f"RMS API call failed with status {response.status_code}"
+            logger.error(f"{self.last_error}: {response.text}")
+            return None
+        result = response.json()
+        if not (result.get('status') and result.get('data')):
+            self.last_error = f"RMS API returned error: {result.get('message')}"
+            logger.error(self.last_error)
+            return None
+        logger.debug(f"RMS margin data fetched successfully: {result['data']}")
+        return result['data']
+
+    def get_stats(self) -> Dict:
+        snapshot = self._snapshot
+        return {
+            'available': round(snapshot.available, 2) if snapshot else None,
+            'age_seconds': round(snapshot.age, 1) if snapshot else None,
+            'stale': snapshot.stale if snapshot else True,
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+            'requested_refreshes': self.requested,
+            'last_error': self.last_error,
+        }
@@ -0,0 +1,135 @@
+"""
+Market Regime
+NIFTY 50 index state shared by all strategies, computed once per index bar
+"""
+
+import logging
+import math
+from typing import Dict, Optional
+
+import pandas as pd
+
+from trading.data.candle_store import CandleSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Streamed and bootstrapped like any symbol, but never scanned or traded
+NIFTY_SYMBOL = 'NIFTY 50'
+NIFTY_TOKEN_INFO = {'token': '99926000', 'exchange': 'NSE', 'trading_symbol': 'Nifty 50'}
+
+# Last-bar indicator columns of the index (same names as IroncladStrategy.calculate_indicators)
+REGIME_COLUMNS = ('adx', 'sma_10', 'sma_20', 'sma_50', 'sma_100', 'sma_200')
+
+
+class RegimeState:
+    """
+    NIFTY 50 state at the close of one index bar.
+
+    `indicators` holds the last-bar values of REGIME_COLUMNS (empty until the
+    index has enough history for them), so it can stand in for the last row
+    of an index DataFrame in checks that read `row.get('adx')` etc.
+    """
+
+    __slots__ = ('symbol', 'generation', 'timestamp', 'close', 'day_open', 'day_change_pct', 'indicators')
+
+    def __init__(self, symbol: str, generation: int, timestamp: pd.Timestamp, close: float,
+                 day_open: float, indicators: Dict[str, float]):
+        self.symbol = symbol
+        self.generation = generation  # Index candle generation the state was computed at
+        self.timestamp = timestamp
+        self.close = close
+        self.day_open = day_open  # Open of the session's first bar
+        self.day_change_pct = (close - day_open) / day_open * 100 if day_open else 0.0
+        self.indicators = indicators
+
+    @classmethod
+    def from_frame(cls, symbol: str, df: pd.DataFrame, generation: int) -> 'RegimeState':
+        """State from the index's 1-minute bars (capitalized OHLCV + indicator columns)."""
+        index = df.index
+        session_start = index.searchsorted(index[-1].normalize())
+        indicators = {column: float(df[column].iat[-1]) for column in REGIME_COLUMNS if column in df.columns}
+        return cls(symbol, generation, index[-1], float(df['Close'].iat[-1]),
+                   float(df['Open'].iat[session_start]), indicators)
+
+    @property
+    def ready(self) -> bool:
+        """All regime indicators available."""
+        return len(self.indicators) == len(REGIME_COLUMNS) and not any(
+            math.isnan(value) for value in self.indicators.values())
+
+    @property
+    def alignment(self) -> str:
+        """SMA stack of the index: BULLISH (10>20>50>100>200), BEARISH (inverse) or NEUTRAL."""
+        if not self.ready:
+            return 'NEUTRAL'
+        smas = [self.indicators[f'sma_{period}'] for period in (10, 20, 50, 100, 200)]
+        if all(a > b for a, b in zip(smas, smas[1:])):
+            return 'BULLISH'
+        if all(a < b for a, b in zip(smas, smas[1:])):
+            return 'BEARISH'
+        return 'NEUTRAL'
+
+    def to_dict(self) -> Dict:
+        return {
+            'symbol': self.symbol,
+            'timestamp': self.timestamp.isoformat(),
+            'close': round(self.close, 2),
+            'day_change_pct': round(self.day_change_pct, 3),
+            'adx': round(self.indicators['adx'], 2) if self.ready else None,
+            'alignment': self.alignment,
+            'ready': self.ready,
+        }
+
+
+class MarketRegimeService:
+    """
+    Cached NIFTY 50 regime.
+
+    The engine streams the index like a symbol, so its bars and indicators are
+    maintained once by the candle builder. update() derives the RegimeState
+    from a candle snapshot only when the index has a new bar; every other call
+    in the same bar (each strategy, each checklist run) returns the cached
+    state.
+    """
+
+    def __init__(self, symbol: str = NIFTY_SYMBOL):
+        self.symbol = symbol
+        self._state: Optional[RegimeState] = None
+
+        # Counters
+        self.updates = 0
+        self.cache_hits = 0
+
+    @property
+    def state(self) -> Optional[RegimeState]:
+        """Last computed state (None before the first index bar)."""
+        return self._state
+
+    def update(self, candles: CandleSnapshot) -> Optional[RegimeState]:
+        """
+        Regime at the snapshot's last index bar.
+
+        Returns:
+            RegimeState, or None if the snapshot has no index bars
+        """
+        generation = candles.generation(self.symbol)
+        if not generation or not candles.length(self.symbol):
+            return None
+        state = self._state
+        if state is not None and state.generation == generation:
+            self.cache_hits += 1
+            return state
+        try:
+            state = RegimeState.from_frame(self.symbol, candles[self.symbol], generation)
+        except Exception as e:
+            logger.warning(f"Market regime update failed: {e}")
+            return self._state
+        self._state = state
+        self.updates += 1
+        return state
+
+    def get_stats(self) -> Dict:
+        stats = self._state.to_dict() if self._state is not None else {'symbol': self.symbol, 'ready': False}
+        stats['updates'] = self.updates
+        stats['cache_hits'] = self.cache_hits
+        return stats
@@ -9,9 +9,11 @@
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from scipy.signal import find_peaks
 
+from trading.swing_pivots import SwingPivotTracker
+
 class PatternDetector:
     """
     Scans market data to identify high-probability chart patterns.
@@ -26,24 +28,41 @@ class PatternDetector:
             self.detect_triangles_and_wedges,
             # Add other pattern detection functions here as they are built
         ]
+        self._pivot_trackers: Dict[str, SwingPivotTracker] = {}  # symbol → swing pivots updated per bar
 
-    def scan(self, market_data: pd.DataFrame) -> Dict[str, Any]:
+    def scan(self, market_data: pd.DataFrame, symbol: Optional[str] = None) -> Dict[str, Any]:
         """
         Runs all available pattern scanners on the latest market data.
 
         Args:
             market_data: The DataFrame of price history (OHLCV).
+            symbol: Live symbol the data belongs to. Its swing pivots are then
+                tracked incrementally across scans instead of re-detected on
+                every window (same results).
 
         Returns:
             A dictionary containing the details of the first confirmed pattern found,
             or an empty dictionary if no patterns are confirmed.
         """
+        pivots = None
+        if symbol is not None:
+            pivots = self._pivot_trackers.get(symbol)
+            if pivots is None:
+                pivots = self._pivot_trackers[symbol] = SwingPivotTracker()
+            pivots.update(market_data)
         for scanner in self.pattern_scanners:
-            pattern_details = scanner(market_data)
+            pattern_details = scanner(market_data, pivots=pivots)
             if pattern_details:
                 return pattern_details
         return {}
 
+    def reset_pivots(self, symbol: Optional[str] = None):
+        """Forget tracked swing pivots of one symbol (history rewritten) or all."""
+        if symbol is None:
+            self._pivot_trackers.clear()
+        else:
+            self._pivot_trackers.pop(symbol, None)
+
     def _get_swing_points(self, data: pd.Series, distance=10, prominence_factor=None):
         """
         Utility to find swing highs and lows.
@@ -59,14 +78,24 @@ class PatternDetector:
         troughs, _ = find_peaks(-data, distance=distance)
         return peaks, troughs
 
-    def detect_double_top_bottom(self, data: pd.DataFrame, lookback=50) -> Dict[str, Any]:
+    def _window_swing_points(self, window: pd.Series, distance, pivots: Optional[SwingPivotTracker]):
+        """
+        Swing highs and lows of `window` (the latest bars of the High or Low
+        column), read from the symbol's pivot tracker when there is one.
+        """
+        if pivots is None or len(window) > pivots.max_lookback:
+            return self._get_swing_points(window, distance)
+        return (pivots.swing_points(window.name, 1, len(window), distance),
+                pivots.swing_points(window.name, -1, len(window), distance))
+
+    def detect_double_top_bottom(self, data: pd.DataFrame, lookback=50, pivots=None) -> Dict[str, Any]:
         """Detects Double Top and Double Bottom patterns (both forming and confirmed)."""
         if len(data) < lookback: return {}
         recent_data = data.iloc[-lookback:]
 
         # Find swing highs and lows separately
-        high_peaks, _ = self._get_swing_points(recent_data['High'])
-        _, low_troughs = self._get_swing_points(recent_data['Low'])
+        high_peaks, _ = self._window_swing_points(recent_data['High'], 10, pivots)
+        _, low_troughs = self._window_swing_points(recent_data['Low'], 10, pivots)
         
         # Double Top - STRICT CRITERIA TO REDUCE FALSE SIGNALS
         if len(high_peaks) >= 2:
@@ -179,7 +208,7 @@ class PatternDetector:
                 # FORMING patterns removed - only trade confirmed breakouts with trend alignment
         return {}
 
-    def detect_flags(self, data: pd.DataFrame, pole_lookback=15, flag_lookback=20) -> Dict[str, Any]:
+    def detect_flags(self, data: pd.DataFrame, pole_lookback=15, flag_lookback=20, pivots=None) -> Dict[str, Any]:
         """Detects Bull and Bear Flag patterns."""
         if len(data) < pole_lookback + flag_lookback: return {}
         
@@ -193,7 +222,7 @@ class PatternDetector:
         
         # Bull Flag
         if price_change > 0 and pole_height / pole_data['Close'].iloc[0] > 0.025: # At least 2.5% pole move (relaxed from 4%)
-            highs, lows = self._get_swing_points(flag_data['High'], 3, 0.005)
+            highs, lows = self._window_swing_points(flag_data['High'], 3, pivots)
             if len(highs) > 1:
                 high_coef = np.polyfit(highs, flag_data['High'].iloc[highs], 1)
                 slope = high_coef[0]
@@ -218,7 +247,7 @@ class PatternDetector:
                         }
         # Bear Flag
         if price_change < 0 and pole_height / pole_data['Close'].iloc[0] > 0.025: # At least 2.5% pole move (relaxed from 4%)
-            highs, lows = self._get_swing_points(flag_data['Low'], 3, 0.005)
+            highs, lows = self._window_swing_points(flag_data['Low'], 3, pivots)
             if len(lows) > 1:
                 low_coef = np.polyfit(lows, flag_data['Low'].iloc[lows], 1)
                 slope = low_coef[0]
@@ -243,12 +272,12 @@ class PatternDetector:
                         }
         return {}
 
-    def detect_triangles_and_wedges(self, data: pd.DataFrame, lookback=30) -> Dict[str, Any]:
+    def detect_triangles_and_wedges(self, data: pd.DataFrame, lookback=30, pivots=None) -> Dict[str, Any]:
         """Detects Triangles (Ascending, Descending, Symmetrical) and Wedges (Rising, Falling)."""
         if len(data) < lookback: return {}
         recent_data = data.iloc[-lookback:]
 
-        high_peaks, low_troughs = self._get_swing_points(recent_data['High'], 5, 0.01)
+        high_peaks, low_troughs = self._window_swing_points(recent_data['High'], 5, pivots)
         
         if len(high_peaks) < 2 or len(low_troughs) < 2: return {}
         
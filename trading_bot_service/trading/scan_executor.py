@@ -0,0 +1,227 @@
+"""
+Scan Executor
+Fans CPU-bound per-symbol pattern scans out to a persistent process pool
+"""
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from trading.data.candle_store import OHLCV_COLUMNS
+from trading.patterns import PatternDetector
+
+logger = logging.getLogger(__name__)
+
+# Below this many symbols the IPC round trip costs more than it saves
+MIN_PARALLEL_SYMBOLS = 16
+
+# Chunks submitted per worker (small enough to balance uneven symbols, large enough to amortise IPC)
+CHUNKS_PER_WORKER = 4
+
+# Upper bound for one parallel scan before falling back to the serial path
+SCAN_TIMEOUT_SECONDS = 30
+
+Job = Tuple[str, int, int, int]  # (symbol, first row in the shared block, row count, pivot reset epoch)
+
+_worker_detector: Optional[PatternDetector] = None
+_worker_epochs: Dict[str, int] = {}  # symbol → reset epoch its tracked pivots belong to
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (container CPU affinity, not the host count)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _init_worker():
+    global _worker_detector
+    _worker_detector = PatternDetector()
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+def _scan_chunk(shm_name: str, total_rows: int, jobs: List[Job]) -> List[Tuple[str, Dict]]:
+    """
+    Worker: run PatternDetector.scan for a chunk of symbols.
+
+    The block holds int64 timestamps (total_rows) followed by a float64
+    (total_rows, len(OHLCV_COLUMNS)) matrix. Each symbol's rows are copied out
+    before the block is closed, so nothing references the parent's memory.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        ts = np.ndarray((total_rows,), dtype=np.int64, buffer=shm.buf)
+        data = np.ndarray((total_rows, len(OHLCV_COLUMNS)), dtype=np.float64,
+                          buffer=shm.buf, offset=ts.nbytes)
+        frames = []
+        for symbol, start, count, epoch in jobs:
+            if _worker_epochs.get(symbol) != epoch:  # History rewritten since this worker last saw it
+                _worker_detector.reset_pivots(symbol)
+                _worker_epochs[symbol] = epoch
+            index = pd.DatetimeIndex(ts[start:start + count].astype('datetime64[ns]'), name='timestamp')
+            frames.append((symbol, pd.DataFrame(data[start:start + count].copy(), index=index,
+                                                columns=list(OHLCV_COLUMNS))))
+        del ts, data
+    finally:
+        shm.close()
+
+    return [(symbol, _worker_detector.scan(frame, symbol)) for symbol, frame in frames]
+
+
+class ScanExecutor:
+    """
+    PatternDetector.scan for many symbols at once.
+
+    Large universes are split into chunks and scanned by a persistent pool of
+    worker processes (own interpreter and GIL, so the tick thread is never
+    starved). Bar data is written once into a shared-memory block; tasks only
+    carry (symbol, row offset, row count, epoch), never pickled DataFrames. Small
+    universes, single-CPU hosts and any pool failure use the in-process
+    detector.
+
+    Workers track swing pivots per symbol like the in-process detector; each
+    job carries the symbol's reset epoch so reset_pivots() reaches them too.
+    """
+
+    def __init__(self, detector: Optional[PatternDetector] = None, max_workers: Optional[int] = None,
+                 min_parallel: int = MIN_PARALLEL_SYMBOLS):
+        """
+        Args:
+            detector: Detector for the serial path (new one if None)
+            max_workers: Worker processes (default: available CPUs)
+            min_parallel: Smallest universe scanned in parallel
+        """
+        self.detector = detector or PatternDetector()
+        self.max_workers = max_workers or available_cpus()
+        self.min_parallel = min_parallel
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._epochs: Dict[str, int] = {}  # symbol → pivot reset epoch sent with its jobs
+
+        # Counters
+        self.parallel_scans = 0
+        self.serial_scans = 0
+        self.pool_failures = 0
+        self.last_scan_ms = 0.0
+        self.last_mode = None
+
+    @property
+    def parallel_enabled(self) -> bool:
+        return self.max_workers > 1
+
+    def start(self):
+        """Spawn and warm up the worker processes (no-op when running serially)."""
+        if not self.parallel_enabled or self._pool is not None:
+            return
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context('spawn'),  # Never fork a process with live feed threads
+            initializer=_init_worker,
+        )
+        try:
+            pids = {future.result(timeout=SCAN_TIMEOUT_SECONDS)
+                    for future in [self._pool.submit(_warm_up) for _ in range(self.max_workers)]}
+            logger.info(f"⚙️ Scan pool ready: {len(pids)} worker process(es)")
+        except Exception as e:
+            logger.warning(f"⚠️ Scan pool failed to start ({e}) - scanning serially")
+            self._discard_pool()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _discard_pool(self):
+        self.pool_failures += 1
+        self.shutdown()
+
+    def reset_pivots(self, symbol: str):
+        """Forget a symbol's tracked swing pivots (history rewritten), here and in every worker."""
+        self.detector.reset_pivots(symbol)
+        self._epochs[symbol] = self._epochs.get(symbol, 0) + 1
+
+    def scan_patterns(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+        """
+        Pattern scan of every frame.
+
+        Args:
+            frames: {symbol: OHLCV DataFrame} (capitalized columns)
+
+        Returns:
+            {symbol: pattern details ({} if none)} in the order of `frames`
+        """
+        start = time.perf_counter()
+        results = None
+        if self.parallel_enabled and len(frames) >= self.min_parallel:
+            try:
+                if self._pool is None:
+                    self.start()
+                if self._pool is not None:
+                    results = self._scan_parallel(frames)
+                    self.parallel_scans += 1
+                    self.last_mode = 'parallel'
+            except Exception as e:
+                logger.warning(f"⚠️ Parallel pattern scan failed ({e}) - falling back to serial scan")
+                self._discard_pool()
+                results = None
+
+        if results is None:
+            results = {symbol: self.detector.scan(df, symbol) for symbol, df in frames.items()}
+            self.serial_scans += 1
+            self.last_mode = 'serial'
+
+        self.last_scan_ms = (time.perf_counter() - start) * 1000
+        logger.debug(f"🔎 Pattern scan of {len(frames)} symbols ({self.last_mode}): {self.last_scan_ms:.0f}ms")
+        return results
+
+    def _scan_parallel(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+        jobs = []
+        total_rows = 0
+        for symbol, df in frames.items():
+            jobs.append((symbol, total_rows, len(df), self._epochs.get(symbol, 0)))
+            total_rows += len(df)
+
+        ncols = len(OHLCV_COLUMNS)
+        shm = shared_memory.SharedMemory(create=True, size=max(total_rows * 8 * (1 + ncols), 1))
+        try:
+            ts = np.ndarray((total_rows,), dtype=np.int64, buffer=shm.buf)
+            data = np.ndarray((total_rows, ncols), dtype=np.float64, buffer=shm.buf, offset=ts.nbytes)
+            for (symbol, first, count, _), df in zip(jobs, frames.values()):
+                ts[first:first + count] = df.index.as_unit('ns').asi8
+                data[first:first + count] = df[list(OHLCV_COLUMNS)].to_numpy(dtype=np.float64)
+            del ts, data
+
+            # Round-robin chunks so large and small symbols spread evenly
+            n_chunks = min(len(jobs), self.max_workers * CHUNKS_PER_WORKER)
+            chunks = [jobs[i::n_chunks] for i in range(n_chunks)]
+            futures = [self._pool.submit(_scan_chunk, shm.name, total_rows, chunk) for chunk in chunks]
+
+            deadline = time.monotonic() + SCAN_TIMEOUT_SECONDS
+            scanned = {}
+            for future in futures:
+                scanned.update(future.result(timeout=max(deadline - time.monotonic(), 0)))
+        finally:
+            shm.close()
+            shm.unlink()
+
+        return {symbol: scanned[symbol] for symbol in frames}
+
+    def get_stats(self) -> Dict:
+        return {
+            'workers': self.max_workers if self._pool is not None else 0,
+            'parallel_scans': self.parallel_scans,
+            'serial_scans': self.serial_scans,
+            'pool_failures': self.pool_failures,
+            'last_mode': self.last_mode,
+            'last_scan_ms': round(self.last_scan_ms, 1),
+        }
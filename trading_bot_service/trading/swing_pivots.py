@@ -0,0 +1,169 @@
+"""
+Swing Pivots
+Incremental swing high / low tracking for PatternDetector
+"""
+
+import logging
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Longest window any PatternDetector scanner asks for (double top/bottom lookback)
+DEFAULT_MAX_LOOKBACK = 50
+
+# (column, +1 for swing highs / -1 for swing lows)
+SERIES = (('High', 1), ('Low', 1), ('High', -1), ('Low', -1))
+
+
+def select_by_distance(peaks: np.ndarray, priority: np.ndarray, distance: float) -> np.ndarray:
+    """
+    Boolean keep-mask of scipy.signal.find_peaks' `distance` rule: peaks are
+    visited from the highest priority down and every lower peak closer than
+    `distance` samples is dropped.
+    """
+    distance = np.ceil(distance)
+    keep = np.ones(len(peaks), dtype=bool)
+    order = np.argsort(priority)
+    for i in range(len(peaks) - 1, -1, -1):
+        j = order[i]
+        if not keep[j]:
+            continue
+        k = j - 1
+        while k >= 0 and peaks[j] - peaks[k] < distance:
+            keep[k] = False
+            k -= 1
+        k = j + 1
+        while k < len(peaks) and peaks[k] - peaks[j] < distance:
+            keep[k] = False
+            k += 1
+    return keep
+
+
+class SwingPivotTracker:
+    """
+    Confirmed local maxima / minima of one symbol's High and Low series.
+
+    A bar (or flat run of equal bars) becomes a pivot once the next different
+    bar closes on the same side, i.e. as soon as find_peaks would report it.
+    Pivots are kept in bar order for the last `max_lookback` bars only, so a
+    query for the pivots of a recent window walks the k pivots inside it, and
+    an update costs O(new bars), independent of the history length.
+
+    swing_points() returns exactly what find_peaks(series[-lookback:],
+    distance=distance) returns for the same window: a pivot counts when both
+    of its lower neighbours lie inside the window, and the distance rule is
+    applied to the pivots of that window.
+    """
+
+    def __init__(self, max_lookback: int = DEFAULT_MAX_LOOKBACK):
+        self.max_lookback = max_lookback
+        self.reset()
+
+    def reset(self):
+        self.count = 0  # Bars consumed (absolute position of the next bar)
+        self.last_ts = None
+        self._recent_ts: deque = deque(maxlen=self.max_lookback + 1)  # Timestamps (ns) of the last bars
+        self._recent_bars: deque = deque(maxlen=self.max_lookback + 1)  # (High, Low) of the last bars
+        self._pivots: Dict[Tuple[str, int], deque] = {key: deque() for key in SERIES}  # (left, right, value)
+        self._pending: Dict[Tuple[str, int], Optional[Tuple[int, float]]] = dict.fromkeys(SERIES)  # (left, value)
+        self._prev: Dict[Tuple[str, int], Optional[float]] = dict.fromkeys(SERIES)
+
+    def update(self, df: pd.DataFrame) -> int:
+        """
+        Consume the bars of `df` after the last one seen (rebuilding from `df`
+        if the history no longer lines up, e.g. after a backfill).
+
+        Returns:
+            Number of bars consumed
+        """
+        n = len(df)
+        if n == 0:
+            return 0
+        index = df.index
+        start = 0
+        if self.last_ts is not None:
+            pos = index.searchsorted(self.last_ts)
+            if pos < n and index[pos] == self.last_ts and self._lines_up(df, index, pos):
+                start = pos + 1
+            else:
+                self.reset()
+
+        if start == n:
+            return 0
+        highs = df['High'].to_numpy(dtype=np.float64)
+        lows = df['Low'].to_numpy(dtype=np.float64)
+        for t in range(start, n):
+            self._append(highs[t], lows[t])
+
+        recent = max(start, n - self._recent_ts.maxlen)
+        self._recent_ts.extend(index[recent:].as_unit('ns').asi8)
+        self._recent_bars.extend(zip(highs[recent:], lows[recent:]))
+        self.last_ts = index[-1]
+        return n - start
+
+    def _lines_up(self, df: pd.DataFrame, index: pd.DatetimeIndex, pos: int) -> bool:
+        """
+        The last max_lookback + 1 bars seen (all that tracked pivots depend on)
+        are still the bars ending at `pos`: none inserted, removed or changed.
+        Fails closed (rebuild) when `df` is too short to compare them all.
+        """
+        first = pos + 1 - len(self._recent_ts)
+        if first < 0:
+            return False
+        if not np.array_equal(index[first:pos + 1].as_unit('ns').asi8, np.fromiter(self._recent_ts, dtype=np.int64)):
+            return False
+        bars = np.column_stack((df['High'].to_numpy(dtype=np.float64)[first:pos + 1],
+                                df['Low'].to_numpy(dtype=np.float64)[first:pos + 1]))
+        return np.array_equal(bars, np.array(self._recent_bars, dtype=np.float64).reshape(-1, 2), equal_nan=True)
+
+    def _append(self, high: float, low: float):
+        t = self.count
+        for key in SERIES:
+            column, sign = key
+            x = sign * (high if column == 'High' else low)
+            pending = self._pending[key]
+            if pending is not None:
+                left, value = pending
+                if x < value:
+                    self._pivots[key].append((left, t - 1, value))
+                    pending = None
+                elif not x == value:  # Higher (or NaN): not a pivot
+                    pending = None
+            prev = self._prev[key]
+            if pending is None and prev is not None and prev < x:
+                pending = (t, x)
+            self._pending[key] = pending
+            self._prev[key] = x
+
+            pivots = self._pivots[key]
+            while pivots and pivots[0][0] <= t - self.max_lookback:
+                pivots.popleft()
+        self.count += 1
+
+    def swing_points(self, column: str, sign: int, lookback: int, distance: float) -> np.ndarray:
+        """
+        Pivot positions within the last `lookback` bars (0 = first bar of the window).
+
+        Args:
+            column: 'High' or 'Low'
+            sign: 1 for swing highs, -1 for swing lows
+            lookback: Window length (at most max_lookback)
+            distance: Minimum bars between pivots (find_peaks `distance`)
+        """
+        if lookback > self.max_lookback:
+            raise ValueError(f"lookback {lookback} exceeds tracked {self.max_lookback} bars")
+        first = self.count - lookback
+        found = []
+        for left, right, value in reversed(self._pivots[(column, sign)]):
+            if left - 1 < first:
+                break
+            found.append(((left + right) // 2 - first, value))
+        if not found:
+            return np.empty(0, dtype=np.intp)
+        found.reverse()
+        peaks = np.array([p for p, _ in found], dtype=np.intp)
+        return peaks[select_by_distance(peaks, np.array([v for _, v in found]), distance)]
@@ -0,0 +1,118 @@
+"""
+Universe Filter
+Vectorised pre-filter of the scan universe on cheap last-bar threshold conditions
+"""
+
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+Values = Dict[str, np.ndarray]  # column → last-bar value per symbol (NaN if unavailable)
+
+
+class Condition:
+    """
+    One named pre-filter condition.
+
+    `test` receives the column arrays and returns a boolean array over the
+    symbols (or one bool for the whole universe, e.g. a time window). It must
+    be a necessary condition of the analysis it gates: written as the negation
+    of that analysis' own reject test, including its NaN behaviour, so the
+    filter never drops a symbol the analysis would have accepted.
+    """
+
+    __slots__ = ('name', 'columns', 'test')
+
+    def __init__(self, name: str, test: Callable[[Values], Union[np.ndarray, bool]],
+                 columns: Iterable[str] = ()):
+        """
+        Args:
+            name: Label in the pass-through report
+            test: Column arrays → pass mask
+            columns: Columns the test reads (symbols without values pass these untested)
+        """
+        self.name = name
+        self.test = test
+        self.columns = tuple(columns)
+
+
+def stack_rows(rows: Sequence[Optional[Dict[str, float]]], columns: Iterable[str]) -> Tuple[Values, np.ndarray]:
+    """
+    Stack per-symbol last-bar dicts (e.g. IndicatorPanel.latest()) into column arrays.
+
+    Returns:
+        (values, known) - known[i] is False where rows[i] is None
+    """
+    known = np.fromiter((row is not None for row in rows), dtype=bool, count=len(rows))
+    values = {
+        column: np.fromiter((row[column] if row is not None else np.nan for row in rows),
+                            dtype=np.float64, count=len(rows))
+        for column in columns
+    }
+    return values, known
+
+
+class UniverseFilter:
+    """
+    Ordered threshold conditions evaluated for the whole universe at once.
+
+    Each condition is one NumPy expression over (symbols,) arrays of last-bar
+    values; only symbols passing all of them go on to the expensive per-symbol
+    analysis. The report counts the symbols still alive after each condition,
+    so the funnel shows which condition removes most of the universe.
+    """
+
+    def __init__(self, name: str, conditions: Iterable[Condition]):
+        self.name = name
+        self.conditions = list(conditions)
+
+        # Totals
+        self.cycles = 0
+        self.total_symbols = 0
+        self.total_survivors = 0
+        self.last_report: Dict = {}
+
+    def apply(self, symbols: Sequence[str], values: Values,
+              known: Optional[np.ndarray] = None) -> List[str]:
+        """
+        Filter symbols.
+
+        Args:
+            symbols: Universe, aligned with the value arrays
+            values: {column: (len(symbols),) float array}
+            known: Symbols that have values; the others pass every condition
+                that reads columns (the full analysis decides for them)
+
+        Returns:
+            Surviving symbols in input order
+        """
+        n = len(symbols)
+        alive = np.ones(n, dtype=bool)
+        passed = {}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for condition in self.conditions:
+                mask = np.broadcast_to(np.asarray(condition.test(values), dtype=bool), (n,))
+                if condition.columns and known is not None:
+                    mask = mask | ~known
+                alive &= mask
+                passed[condition.name] = int(alive.sum())
+
+        survivors = [symbols[i] for i in np.flatnonzero(alive)]
+
+        self.cycles += 1
+        self.total_symbols += n
+        self.total_survivors += len(survivors)
+        self.last_report = {
+            'symbols': n,
+            'passed': passed,
+            'survivors': len(survivors),
+            'total_symbols': self.total_symbols,
+            'total_survivors': self.total_survivors,
+        }
+        if n:
+            funnel = ' → '.join(f"{name} {count}" for name, count in passed.items())
+            logger.info(f"🧹 {self.name} pre-filter: {n} symbols → {funnel}")
+        return survivors
@@ -1,4 +1,7 @@
 """WebSocket integration for real-time market data"""
 from .websocket_manager_v2 import AngelWebSocketV2Manager
+from .tick_decoder import Tick, decode_tick, decode_batch
+from .tick_dispatcher import TickDispatcher
+from .subscription_state import SubscriptionState
 
-__all__ = ['AngelWebSocketV2Manager']
+__all__ = ['AngelWebSocketV2Manager', 'Tick', 'decode_tick', 'decode_batch', 'TickDispatcher', 'SubscriptionState']
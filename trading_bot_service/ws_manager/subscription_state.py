@@ -0,0 +1,103 @@
+"""
+Subscription State
+Tracks the streaming mode of every subscribed token and diffs it against a desired state
+"""
+
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+TokenKey = Tuple[int, str]  # (exchange_type, token)
+
+
+def token_groups(keys: Iterable[TokenKey]) -> List[Dict]:
+    """(exchange_type, token) pairs → v2 tokenList [{"exchangeType": 1, "tokens": [...]}, ...]"""
+    by_exchange = defaultdict(list)
+    for exchange_type, token in keys:
+        by_exchange[exchange_type].append(token)
+    return [{"exchangeType": exchange_type, "tokens": tokens} for exchange_type, tokens in by_exchange.items()]
+
+
+class SubscriptionState:
+    """
+    Current {(exchange_type, token): mode} as acknowledged by sent frames.
+
+    A token is held in exactly one mode. diff() turns a desired mapping into the
+    minimal subscribe / unsubscribe requests per mode, so tokens whose mode does
+    not change never produce a frame.
+    """
+
+    def __init__(self):
+        self._modes: Dict[TokenKey, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._modes)
+
+    def __contains__(self, key: TokenKey) -> bool:
+        return key in self._modes
+
+    def clear(self):
+        self._modes.clear()
+
+    def tokens(self) -> set:
+        """Subscribed token strings (any exchange, any mode)."""
+        return {token for _, token in self._modes}
+
+    def mode_of(self, exchange_type: int, token: str) -> int:
+        """Mode a token is subscribed in (0 if not subscribed)."""
+        return self._modes.get((exchange_type, str(token)), 0)
+
+    def record_subscribe(self, mode: int, tokens: List[Dict]):
+        """Record a sent subscribe frame (v2 tokenList format)."""
+        for group in tokens:
+            for token in group.get('tokens', []):
+                self._modes[(group['exchangeType'], str(token))] = mode
+
+    def record_unsubscribe(self, mode: int, tokens: List[Dict]):
+        """Record a sent unsubscribe frame; tokens held in another mode are kept."""
+        for group in tokens:
+            for token in group.get('tokens', []):
+                key = (group['exchangeType'], str(token))
+                if self._modes.get(key) == mode:
+                    del self._modes[key]
+
+    def diff(self, desired: Dict[TokenKey, int]) -> Tuple[Dict[int, List[Dict]], Dict[int, List[Dict]]]:
+        """
+        Requests needed to move from the current state to `desired`.
+
+        Returns:
+            (subscribe, unsubscribe), each {mode: tokenList}. Mode changes appear
+            in both: subscribe in the new mode, unsubscribe from the old one.
+        """
+        subscribe = defaultdict(list)
+        unsubscribe = defaultdict(list)
+        for key, mode in desired.items():
+            current = self._modes.get(key)
+            if current == mode:
+                continue
+            subscribe[mode].append(key)
+            if current is not None:
+                unsubscribe[current].append(key)
+        for key, current in self._modes.items():
+            if key not in desired:
+                unsubscribe[current].append(key)
+        return (
+            {mode: token_groups(keys) for mode, keys in subscribe.items()},
+            {mode: token_groups(keys) for mode, keys in unsubscribe.items()},
+        )
+
+    def payloads(self) -> Dict[int, List[Dict]]:
+        """Full {mode: tokenList} for resubscribing after a reconnect."""
+        by_mode = defaultdict(list)
+        for key, mode in self._modes.items():
+            by_mode[mode].append(key)
+        return {mode: token_groups(keys) for mode, keys in by_mode.items()}
+
+    def counts(self) -> Dict[int, int]:
+        """Number of tokens per mode."""
+        counts = defaultdict(int)
+        for mode in self._modes.values():
+            counts[mode] += 1
+        return dict(counts)
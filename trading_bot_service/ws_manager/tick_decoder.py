@@ -0,0 +1,222 @@
+"""
+Binary Tick Decoder for Angel One WebSocket Streaming 2.0
+Precompiled struct layouts, one unpack per packet, batch decoding to NumPy.
+"""
+
+import logging
+import struct
+from typing import Dict, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODE_LTP = 1
+MODE_QUOTE = 2
+MODE_SNAP_QUOTE = 3
+
+LTP_PACKET_SIZE = 51
+QUOTE_PACKET_SIZE = 123
+SNAP_QUOTE_PACKET_SIZE = 379
+
+# Little-endian, no padding. Prices are int64 paise (÷100), buy/sell totals are doubles.
+_HEADER = '<BB25sqqq'                       # mode, exchange_type, token, sequence, exchange ts (ms), ltp
+_QUOTE = 'qqqddqqqq'                        # ltq, avg price, volume, total buy/sell qty, open, high, low, close
+_SNAP_QUOTE = 'qqq200xqqqq'                 # ltt, OI, OI change (unused), best-5 depth (via DEPTH_DTYPE), circuits, 52w
+
+LTP_STRUCT = struct.Struct(_HEADER)
+QUOTE_STRUCT = struct.Struct(_HEADER + _QUOTE)
+SNAP_QUOTE_STRUCT = struct.Struct(_HEADER + _QUOTE + _SNAP_QUOTE)
+
+# Best-5 market depth: 10 x 20-byte entries (flag 0 = buy, else sell; price in paise)
+DEPTH_OFFSET = 147
+DEPTH_LEVELS = 10
+DEPTH_DTYPE = np.dtype([('flag', '<u2'), ('quantity', '<i8'), ('price', '<i8'), ('orders', '<u2')])
+
+BufferLike = Union[bytes, bytearray, memoryview]
+
+# Raw 25-byte token field → str (bounded by the number of subscribed tokens)
+_token_cache: Dict[bytes, str] = {}
+
+
+def _token(raw: bytes) -> str:
+    token = _token_cache.get(raw)
+    if token is None:
+        token = _token_cache[raw] = raw.rstrip(b'\x00').decode('utf-8')
+    return token
+
+
+class Tick:
+    """
+    Decoded market data packet.
+
+    Fields not present in the packet's mode are None. Also supports the dict
+    style access (tick.get('ltp'), tick['volume']) used by tick callbacks.
+    """
+
+    __slots__ = (
+        'mode', 'exchange_type', 'token', 'sequence', 'timestamp', 'ltp',
+        'last_traded_qty', 'avg_traded_price', 'volume', 'total_buy_qty', 'total_sell_qty',
+        'open', 'high', 'low', 'close',
+        'last_traded_timestamp', 'open_interest',
+        'upper_circuit', 'lower_circuit', 'week_52_high', 'week_52_low',
+        'depth',
+    )
+
+    # Legacy dict keys that are not valid attribute names
+    _ALIASES = {'52_week_high': 'week_52_high', '52_week_low': 'week_52_low'}
+
+    def __init__(self, mode: int, exchange_type: int, token: str, sequence: int, timestamp: int, ltp: float):
+        self.mode = mode
+        self.exchange_type = exchange_type
+        self.token = token
+        self.sequence = sequence
+        self.timestamp = timestamp
+        self.ltp = ltp
+        self.last_traded_qty = self.avg_traded_price = self.volume = None
+        self.total_buy_qty = self.total_sell_qty = None
+        self.open = self.high = self.low = self.close = None
+        self.last_traded_timestamp = self.open_interest = None
+        self.upper_circuit = self.lower_circuit = self.week_52_high = self.week_52_low = None
+        self.depth = None  # SnapQuote only: read-only DEPTH_DTYPE array (10,) over the packet
+
+    def get(self, key: str, default=None):
+        value = getattr(self, self._ALIASES.get(key, key), None)
+        return default if value is None else value
+
+    def __getitem__(self, key: str):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def as_dict(self) -> Dict:
+        """Fields present in this packet, keyed like the legacy parser output."""
+        reverse = {v: k for k, v in self._ALIASES.items()}
+        return {
+            reverse.get(name, name): getattr(self, name)
+            for name in self.__slots__ if getattr(self, name) is not None
+        }
+
+    def __repr__(self):
+        return f"Tick({self.exchange_type}:{self.token} seq={self.sequence} ltp={self.ltp})"
+
+
+def decode_tick(data: BufferLike, offset: int = 0) -> Tick:
+    """
+    Decode one binary packet with a single precompiled unpack.
+
+    Args:
+        data: Packet bytes (or a buffer containing it)
+        offset: Start of the packet within data
+
+    Returns:
+        Tick
+
+    Raises:
+        struct.error: If the buffer is shorter than the LTP layout
+    """
+    size = len(data) - offset
+    mode = data[offset]
+
+    if mode == MODE_LTP or size < QUOTE_PACKET_SIZE:
+        m, exch, raw, seq, ts, ltp = LTP_STRUCT.unpack_from(data, offset)
+        return Tick(m, exch, _token(raw), seq, ts, ltp / 100.0)
+
+    snap = mode != MODE_QUOTE and size >= SNAP_QUOTE_PACKET_SIZE
+    values = (SNAP_QUOTE_STRUCT if snap else QUOTE_STRUCT).unpack_from(data, offset)
+    tick = Tick(values[0], values[1], _token(values[2]), values[3], values[4], values[5] / 100.0)
+    tick.last_traded_qty = values[6]
+    tick.avg_traded_price = values[7] / 100.0
+    tick.volume = values[8]
+    tick.total_buy_qty = values[9]
+    tick.total_sell_qty = values[10]
+    tick.open = values[11] / 100.0
+    tick.high = values[12] / 100.0
+    tick.low = values[13] / 100.0
+    tick.close = values[14] / 100.0
+    if snap:
+        tick.last_traded_timestamp = values[15]
+        tick.open_interest = values[16]
+        # values[17] is the OI change % placeholder
+        tick.upper_circuit = values[18] / 100.0
+        tick.lower_circuit = values[19] / 100.0
+        tick.week_52_high = values[20] / 100.0
+        tick.week_52_low = values[21] / 100.0
+        tick.depth = np.frombuffer(data, dtype=DEPTH_DTYPE, count=DEPTH_LEVELS, offset=offset + DEPTH_OFFSET)
+    return tick
+
+
+# ---------------------------------------------------------------------------
+# Batch decoding
+# ---------------------------------------------------------------------------
+
+_HEADER_DTYPE = [
+    ('mode', 'u1'), ('exchange_type', 'u1'), ('token', 'S25'),
+    ('sequence', '<i8'), ('timestamp', '<i8'), ('ltp', '<i8'),
+]
+_QUOTE_DTYPE = [
+    ('last_traded_qty', '<i8'), ('avg_traded_price', '<i8'), ('volume', '<i8'),
+    ('total_buy_qty', '<f8'), ('total_sell_qty', '<f8'),
+    ('open', '<i8'), ('high', '<i8'), ('low', '<i8'), ('close', '<i8'),
+]
+_SNAP_QUOTE_DTYPE = [
+    ('last_traded_timestamp', '<i8'), ('open_interest', '<i8'), ('oi_change', '<i8'),
+    ('depth', DEPTH_DTYPE, (DEPTH_LEVELS,)),
+    ('upper_circuit', '<i8'), ('lower_circuit', '<i8'), ('week_52_high', '<i8'), ('week_52_low', '<i8'),
+]
+
+PACKET_DTYPES = {
+    LTP_PACKET_SIZE: np.dtype(_HEADER_DTYPE),
+    QUOTE_PACKET_SIZE: np.dtype(_HEADER_DTYPE + _QUOTE_DTYPE),
+    SNAP_QUOTE_PACKET_SIZE: np.dtype(_HEADER_DTYPE + _QUOTE_DTYPE + _SNAP_QUOTE_DTYPE),
+}
+
+# Columns returned by decode_batch (price columns converted to rupees)
+BATCH_COLUMNS = {
+    'mode': np.uint8, 'exchange_type': np.uint8, 'token': 'S25',
+    'sequence': np.int64, 'timestamp': np.int64, 'ltp': np.float64,
+    'volume': np.int64, 'open': np.float64, 'high': np.float64, 'low': np.float64, 'close': np.float64,
+}
+_PRICE_COLUMNS = ('ltp', 'open', 'high', 'low', 'close')
+
+
+def decode_batch(packets: Sequence[BufferLike]) -> Dict[str, np.ndarray]:
+    """
+    Decode many packets into column arrays (one vectorised pass per packet size).
+
+    Packets of the three known sizes may be mixed; output rows keep input order.
+    Quote-only columns are 0 / NaN for LTP packets. Packets of any other size
+    are left as zero rows with mode 0.
+
+    Returns:
+        Dict of column name → np.ndarray (see BATCH_COLUMNS)
+    """
+    n = len(packets)
+    out = {name: np.zeros(n, dtype=dtype) for name, dtype in BATCH_COLUMNS.items()}
+    for name in ('open', 'high', 'low', 'close'):
+        out[name][:] = np.nan
+    if n == 0:
+        return out
+
+    sizes = np.fromiter(map(len, packets), dtype=np.int64, count=n)
+    for size, dtype in PACKET_DTYPES.items():
+        rows = np.flatnonzero(sizes == size)
+        if rows.size == 0:
+            continue
+        if rows.size == n:
+            buffer = b''.join(packets)
+        else:
+            buffer = b''.join([packets[i] for i in rows])
+        records = np.frombuffer(buffer, dtype=dtype)
+        for name in BATCH_COLUMNS:
+            if name not in dtype.names:
+                continue
+            column = records[name]
+            if name in _PRICE_COLUMNS:
+                column = column / 100.0
+            out[name][rows] = column
+    return out
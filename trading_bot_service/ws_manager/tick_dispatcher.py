@@ -0,0 +1,163 @@
+"""
+Tick Dispatcher
+Bounded queue between the WebSocket receive thread and tick consumers
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class TickDispatcher:
+    """
+    Decouples socket reads from tick callbacks.
+
+    The receive thread only appends to a bounded queue (never blocks on
+    consumers). A dedicated dispatcher thread drains the queue in batches and
+    invokes the callbacks. When the queue is full the overflow policy applies:
+
+    - DROP_OLDEST: discard the oldest queued tick
+    - COALESCE: collapse queued ticks to the latest one per token (keeps the
+      freshest LTP for every symbol), dropping the oldest only if the queue is
+      still full afterwards
+    """
+
+    DROP_OLDEST = 'drop_oldest'
+    COALESCE = 'coalesce'
+    POLICIES = (DROP_OLDEST, COALESCE)
+
+    def __init__(self, callbacks: List[Callable], max_size: int = 10000, batch_size: int = 500,
+                 policy: str = DROP_OLDEST):
+        """
+        Args:
+            callbacks: Callback list to invoke per tick (shared, may change at runtime)
+            max_size: Maximum queued ticks
+            batch_size: Maximum ticks taken from the queue per drain
+            policy: Overflow policy (DROP_OLDEST or COALESCE)
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy} (expected one of {self.POLICIES})")
+
+        self.callbacks = callbacks
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.policy = policy
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+        # Counters
+        self.enqueued = 0
+        self.dispatched = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.callback_errors = 0
+        self.max_depth = 0
+
+    # ========== Producer side (receive thread) ==========
+
+    def put(self, tick):
+        """Queue one decoded tick. Never blocks on consumers."""
+        with self._cond:
+            queue = self._queue
+            if len(queue) >= self.max_size:
+                self._overflow()
+            queue.append(tick)
+            self.enqueued += 1
+            depth = len(queue)
+            if depth > self.max_depth:
+                self.max_depth = depth
+            self._cond.notify()
+
+    def _overflow(self):
+        """Make room for one tick according to the policy (caller holds the lock)."""
+        queue = self._queue
+        if self.policy == self.COALESCE:
+            latest = {}
+            for tick in queue:
+                key = (tick.get('exchange_type'), tick.get('token'))
+                latest.pop(key, None)  # Re-insert so order follows the latest tick
+                latest[key] = tick
+            self.coalesced += len(queue) - len(latest)
+            if len(latest) < len(queue):
+                queue.clear()
+                queue.extend(latest.values())
+        if len(queue) >= self.max_size:
+            queue.popleft()
+            self.dropped += 1
+
+    # ========== Consumer side (dispatcher thread) ==========
+
+    def start(self):
+        """Start the dispatcher thread (no-op if already running)."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='tick-dispatcher', daemon=True)
+        self._thread.start()
+        logger.info(f"🚚 Tick dispatcher started (queue={self.max_size}, policy={self.policy})")
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the dispatcher thread. Ticks still queued are discarded."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+        with self._cond:
+            self._queue.clear()
+
+    def _take_batch(self) -> list:
+        with self._cond:
+            while self._running and not self._queue:
+                self._cond.wait(timeout=1.0)
+            if not self._running:
+                return []
+            queue = self._queue
+            count = min(len(queue), self.batch_size)
+            return [queue.popleft() for _ in range(count)]
+
+    def _run(self):
+        while self._running:
+            batch = self._take_batch()
+            if not batch:
+                continue
+            self.batches += 1
+            callbacks = list(self.callbacks)
+            for tick in batch:
+                for callback in callbacks:
+                    try:
+                        callback(tick)
+                    except Exception as e:
+                        self.callback_errors += 1
+                        logger.error(f"Error in tick callback: {e}")
+            self.dispatched += len(batch)
+        logger.info("🚚 Tick dispatcher stopped")
+
+    # ========== Monitoring ==========
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def get_stats(self) -> Dict:
+        """Queue depth and throughput/drop counters."""
+        return {
+            'policy': self.policy,
+            'queue_depth': len(self._queue),
+            'max_depth': self.max_depth,
+            'capacity': self.max_size,
+            'enqueued': self.enqueued,
+            'dispatched': self.dispatched,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'batches': self.batches,
+            'callback_errors': self.callback_errors,
+        }
@@ -6,12 +6,15 @@ Reference: https://smartapi.angelbroking.com/docs/WebSocket2
 
 import json
 import logging
-import struct
 import time
 import threading
-from typing import Dict, List, Callable, Optional
+from typing import Dict, List, Callable, Optional, Tuple
 import websocket
 
+from .tick_decoder import Tick, decode_tick
+from .tick_dispatcher import TickDispatcher
+from .subscription_state import SubscriptionState
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,7 +44,8 @@ class AngelWebSocketV2Manager:
     MODE_QUOTE = 2      # Quote (123 bytes)
     MODE_SNAP_QUOTE = 3 # Snap Quote (379 bytes)
     
-    def __init__(self, api_key: str, client_code: str, feed_token: str, jwt_token: str):
+    def __init__(self, api_key: str, client_code: str, feed_token: str, jwt_token: str,
+                 queue_size: int = 10000, overflow_policy: str = TickDispatcher.DROP_OLDEST):
         """
         Initialize WebSocket v2 manager.
         
@@ -50,6 +54,8 @@ class AngelWebSocketV2Manager:
             client_code: Client code (Angel One trading account ID)
             feed_token: Feed token from login API response
             jwt_token: JWT auth token from login API response
+            queue_size: Max ticks buffered between the socket and tick callbacks
+            overflow_policy: TickDispatcher.DROP_OLDEST or TickDispatcher.COALESCE
         """
         self.api_key = api_key
         self.client_code = client_code
@@ -68,9 +74,13 @@ class AngelWebSocketV2Manager:
         
         # Subscription tracking (persist across reconnections)
         self.subscribed_tokens = set()
-        self.subscription_mode = self.MODE_LTP  # Default mode
-        self.subscription_payload = []  # Store last subscription for resubscribe
+        self.subscriptions = SubscriptionState()  # (exchange_type, token) → mode, replayed on reconnect
         self.tick_callbacks: List[Callable] = []
+        self.reconnect_callbacks: List[Callable] = []  # Called after a successful reconnect + resubscribe
+        self.disconnect_callbacks: List[Callable] = []  # Called when the connection drops, before any reconnect
+        
+        # Callbacks run on a dispatcher thread so slow consumers never stall socket reads
+        self._dispatcher = TickDispatcher(self.tick_callbacks, max_size=queue_size, policy=overflow_policy)
         
         # Reconnection management
         self._auto_reconnect = True
@@ -122,6 +132,9 @@ class AngelWebSocketV2Manager:
                 on_close=self._on_close
             )
             
+            # Start tick dispatcher before the first message can arrive
+            self._dispatcher.start()
+            
             # Run WebSocket in background thread
             self._ws_thread = threading.Thread(
                 target=self.ws.run_forever,
@@ -176,10 +189,6 @@ class AngelWebSocketV2Manager:
             if not self.is_connected:
                 raise Exception("WebSocket not connected. Call connect() first.")
             
-            # Store subscription details for auto-resubscribe on reconnect
-            self.subscription_mode = mode
-            self.subscription_payload = tokens
-            
             # Generate correlation ID for tracking
             correlation_id = f"sub_{int(time.time() * 1000)}"
             
@@ -198,10 +207,9 @@ class AngelWebSocketV2Manager:
             logger.info(f"Sending subscription: {message}")
             self.ws.send(message)
             
-            # Track subscribed tokens
-            for token_group in tokens:
-                for token in token_group.get('tokens', []):
-                    self.subscribed_tokens.add(token)
+            # Track subscribed tokens (mode per token, for auto-resubscribe on reconnect)
+            self.subscriptions.record_subscribe(mode, tokens)
+            self.subscribed_tokens = self.subscriptions.tokens()
             
             total_tokens = sum(len(group.get('tokens', [])) for group in tokens)
             logger.info(f"✅ Subscribed to {total_tokens} tokens in mode {mode}")
@@ -239,10 +247,9 @@ class AngelWebSocketV2Manager:
             
             self.ws.send(json.dumps(payload))
             
-            # Remove from tracked tokens
-            for token_group in tokens:
-                for token in token_group.get('tokens', []):
-                    self.subscribed_tokens.discard(token)
+            # Remove from tracked tokens (kept if still subscribed in another mode)
+            self.subscriptions.record_unsubscribe(mode, tokens)
+            self.subscribed_tokens = self.subscriptions.tokens()
             
             total_tokens = sum(len(group.get('tokens', [])) for group in tokens)
             logger.info(f"✅ Unsubscribed from {total_tokens} tokens")
@@ -252,6 +259,34 @@ class AngelWebSocketV2Manager:
             logger.error(f"❌ Unsubscription failed: {str(e)}")
             raise
     
+    def set_modes(self, desired: Dict[Tuple[int, str], int]) -> Dict[str, int]:
+        """
+        Move subscriptions to the desired per-token modes with the fewest frames.
+        
+        Tokens whose mode is unchanged are not sent. For mode changes the new mode
+        is subscribed before the old one is unsubscribed, so the token never goes
+        quiet. Tokens missing from `desired` are unsubscribed.
+        
+        Args:
+            desired: {(exchange_type, token): mode} for every token to stream
+            
+        Returns:
+            Dict with the number of tokens subscribed / unsubscribed
+        """
+        desired = {(exchange_type, str(token)): mode for (exchange_type, token), mode in desired.items()}
+        subscribe, unsubscribe = self.subscriptions.diff(desired)
+        
+        # Highest mode first: upgraded tokens get their new stream before the old one is dropped
+        for mode in sorted(subscribe, reverse=True):
+            self.subscribe(mode, subscribe[mode])
+        for mode in sorted(unsubscribe):
+            self.unsubscribe(mode, unsubscribe[mode])
+        
+        return {
+            'subscribed': sum(len(group['tokens']) for groups in subscribe.values() for group in groups),
+            'unsubscribed': sum(len(group['tokens']) for groups in unsubscribe.values() for group in groups),
+        }
+    
     def disconnect(self) -> bool:
         """
         Close WebSocket connection and cleanup.
@@ -275,8 +310,12 @@ class AngelWebSocketV2Manager:
             if self.ws:
                 self.ws.close()
             
+            # Stop tick dispatcher
+            self._dispatcher.stop()
+            
             self.is_connected = False
             self.subscribed_tokens.clear()
+            self.subscriptions.clear()
             
             logger.info("✅ WebSocket disconnected")
             return True
@@ -302,6 +341,33 @@ class AngelWebSocketV2Manager:
             self.tick_callbacks.remove(callback)
             logger.debug(f"Removed tick callback: {callback.__name__}")
     
+    def add_reconnect_callback(self, callback: Callable):
+        """
+        Register callback for completed reconnections.
+        
+        Args:
+            callback: Function(reconnected_at_ms) called from the reconnect thread
+        """
+        if callback not in self.reconnect_callbacks:
+            self.reconnect_callbacks.append(callback)
+            logger.debug(f"Added reconnect callback: {callback.__name__}")
+    
+    def add_disconnect_callback(self, callback: Callable):
+        """
+        Register callback for dropped connections.
+        
+        Args:
+            callback: Function(disconnected_at_ms) called from the socket thread
+                before reconnecting (so before any resubscribe snapshot arrives)
+        """
+        if callback not in self.disconnect_callbacks:
+            self.disconnect_callbacks.append(callback)
+            logger.debug(f"Added disconnect callback: {callback.__name__}")
+    
+    def get_dispatch_stats(self) -> Dict:
+        """Tick queue depth and dropped/coalesced counters."""
+        return self._dispatcher.get_stats()
+    
     # ========== WebSocket Event Handlers ==========
     
     def _on_open(self, ws):
@@ -345,13 +411,11 @@ class AngelWebSocketV2Manager:
             # Binary message = market data tick
             if isinstance(message, bytes):
                 tick_data = self._parse_binary_tick(message)
+                if tick_data is None:
+                    return
                 
-                # Call all registered callbacks
-                for callback in self.tick_callbacks:
-                    try:
-                        callback(tick_data)
-                    except Exception as e:
-                        logger.error(f"Error in tick callback: {e}")
+                # Hand off to the dispatcher thread (callbacks never run on the socket thread)
+                self._dispatcher.put(tick_data)
                         
         except Exception as e:
             logger.error(f"Error processing message: {e}")
@@ -372,6 +436,14 @@ class AngelWebSocketV2Manager:
         self.is_connected = False
         self._stop_heartbeat = True
         
+        # Let consumers mark the outage before the resubscribe snapshot ticks arrive
+        disconnected_at_ms = int(time.time() * 1000)
+        for callback in self.disconnect_callbacks:
+            try:
+                callback(disconnected_at_ms)
+            except Exception as e:
+                logger.error(f"Error in disconnect callback: {e}")
+        
         # Trigger auto-reconnection if enabled
         if self._auto_reconnect and not self._stop_reconnect:
             logger.info("🔄 Connection lost - Initiating auto-reconnect...")
@@ -478,15 +550,25 @@ class AngelWebSocketV2Manager:
                     logger.info("✅ WebSocket reconnected successfully")
                     
                     # Resubscribe to previous subscriptions
-                    if self.subscription_payload:
+                    if len(self.subscriptions):
                         logger.info("🔄 Resubscribing to previous symbols...")
                         time.sleep(1)  # Wait for connection to stabilize
                         try:
-                            self.subscribe(self.subscription_mode, self.subscription_payload)
+                            # Each token in the mode it had before the drop
+                            for mode, tokens in self.subscriptions.payloads().items():
+                                self.subscribe(mode, tokens)
                             logger.info("✅ Resubscription successful")
                         except Exception as e:
                             logger.error(f"❌ Resubscription failed: {e}")
                     
+                    # Let consumers backfill data missed while disconnected
+                    reconnected_at_ms = int(time.time() * 1000)
+                    for callback in self.reconnect_callbacks:
+                        try:
+                            callback(reconnected_at_ms)
+                        except Exception as e:
+                            logger.error(f"Error in reconnect callback: {e}")
+                    
                     # Reset attempt counter
                     self._reconnect_attempts = 0
                     break
@@ -500,7 +582,7 @@ class AngelWebSocketV2Manager:
     
     # ========== Binary Data Parsing ==========
     
-    def _parse_binary_tick(self, data: bytes) -> Dict:
+    def _parse_binary_tick(self, data: bytes) -> Optional[Tick]:
         """
         Parse binary tick data according to v2 protocol.
         
@@ -513,104 +595,20 @@ class AngelWebSocketV2Manager:
         - LTP (8 bytes): int64 (in paise, divide by 100)
         - ... (additional fields based on mode)
         
+        Decoding uses the precompiled layouts in ws_manager.tick_decoder
+        (one unpack per packet).
+        
         Args:
             data: Binary data from WebSocket
             
         Returns:
-            Dict with parsed tick data
+            Tick record (supports dict-style .get()), or None if malformed
         """
         try:
-            offset = 0
-            
-            # Subscription mode (1 byte)
-            mode = struct.unpack_from('<B', data, offset)[0]
-            offset += 1
-            
-            # Exchange type (1 byte)
-            exchange_type = struct.unpack_from('<B', data, offset)[0]
-            offset += 1
-            
-            # Token (25 bytes, null-terminated string)
-            token_bytes = struct.unpack_from('<25s', data, offset)[0]
-            token = token_bytes.decode('utf-8').rstrip('\x00')
-            offset += 25
-            
-            # Sequence number (8 bytes)
-            sequence = struct.unpack_from('<q', data, offset)[0]
-            offset += 8
-            
-            # Exchange timestamp (8 bytes)
-            timestamp = struct.unpack_from('<q', data, offset)[0]
-            offset += 8
-            
-            # LTP (8 bytes) - in paise for equities, divide by 10000000 for currencies
-            ltp_raw = struct.unpack_from('<q', data, offset)[0]
-            ltp = ltp_raw / 100.0  # Convert paise to rupees
-            offset += 8
-            
-            tick = {
-                'mode': mode,
-                'exchange_type': exchange_type,
-                'token': token,
-                'sequence': sequence,
-                'timestamp': timestamp,
-                'ltp': ltp
-            }
-            
-            # If mode is LTP only (packet size = 51 bytes), return now
-            if mode == self.MODE_LTP:
-                return tick
-            
-            # Parse additional fields for Quote mode
-            if len(data) >= 123:
-                tick['last_traded_qty'] = struct.unpack_from('<q', data, offset)[0]
-                offset += 8
-                tick['avg_traded_price'] = struct.unpack_from('<q', data, offset)[0] / 100.0
-                offset += 8
-                tick['volume'] = struct.unpack_from('<q', data, offset)[0]
-                offset += 8
-                tick['total_buy_qty'] = struct.unpack_from('<d', data, offset)[0]
-                offset += 8
-                tick['total_sell_qty'] = struct.unpack_from('<d', data, offset)[0]
-                offset += 8
-                tick['open'] = struct.unpack_from('<q', data, offset)[0] / 100.0
-                offset += 8
-                tick['high'] = struct.unpack_from('<q', data, offset)[0] / 100.0
-                offset += 8
-                tick['low'] = struct.unpack_from('<q', data, offset)[0] / 100.0
-                offset += 8
-                tick['close'] = struct.unpack_from('<q', data, offset)[0] / 100.0
-                offset += 8
-            
-            # If mode is Quote (packet size = 123 bytes), return now
-            if mode == self.MODE_QUOTE:
-                return tick
-            
-            # Parse additional fields for SnapQuote mode (379 bytes total)
-            if len(data) >= 379:
-                tick['last_traded_timestamp'] = struct.unpack_from('<q', data, offset)[0]
-                offset += 8
-                tick['open_interest'] = struct.unpack_from('<q', data, offset)[0]
-                offset += 8
-                # Skip OI change % (dummy field)
-                offset += 8
-                # Parse best 5 buy/sell (200 bytes)
-                # ... (implement if needed)
-                offset += 200
-                tick['upper_circuit'] = struct.unpack_from('<q', data, offset)[0] / 100.0
-                offset += 8
-                tick['lower_circuit'] = struct.unpack_from('<q', data, offset)[0] / 100.0
-                offset += 8
-                tick['52_week_high'] = struct.unpack_from('<q', data, offset)[0] / 100.0
-                offset += 8
-                tick['52_week_low'] = struct.unpack_from('<q', data, offset)[0] / 100.0
-                offset += 8
-            
-            return tick
-            
+            return decode_tick(data)
         except Exception as e:
             logger.error(f"Error parsing binary tick data: {e}")
-            return {}
+            return None
     
     # ========== Heartbeat Management ==========
     